@@ -37,41 +37,8 @@ class ActivityLogs(commands.Cog):
                 )
                 return
             
-            # Fetch first page
-            logs = await ActivityLogModel.get_activity_logs(limit=15, offset=0)
-            
-            # Create pagination view
             view = ActivityLogsPaginationView(total_count=total_count, per_page=15)
-            
-            # Create embed for first page
-            embed = discord.Embed(
-                title=f"📊 Activity Logs - All Users",
-                description=f"**Total Logs:** {total_count} | **Page:** 1/{view.total_pages}",
-                color=discord.Color.blue(),
-                timestamp=datetime.now()
-            )
-            
-            for log in logs:
-                user_mention = f"<@{log['user_discord_id']}>" if log['user_discord_id'] else "Unknown"
-                role_name = {1: "SUPER", 2: "ADMIN", 3: "NORMAL"}.get(log['user_role_id'], "NORMAL")
-                
-                field_value = (
-                    f"**User:** {user_mention} ({log['user_name'] or 'N/A'})\n"
-                    f"**Department:** {log['user_department'] or 'N/A'}\n"
-                    f"**Role:** {role_name}\n"
-                    f"**Command:** `/{log['slash_command_used']}`\n"
-                    f"**Executed At:** <t:{int(log['created_at'].timestamp())}:f>"
-                )
-                
-                embed.add_field(
-                    name=f"Log ID: {log['id']} | User ID: {log['user_id']}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"Showing logs 1-{min(15, total_count)} of {total_count}")
-            
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            await view.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
@@ -114,50 +81,13 @@ class ActivityLogs(commands.Cog):
                 )
                 return
             
-            # Fetch first page
-            logs = await ActivityLogModel.get_activity_logs_by_user(
-                user_id=user_data['user_id'],
-                limit=15,
-                offset=0
-            )
-            
-            # Create pagination view
             view = ActivityLogsPaginationView(
                 total_count=total_count,
                 per_page=15,
-                user_id=user_data['user_id']
-            )
-            
-            # Create embed for first page
-            embed = discord.Embed(
-                title=f"📊 Activity Logs - {user_data['name']}",
-                description=f"**Total Logs:** {total_count} | **Page:** 1/{view.total_pages}",
-                color=discord.Color.blue(),
-                timestamp=datetime.now()
+                user_id=user_data['user_id'],
+                thumbnail_url=user.display_avatar.url
             )
-            
-            for log in logs:
-                user_mention = f"<@{log['user_discord_id']}>" if log['user_discord_id'] else "Unknown"
-                role_name = {1: "SUPER", 2: "ADMIN", 3: "NORMAL"}.get(log['user_role_id'], "NORMAL")
-                
-                field_value = (
-                    f"**User:** {user_mention} ({log['user_name'] or 'N/A'})\n"
-                    f"**Department:** {log['user_department'] or 'N/A'}\n"
-                    f"**Role:** {role_name}\n"
-                    f"**Command:** `/{log['slash_command_used']}`\n"
-                    f"**Executed At:** <t:{int(log['created_at'].timestamp())}:f>"
-                )
-                
-                embed.add_field(
-                    name=f"Log ID: {log['id']} | User ID: {log['user_id']}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"Showing logs 1-{min(15, total_count)} of {total_count}")
-            embed.set_thumbnail(url=user.display_avatar.url)
-            
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            await view.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
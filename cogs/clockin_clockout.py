@@ -1,26 +1,45 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime, time as dt_time
+from datetime import datetime
 from models.user_model import UserModel
 from models.time_tracking_model import TimeTrackingModel
 from models.late_reason_model import LateReasonModel
 from models.work_update_model import WorkUpdateModel
 from models.screen_share_model import ScreenShareModel
+from utils.autocomplete import autocomplete_index
+from utils.database import db
+from utils.shift_schedule import shift_schedules
+from utils.write_spool import write_spool, spool_interaction_event, SpoolRejected
 from views.clockin_clockout_views import (
     PlanKnownView,
     SimpleScreenShareView,
+    ScreenShareVerificationButton,
     ScreenShareVerificationView
 )
 import pytz
 
 
+def logged_minutes(clock_in_times: list, clock_out_times: list) -> float:
+    """Minutes worked over the clock-in/clock-out pairs of a day"""
+    total = 0
+    for i in range(len(clock_out_times)):
+        if i < len(clock_in_times):
+            total += (clock_out_times[i] - clock_in_times[i]).total_seconds() / 60
+    return total
+
+
 class TimeTracking(commands.Cog):
     """Time tracking and attendance commands"""
     
     def __init__(self, bot):
         self.bot = bot
         self.pending_late_clockins = {}  # Store pending late clock-ins
+        
+        # Clock events saved while the database was unreachable are replayed through these
+        write_spool.register('clock_in', self.replay_clock_in)
+        write_spool.register('clock_out', self.replay_clock_out)
+        write_spool.register('late_reason', self.replay_late_reason)
     
     @app_commands.command(
         name="clock_in",
@@ -32,7 +51,15 @@ class TimeTracking(commands.Cog):
         
         await interaction.response.defer(ephemeral=True)
         
+        # Taken before any database call, so a clock-in spooled during an outage keeps its time
+        utc_time = datetime.now(pytz.utc)
+        
         try:
+            if write_spool.has_pending(interaction.user.id):
+                # Earlier events of this user still wait for replay: queue behind them
+                await self.spool_clock_in(interaction, utc_time, reason)
+                return
+            
             # Get user from database
             user = await UserModel.get_user_by_discord_id(interaction.user.id)
             
@@ -44,7 +71,6 @@ class TimeTracking(commands.Cog):
                 return
             
             user_id = user['user_id']
-            utc_time = datetime.now(pytz.utc)
             utc_time_no_tz = utc_time.replace(tzinfo=None)
             present_date = utc_time.date()
             
@@ -61,16 +87,20 @@ class TimeTracking(commands.Cog):
                 # First clock-in of the day
                 await self.handle_first_clockin(
                     interaction, user_id, utc_time, 
-                    utc_time_no_tz, present_date, reason
+                    utc_time_no_tz, present_date, reason,
+                    department=user['department']
                 )
                 
         except Exception as e:
+            if write_spool.is_unavailable(e):
+                await self.spool_clock_in(interaction, utc_time, reason)
+                return
             await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
             )
     
-    async def handle_first_clockin(self, interaction, user_id, utc_time, utc_time_no_tz, present_date, reason):
+    async def handle_first_clockin(self, interaction, user_id, utc_time, utc_time_no_tz, present_date, reason, department=None):
         """Handle first clock-in of the day (Start of the day)"""
         
         # Must be "Start of the day"
@@ -82,31 +112,11 @@ class TimeTracking(commands.Cog):
             )
             return
         
-        # Check if late (after 4:10 UTC)
-        clock_in_time = utc_time_no_tz.time()
-        late_threshold = dt_time(4, 10)
-        
-        if clock_in_time > late_threshold:
-            # User is late
-            threshold_datetime = datetime.combine(present_date, late_threshold)
-            late_seconds = (utc_time_no_tz - threshold_datetime).total_seconds()
-            late_minutes = int(late_seconds / 60)
-            
-            # Store pending clock-in
-            self.pending_late_clockins[interaction.user.id] = {
-                'user_id': user_id,
-                'utc_time': utc_time,
-                'utc_time_no_tz': utc_time_no_tz,
-                'present_date': present_date,
-                'reason': reason,
-                'late_minutes': late_minutes
-            }
-            
-            await interaction.followup.send(
-                f"⚠️ **You are {late_minutes} minutes late!**\n\n"
-                f"Please use `/late_reason` command to submit your late reason.",
-                ephemeral=True
-            )
+        # Check if late (after the shift start + grace period)
+        late_threshold = shift_schedules.for_user(user_id, department, utc_time)['late_threshold']
+        
+        if utc_time_no_tz > late_threshold:
+            await self.hold_late_clockin(interaction, user_id, utc_time, reason, late_threshold)
             return
         
         # On time - create record (NOT VERIFIED YET)
@@ -133,6 +143,28 @@ class TimeTracking(commands.Cog):
             ephemeral=True
         )
     
+    async def hold_late_clockin(self, interaction, user_id, utc_time, reason, late_threshold):
+        """Keep a late first clock-in until the user submits /late_reason"""
+        utc_time_no_tz = utc_time.replace(tzinfo=None)
+        late_seconds = (utc_time_no_tz - late_threshold).total_seconds()
+        late_minutes = int(late_seconds / 60)
+        
+        # Store pending clock-in
+        self.pending_late_clockins[interaction.user.id] = {
+            'user_id': user_id,
+            'utc_time': utc_time,
+            'utc_time_no_tz': utc_time_no_tz,
+            'present_date': utc_time.date(),
+            'reason': reason,
+            'late_minutes': late_minutes
+        }
+        
+        await interaction.followup.send(
+            f"⚠️ **You are {late_minutes} minutes late!**\n\n"
+            f"Please use `/late_reason` command to submit your late reason.",
+            ephemeral=True
+        )
+    
     async def handle_additional_clockin(self, interaction, user_id, existing_record, utc_time, utc_time_no_tz, reason):
         """Handle additional clock-in (after breaks)"""
         
@@ -153,9 +185,11 @@ class TimeTracking(commands.Cog):
         
         # Check if screen share was verified for start of day
         if not screen_share_verified:
+            # Also the way to finish a clock-in that was spooled during a database outage
             await interaction.followup.send(
                 "❌ You haven't completed your initial clock-in yet!\n\n"
                 "Please verify your screen share for the start of the day first.",
+                view=ScreenShareVerificationView(record_id, interaction.user),
                 ephemeral=True
             )
             return
@@ -228,7 +262,15 @@ class TimeTracking(commands.Cog):
         
         await interaction.response.defer(ephemeral=True)
         
+        # Taken before any database call, so a clock-out spooled during an outage keeps its time
+        utc_time = datetime.now(pytz.utc)
+        
         try:
+            if write_spool.has_pending(interaction.user.id):
+                # Earlier events of this user still wait for replay: queue behind them
+                await spool_interaction_event(interaction, 'clock_out', {'reason': reason}, utc_time, "clock-out")
+                return
+            
             # Get user from database
             user = await UserModel.get_user_by_discord_id(interaction.user.id)
             
@@ -240,7 +282,6 @@ class TimeTracking(commands.Cog):
                 return
             
             user_id = user['user_id']
-            utc_time = datetime.now(pytz.utc)
             utc_time_no_tz = utc_time.replace(tzinfo=None)
             present_date = utc_time.date()
             
@@ -277,13 +318,7 @@ class TimeTracking(commands.Cog):
                 return
             
             # Calculate total logged time
-            clock_out_times_temp = clock_out_times + [utc_time_no_tz]
-            total_logged_minutes = 0
-            
-            for i in range(len(clock_out_times_temp)):
-                if i < len(clock_in_times):
-                    work_duration = (clock_out_times_temp[i] - clock_in_times[i]).total_seconds() / 60
-                    total_logged_minutes += work_duration
+            total_logged_minutes = logged_minutes(clock_in_times, clock_out_times + [utc_time_no_tz])
             
             current_session_minutes = int((utc_time_no_tz - clock_in_times[-1]).total_seconds() / 60)
             
@@ -308,7 +343,7 @@ class TimeTracking(commands.Cog):
                 # End of the day
                 await TimeTrackingModel.end_day(record_id, utc_time_no_tz)
                 
-                required_minutes = 480  # 8 hours
+                required_minutes = shift_schedules.for_user(user_id, user['department'], utc_time)['required_minutes']
                 if int(total_logged_minutes) < required_minutes:
                     short_minutes = required_minutes - int(total_logged_minutes)
                     short_hours = short_minutes // 60
@@ -320,7 +355,7 @@ class TimeTracking(commands.Cog):
                         f"**This session duration:** {current_session_minutes} minutes\n"
                         f"**Total time logged today:** {int(total_logged_minutes)} minutes "
                         f"({int(total_logged_minutes)//60}h {int(total_logged_minutes)%60}m)\n\n"
-                        f"⚠️ **Warning:** You worked **{short_hours}h {short_mins}m less** than the required 8 hours!\n"
+                        f"⚠️ **Warning:** You worked **{short_hours}h {short_mins}m less** than the required {required_minutes // 60}h {required_minutes % 60}m!\n"
                         f"**Reason:** {reason}",
                         ephemeral=True
                     )
@@ -350,6 +385,9 @@ class TimeTracking(commands.Cog):
                 )
                 
         except Exception as e:
+            if write_spool.is_unavailable(e):
+                await spool_interaction_event(interaction, 'clock_out', {'reason': reason}, utc_time, "clock-out")
+                return
             await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
@@ -381,6 +419,10 @@ class TimeTracking(commands.Cog):
             is_admin_informed = admin_informed.lower() in ['yes', 'y']
             morning_meeting_attended = morning_meeting.lower() in ['yes', 'y']
             
+            if write_spool.has_pending(interaction.user.id):
+                await self.spool_late_reason(interaction, data, reason, is_admin_informed, morning_meeting_attended)
+                return
+            
             # Create time tracking record (NOT VERIFIED YET)
             time_tracking_id = await TimeTrackingModel.create_time_tracking(
                 user_id=data['user_id'],
@@ -424,11 +466,178 @@ class TimeTracking(commands.Cog):
             )
             
         except Exception as e:
+            if write_spool.is_unavailable(e) and interaction.user.id in self.pending_late_clockins:
+                data = self.pending_late_clockins[interaction.user.id]
+                await self.spool_late_reason(
+                    interaction, data, reason,
+                    admin_informed.lower() in ['yes', 'y'], morning_meeting.lower() in ['yes', 'y']
+                )
+                return
             await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
             )
     
+    # ==================== OFFLINE SPOOL ====================
+    async def spool_clock_in(self, interaction, utc_time, reason):
+        """Save a clock-in made while the database is unreachable (late check from the in-memory index)"""
+        if reason.lower().strip() == "start of the day":
+            user = autocomplete_index.user_by_discord_id(interaction.user.id)
+            if user:
+                late_threshold = shift_schedules.for_user(user['user_id'], user['department'], utc_time)['late_threshold']
+                if utc_time.replace(tzinfo=None) > late_threshold:
+                    # Nothing is written until /late_reason, which is spooled too if still needed
+                    await self.hold_late_clockin(interaction, user['user_id'], utc_time, reason, late_threshold)
+                    return
+        
+        await spool_interaction_event(interaction, 'clock_in', {'reason': reason}, utc_time, "clock-in")
+    
+    async def spool_late_reason(self, interaction, data, reason, is_admin_informed, morning_meeting_attended):
+        """Save a late clock-in and its reason while the database is unreachable"""
+        payload = {
+            'user_id': data['user_id'],
+            'clockin_reason': data['reason'],
+            'late_minutes': data['late_minutes'],
+            'reason': reason,
+            'is_admin_informed': is_admin_informed,
+            'morning_meeting_attended': morning_meeting_attended
+        }
+        if await spool_interaction_event(interaction, 'late_reason', payload, data['utc_time'], "late clock-in"):
+            del self.pending_late_clockins[interaction.user.id]
+    
+    async def _replay_user(self, discord_id: int):
+        user = await UserModel.get_user_by_discord_id(discord_id)
+        if not user:
+            raise SpoolRejected("you are not registered")
+        return user
+    
+    async def replay_clock_in(self, discord_id: int, payload: dict, recorded_at: datetime):
+        """Write a spooled clock-in with its original time (skipped if it already landed)"""
+        user = await self._replay_user(discord_id)
+        clock_in_time = recorded_at.astimezone(pytz.utc).replace(tzinfo=None)
+        record = await TimeTrackingModel.get_today_tracking(user['user_id'], clock_in_time.date())
+        
+        if not record:
+            if payload['reason'].lower().strip() != "start of the day":
+                raise SpoolRejected("the first clock-in of the day must be with reason 'Start of the day'")
+            await TimeTrackingModel.create_time_tracking(
+                user_id=user['user_id'],
+                starting_time=clock_in_time,
+                present_date=clock_in_time.date(),
+                clock_in_time=clock_in_time,
+                reason=payload['reason'],
+                screen_share_verified=False  # Verified when the user runs /clock_in again
+            )
+            return (
+                f"✅ Your clock-in at **{clock_in_time.strftime('%I:%M %p')} UTC** has been recorded.\n"
+                f"⚠️ Run `/clock_in` again to verify your screen share and complete it."
+            )
+        
+        clock_in_times = record['clock_in'] or []
+        clock_out_times = record['clock_out'] or []
+        if clock_in_time in clock_in_times:
+            return None  # Written before the outage was noticed
+        if record['end_of_the_day']:
+            raise SpoolRejected("the day had already ended")
+        if len(clock_in_times) > len(clock_out_times):
+            raise SpoolRejected("you were still clocked in")
+        
+        break_duration = None
+        if clock_out_times:
+            break_minutes = int((clock_in_time - clock_out_times[-1]).total_seconds() / 60)
+            break_duration = (record['break_duration'] or 0) + break_minutes
+        await TimeTrackingModel.add_clock_in(
+            tracking_id=record['id'],
+            clock_in_time=clock_in_time,
+            reason=payload['reason'],
+            break_duration=break_duration
+        )
+        return f"✅ Your clock-in at **{clock_in_time.strftime('%I:%M %p')} UTC** has been recorded."
+    
+    async def replay_clock_out(self, discord_id: int, payload: dict, recorded_at: datetime):
+        """
+        Write a spooled clock-out with its original time. All steps run in one
+        transaction, so a replay interrupted midway leaves nothing behind and
+        the retry applies every step again.
+        """
+        user = await self._replay_user(discord_id)
+        clock_out_time = recorded_at.astimezone(pytz.utc).replace(tzinfo=None)
+        reason = payload['reason']
+        end_of_day = reason.lower().strip() == "end of the day"
+        
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                record = await TimeTrackingModel.get_today_tracking(user['user_id'], clock_out_time.date(), conn=conn)
+                if not record:
+                    raise SpoolRejected("you had not clocked in that day")
+                
+                clock_in_times = record['clock_in'] or []
+                clock_out_times = record['clock_out'] or []
+                
+                if clock_out_time not in clock_out_times:
+                    if len(clock_out_times) >= len(clock_in_times):
+                        raise SpoolRejected("you were not clocked in at that time")
+                    await TimeTrackingModel.add_clock_out(
+                        tracking_id=record['id'],
+                        clock_out_time=clock_out_time,
+                        reason=reason,
+                        time_logged=int(logged_minutes(clock_in_times, clock_out_times + [clock_out_time])),
+                        conn=conn
+                    )
+                    if not end_of_day:
+                        await TimeTrackingModel.increment_break_counter(record['id'], conn=conn)
+                    
+                    # Screen share sessions are stored in server local time
+                    ended_at = recorded_at.astimezone().replace(tzinfo=None)
+                    active_session = await ScreenShareModel.get_active_session_by_user(user['user_id'], conn=conn)
+                    if active_session and active_session['screen_share_on_time'] <= ended_at:
+                        await ScreenShareModel.end_session(
+                            session_id=active_session['session_id'],
+                            reason=f"Clock-out: {reason}",
+                            ended_at=ended_at,
+                            conn=conn
+                        )
+                
+                if end_of_day and not record['end_of_the_day']:
+                    await TimeTrackingModel.end_day(record['id'], clock_out_time, conn=conn)
+        
+        return f"✅ Your clock-out at **{clock_out_time.strftime('%I:%M %p')} UTC** ({reason}) has been recorded."
+    
+    async def replay_late_reason(self, discord_id: int, payload: dict, recorded_at: datetime):
+        """Write a spooled late first clock-in and its late reason"""
+        clock_in_time = recorded_at.astimezone(pytz.utc).replace(tzinfo=None)
+        record = await TimeTrackingModel.get_today_tracking(payload['user_id'], clock_in_time.date())
+        
+        if not record:
+            time_tracking_id = await TimeTrackingModel.create_time_tracking(
+                user_id=payload['user_id'],
+                starting_time=clock_in_time,
+                present_date=clock_in_time.date(),
+                clock_in_time=clock_in_time,
+                reason=payload['clockin_reason'],
+                screen_share_verified=False
+            )
+        elif clock_in_time in (record['clock_in'] or []):
+            time_tracking_id = record['id']
+            if await LateReasonModel.get_late_reason_by_tracking_id(time_tracking_id):
+                return None  # Written before the outage was noticed
+        else:
+            raise SpoolRejected("another clock-in was already recorded that day")
+        
+        await LateReasonModel.create_late_reason(
+            user_id=payload['user_id'],
+            time_tracking_id=time_tracking_id,
+            late_mins=payload['late_minutes'],
+            reason=payload['reason'],
+            is_admin_informed=payload['is_admin_informed'],
+            morning_meeting_attended=payload['morning_meeting_attended']
+        )
+        return (
+            f"✅ Your clock-in at **{clock_in_time.strftime('%I:%M %p')} UTC** "
+            f"({payload['late_minutes']} minutes late) and late reason have been recorded.\n"
+            f"⚠️ Run `/clock_in` again to verify your screen share and complete it."
+        )
+    
     @app_commands.command(
         name="clocked_in_status",
         description="View all currently clocked-in employees"
@@ -507,4 +716,6 @@ class TimeTracking(commands.Cog):
 
 
 async def setup(bot):
+    # Screen share prompts are dispatched by custom_id, including ones sent before a restart
+    bot.add_dynamic_items(ScreenShareVerificationButton)
     await bot.add_cog(TimeTracking(bot))
\ No newline at end of file
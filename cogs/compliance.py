@@ -1,7 +1,24 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+from datetime import datetime
 from models import UserModel, ComplianceModel
+from utils.autocomplete import autocomplete_index
+from utils.verification_helper import check_user_permission, is_admin, is_super_admin
+from utils.compliance_trends import compliance_trends, WINDOWS
+from utils.embed_packer import EmbedPacker
+from typing import List
+import io
+import pytz
+
+# Checks recorded per employee: (daily_compliance column prefix, display name)
+COMPLIANCE_CHECKS = [
+    ('desklog', 'Desklog Usage'),
+    ('trackabi', 'Trackabi Usage'),
+    ('discord', 'Discord Usage'),
+    ('break', 'Rules followed'),
+    ('google_drive', 'Google Drive Backup'),
+]
 
 class ComplianceModal(discord.ui.Modal, title='Daily Discipline Compliance'):
     """Modal form for recording compliance"""
@@ -152,7 +169,7 @@ class UserSelectView(discord.ui.View):
     
     def __init__(self, users_list):
         super().__init__(timeout=180)
-        self.users_list = users_list
+        self.users_list = users_list[:25]  # Discord select menus allow at most 25 options
         
         # Create select menu with users
         options = [
@@ -161,7 +178,7 @@ class UserSelectView(discord.ui.View):
                 value=str(user['user_id']),
                 description=f"{user['department']} - {user['position']}"
             )
-            for user in users_list
+            for user in self.users_list
         ]
         
         self.user_select = discord.ui.Select(
@@ -186,6 +203,249 @@ class UserSelectView(discord.ui.View):
         await interaction.response.send_modal(modal)
 
 
+class ExceptionReasonModal(discord.ui.Modal, title='Non-compliance Reason'):
+    """Optional reason applied to every selected employee/check exception"""
+    
+    reason = discord.ui.TextInput(
+        label='Reason (optional)',
+        placeholder='e.g. Desklog not running after lunch',
+        style=discord.TextStyle.short,
+        required=False,
+        max_length=200
+    )
+    
+    def __init__(self, batch_view: 'BatchComplianceView', user_ids: List[int], checks: List[str]):
+        super().__init__()
+        self.batch_view = batch_view
+        self.user_ids = user_ids
+        self.checks = checks
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        self.batch_view.mark_exceptions(self.user_ids, self.checks, self.reason.value.strip() or None)
+        await interaction.response.edit_message(**self.batch_view.render(), view=self.batch_view)
+
+
+class BatchComplianceView(discord.ui.View):
+    """
+    Record one day of discipline compliance for a whole team. The reviewer only
+    marks exceptions (employee + failed checks); everyone else is recorded as
+    compliant. Employees are paged 25 at a time and saved in one statement.
+    """
+    
+    PAGE_SIZE = 25
+    
+    def __init__(self, users: List[dict], compliance_date, reviewer_discord_id: int,
+                 department: str = None, already_recorded: List[int] = None):
+        super().__init__(timeout=900)
+        self.users = users
+        self.names = {user['user_id']: user['name'] for user in users}
+        self.compliance_date = compliance_date
+        self.reviewer_discord_id = reviewer_discord_id
+        self.department = department
+        self.already_recorded = set(already_recorded or [])
+        self.exceptions = {}  # user_id -> {check: reason}
+        self.page = 0
+        self.selected_user_ids = []
+        self.selected_checks = []
+        self.build_items()
+    
+    @property
+    def page_count(self) -> int:
+        return max(1, (len(self.users) + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+    
+    def build_items(self):
+        """(Re)build the components for the current page"""
+        self.clear_items()
+        page_users = self.users[self.page * self.PAGE_SIZE:(self.page + 1) * self.PAGE_SIZE]
+        
+        user_select = discord.ui.Select(
+            placeholder=f"Employees with exceptions (page {self.page + 1}/{self.page_count})...",
+            options=[
+                discord.SelectOption(
+                    label=user['name'][:100],
+                    value=str(user['user_id']),
+                    description=(
+                        ("⚠️ " + ", ".join(self.exceptions[user['user_id']]) if user['user_id'] in self.exceptions
+                         else user['department'] or 'N/A')[:100]
+                    ),
+                    default=user['user_id'] in self.selected_user_ids
+                )
+                for user in page_users
+            ],
+            min_values=0,
+            max_values=len(page_users),
+            row=0
+        )
+        user_select.callback = self.on_user_select
+        self.add_item(user_select)
+        
+        check_select = discord.ui.Select(
+            placeholder="Failed checks for the selected employees...",
+            options=[
+                discord.SelectOption(label=label, value=check, default=check in self.selected_checks)
+                for check, label in COMPLIANCE_CHECKS
+            ],
+            min_values=0,
+            max_values=len(COMPLIANCE_CHECKS),
+            row=1
+        )
+        check_select.callback = self.on_check_select
+        self.add_item(check_select)
+        
+        buttons = [
+            ("Previous", discord.ButtonStyle.secondary, "◀️", self.on_previous, self.page == 0, 2),
+            ("Next", discord.ButtonStyle.secondary, "▶️", self.on_next, self.page >= self.page_count - 1, 2),
+            ("Mark Exceptions", discord.ButtonStyle.primary, "⚠️", self.on_mark, False, 2),
+            ("Clear Selected", discord.ButtonStyle.secondary, "🧹", self.on_clear, False, 2),
+            ("Save Day", discord.ButtonStyle.success, "💾", self.on_save, False, 3),
+            ("Cancel", discord.ButtonStyle.danger, "❌", self.on_cancel, False, 3),
+        ]
+        for label, style, emoji, callback, disabled, row in buttons:
+            button = discord.ui.Button(label=label, style=style, emoji=emoji, disabled=disabled, row=row)
+            button.callback = callback
+            self.add_item(button)
+    
+    def build_report(self) -> EmbedPacker:
+        """Summary of the day being recorded, in one message"""
+        report = EmbedPacker(
+            title=f"📋 Batch Compliance - {self.compliance_date.strftime('%d/%m/%Y')}",
+            description=(
+                f"**Team:** {self.department or 'All departments'} ({len(self.users)} employee(s))\n"
+                f"Everyone not listed below is recorded as **compliant** on all checks.\n\n"
+                f"Select employees and failed checks, then **Mark Exceptions**. **Save Day** records everyone at once."
+            ),
+            color=discord.Color.blue(),
+            footer=f"Page {self.page + 1}/{self.page_count}",
+            max_messages=1,
+            attachment_name=f"compliance_exceptions_{self.compliance_date.isoformat()}.txt"
+        )
+        
+        labels = dict(COMPLIANCE_CHECKS)
+        if self.exceptions:
+            lines = []
+            for user_id, failed in sorted(self.exceptions.items(), key=lambda item: self.names[item[0]].lower()):
+                details = ", ".join(
+                    f"{labels[check]}" + (f" ({reason})" if reason else "") for check, reason in failed.items()
+                )
+                lines.append(f"❌ **{self.names[user_id]}** - {details}")
+            report.add_lines(f"⚠️ Exceptions ({len(self.exceptions)})", lines)
+        else:
+            report.add_field(name="⚠️ Exceptions", value="None yet - everyone is compliant.")
+        
+        if self.already_recorded:
+            report.add_field(
+                name="ℹ️ Already Recorded",
+                value=f"{len(self.already_recorded)} employee(s) already have a record for this day; saving updates them."
+            )
+        
+        return report
+    
+    def render(self, report: EmbedPacker = None) -> dict:
+        """Message edit kwargs; exceptions that do not fit in one message are attached as a text file"""
+        message = (report or self.build_report()).pack()[0]
+        files = []
+        if message['attachment'] is not None:
+            filename, data = message['attachment']
+            files.append(discord.File(io.BytesIO(data), filename=filename))
+        return {'embeds': message['embeds'], 'attachments': files}
+    
+    def mark_exceptions(self, user_ids: List[int], checks: List[str], reason: str = None):
+        for user_id in user_ids:
+            failed = self.exceptions.setdefault(user_id, {})
+            for check in checks:
+                failed[check] = reason
+        self.selected_user_ids = []
+        self.selected_checks = []
+        self.build_items()
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.reviewer_discord_id:
+            await interaction.response.send_message(
+                "❌ Only the reviewer who started this batch can edit it.",
+                ephemeral=True
+            )
+            return False
+        return True
+    
+    async def on_user_select(self, interaction: discord.Interaction):
+        select = self.children[0]
+        self.selected_user_ids = [int(value) for value in select.values]
+        await interaction.response.defer()
+    
+    async def on_check_select(self, interaction: discord.Interaction):
+        select = self.children[1]
+        self.selected_checks = list(select.values)
+        await interaction.response.defer()
+    
+    async def change_page(self, interaction: discord.Interaction, step: int):
+        self.page = min(max(self.page + step, 0), self.page_count - 1)
+        self.selected_user_ids = []
+        self.build_items()
+        await interaction.response.edit_message(**self.render(), view=self)
+    
+    async def on_previous(self, interaction: discord.Interaction):
+        await self.change_page(interaction, -1)
+    
+    async def on_next(self, interaction: discord.Interaction):
+        await self.change_page(interaction, 1)
+    
+    async def on_mark(self, interaction: discord.Interaction):
+        if not self.selected_user_ids or not self.selected_checks:
+            await interaction.response.send_message(
+                "⚠️ Select at least one employee and one failed check first.",
+                ephemeral=True
+            )
+            return
+        await interaction.response.send_modal(
+            ExceptionReasonModal(self, list(self.selected_user_ids), list(self.selected_checks))
+        )
+    
+    async def on_clear(self, interaction: discord.Interaction):
+        """Make the selected employees compliant again"""
+        for user_id in self.selected_user_ids:
+            self.exceptions.pop(user_id, None)
+        self.selected_user_ids = []
+        self.build_items()
+        await interaction.response.edit_message(**self.render(), view=self)
+    
+    async def on_save(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        
+        try:
+            records = []
+            for user in self.users:
+                failed = self.exceptions.get(user['user_id'], {})
+                record = {'user_id': user['user_id']}
+                for check, _ in COMPLIANCE_CHECKS:
+                    record[f'{check}_usage'] = check not in failed
+                    record[f'{check}_reason'] = failed.get(check)
+                records.append(record)
+            
+            saved = await ComplianceModel.record_day(self.compliance_date, records, interaction.user.id)
+            
+            report = self.build_report()
+            report.title = f"✅ Compliance Saved - {self.compliance_date.strftime('%d/%m/%Y')}"
+            report.description = (
+                f"**Team:** {self.department or 'All departments'}\n"
+                f"**Recorded:** {saved} employee(s) | **Compliant:** {saved - len(self.exceptions)} | "
+                f"**With exceptions:** {len(self.exceptions)}"
+            )
+            report.color = discord.Color.green()
+            report.footer = None
+            await interaction.edit_original_response(**self.render(report), view=None)
+            self.stop()
+        
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ Error saving compliance records: {str(e)}",
+                ephemeral=True
+            )
+    
+    async def on_cancel(self, interaction: discord.Interaction):
+        await interaction.response.edit_message(content="❌ Batch compliance cancelled. Nothing was saved.", embed=None, view=None)
+        self.stop()
+
+
 class Compliance(commands.Cog):
     """Discipline compliance tracking commands"""
     
@@ -196,9 +456,27 @@ class Compliance(commands.Cog):
         name="discipline_compliance",
         description="Record daily discipline compliance for an employee"
     )
-    async def discipline_compliance(self, interaction: discord.Interaction):
+    @app_commands.describe(employee="Start typing a name or department (leave empty to pick from a list)")
+    async def discipline_compliance(self, interaction: discord.Interaction, employee: str = None):
         """Show user selector to record compliance"""
         
+        # Employee chosen through autocomplete - open the modal straight away
+        if employee:
+            selected_user = autocomplete_index.users.get(int(employee)) if employee.isdigit() else None
+            if not selected_user:
+                await interaction.response.send_message(
+                    "❌ Employee not found. Please pick one from the suggestions.",
+                    ephemeral=True
+                )
+                return
+            
+            modal = ComplianceModal(
+                user_id=selected_user['user_id'],
+                user_name=selected_user['name']
+            )
+            await interaction.response.send_modal(modal)
+            return
+        
         await interaction.response.defer(ephemeral=True)
         
         try:
@@ -226,6 +504,179 @@ class Compliance(commands.Cog):
                 ephemeral=True
             )
     
+    @discipline_compliance.autocomplete('employee')
+    async def employee_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest active employees from the in-memory index"""
+        return autocomplete_index.user_choices(current)
+    
+    # ==================== BATCH COMPLIANCE ====================
+    @app_commands.command(
+        name="batch_compliance",
+        description="Record a day of discipline compliance for a whole team (exceptions only)"
+    )
+    @app_commands.describe(
+        department="Team to record (leave empty for everyone)",
+        date="Day to record (DD/MM/YYYY, default: today)"
+    )
+    async def batch_compliance(self, interaction: discord.Interaction, department: str = None, date: str = None):
+        """Mark non-compliant employees only; everyone else is recorded as compliant"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        has_permission = await check_user_permission(interaction.user.id, 'compliance')
+        if not has_permission:
+            await interaction.followup.send(
+                "❌ You don't have permission to record compliance!",
+                ephemeral=True
+            )
+            return
+        
+        try:
+            try:
+                compliance_date = datetime.strptime(date, '%d/%m/%Y').date() if date else datetime.now(pytz.utc).date()
+            except ValueError:
+                await interaction.followup.send("❌ Invalid date! Use DD/MM/YYYY.", ephemeral=True)
+                return
+            
+            # Employees come from the in-memory index (no listing query)
+            users = sorted(
+                (
+                    user for user in autocomplete_index.users.values()
+                    if not department or (user['department'] or '').lower() == department.lower()
+                ),
+                key=lambda user: (user['name'] or '').lower()
+            )
+            
+            if not users:
+                await interaction.followup.send(
+                    f"❌ No employees found{f' in **{department}**' if department else ''}.",
+                    ephemeral=True
+                )
+                return
+            
+            already_recorded = await ComplianceModel.get_recorded_user_ids(
+                compliance_date, [user['user_id'] for user in users]
+            )
+            
+            view = BatchComplianceView(
+                users, compliance_date, interaction.user.id,
+                department=department, already_recorded=already_recorded
+            )
+            message = view.render()
+            await interaction.followup.send(embeds=message['embeds'], files=message['attachments'], view=view, ephemeral=True)
+        
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ An error occurred: {str(e)}",
+                ephemeral=True
+            )
+    
+    # ==================== COMPLIANCE TRENDS ====================
+    @app_commands.command(
+        name="compliance_trends",
+        description="Rolling 7/30/90-day compliance rates for a user, a department or the company"
+    )
+    @app_commands.describe(
+        user="Employee to show (leave empty for yourself unless a department is given)",
+        department="Department to show instead of a user",
+        company="Show company-wide rates and the department overview",
+        rebuild="Rebuild the rates from the compliance history first (Admin only)"
+    )
+    async def compliance_trends(self, interaction: discord.Interaction, user: discord.Member = None,
+                                department: str = None, company: bool = False, rebuild: bool = False):
+        """Show rolling compliance rates per category"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            viewing_others = company or department or (user and user.id != interaction.user.id)
+            if viewing_others and not await check_user_permission(interaction.user.id, 'compliance'):
+                await interaction.followup.send(
+                    "❌ You don't have permission to view other employees' compliance!",
+                    ephemeral=True
+                )
+                return
+            
+            if rebuild:
+                if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+                    await interaction.followup.send("❌ Only admins can rebuild compliance trends.", ephemeral=True)
+                    return
+                await compliance_trends.load()
+            
+            if company:
+                title, rates = "🏢 Company", compliance_trends.rates('company')
+            elif department:
+                title, rates = f"🏬 {department}", compliance_trends.rates('department', department)
+            else:
+                db_user = await UserModel.get_user_by_discord_id(user.id if user else interaction.user.id)
+                if not db_user:
+                    await interaction.followup.send(
+                        f"❌ {user.mention if user else 'You'} {'is' if user else 'are'} not registered.",
+                        ephemeral=True
+                    )
+                    return
+                title, rates = f"👤 {db_user['name']}", compliance_trends.rates('user', db_user['user_id'])
+            
+            await interaction.followup.send(embed=self.build_trends_embed(title, rates, company), ephemeral=True)
+        
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ An error occurred: {str(e)}",
+                ephemeral=True
+            )
+    
+    @staticmethod
+    def build_trends_embed(title: str, rates: dict, company: bool = False) -> discord.Embed:
+        """Rates per window and category, with the department overview for the company view"""
+        
+        def rate_line(label: str, rate) -> str:
+            if rate is None:
+                return f"`{'░' * 10}` **{label}:** —"
+            filled = round(rate / 10)
+            return f"`{'█' * filled}{'░' * (10 - filled)}` **{label}:** {rate:.0f}%"
+        
+        overall_30 = rates[30]['overall']
+        embed = discord.Embed(
+            title=f"📈 Compliance Trends - {title}",
+            description="Share of recorded checks that were compliant over the last 7, 30 and 90 days.",
+            color=(
+                discord.Color.light_grey() if overall_30 is None
+                else discord.Color.green() if overall_30 >= 90
+                else discord.Color.orange() if overall_30 >= 75
+                else discord.Color.red()
+            )
+        )
+        
+        for window in WINDOWS:
+            window_rates = rates[window]
+            if not window_rates['answers']:
+                embed.add_field(name=f"📅 Last {window} days", value="No records.", inline=True)
+                continue
+            lines = [rate_line('Overall', window_rates['overall'])] + [
+                rate_line(label.replace(' Usage', '').replace(' Backup', ''), window_rates['categories'][category])
+                for category, label in COMPLIANCE_CHECKS
+            ]
+            embed.add_field(name=f"📅 Last {window} days", value="\n".join(lines), inline=True)
+        
+        if company:
+            overview = compliance_trends.department_overview(30)
+            if overview:
+                embed.add_field(
+                    name="🏬 Departments (30 days, lowest first)",
+                    value="\n".join(
+                        f"**{department}:** {rate:.0f}% ({answers} checks)" for department, rate, answers in overview[:15]
+                    ),
+                    inline=False
+                )
+        
+        return embed
+    
+    @compliance_trends.autocomplete('department')
+    @batch_compliance.autocomplete('department')
+    async def department_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest known departments from the in-memory index"""
+        return autocomplete_index.department_choices(current)
+    
     @app_commands.command(
         name="compliance_history",
         description="View compliance history for a user"
@@ -1,10 +1,14 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime, date
-from models.compliance_rating_model import ComplianceRatingModel
+from datetime import datetime, date, timedelta
+from models.compliance_rating_model import ComplianceRatingModel, RATING_METRICS
 from models.user_model import UserModel
 from utils.verification_helper import is_admin, is_super_admin
+from utils.autocomplete import autocomplete_index
+from utils.custom_rating_catalogue import custom_rating_catalogue
+from utils.embed_packer import EmbedPacker
+from typing import List
 from views.compliance_rating_views import EmployeeSelectView, ViewRatingsSelectView
 import pytz
 
@@ -291,6 +295,285 @@ class ComplianceRating(commands.Cog):
 
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
+    # ==================== RATING LEADERBOARD ====================
+    @app_commands.command(
+        name="rating_leaderboard",
+        description="Rank employees or departments by their average ratings (ADMIN+)"
+    )
+    @app_commands.describe(
+        scope="Rank employees or departments",
+        metric="Average to rank by (ignored when a custom field is given)",
+        custom_field="Numeric additional rating field to rank by (e.g. code_quality)",
+        month="Month to rank (MM/YYYY, default: all time)",
+        limit="Number of entries to show (default: 10)"
+    )
+    @app_commands.choices(
+        scope=[
+            app_commands.Choice(name="Employees", value="user"),
+            app_commands.Choice(name="Departments", value="department"),
+        ],
+        metric=[
+            app_commands.Choice(name="Overall performance", value="performance"),
+            app_commands.Choice(name="Task submission", value="task"),
+            app_commands.Choice(name="Fewest rule breaks", value="rule_breaks"),
+        ]
+    )
+    async def rating_leaderboard(
+        self,
+        interaction: discord.Interaction,
+        scope: str = "user",
+        metric: str = "performance",
+        custom_field: str = None,
+        month: str = None,
+        limit: app_commands.Range[int, 1, 25] = 10
+    ):
+        """Leaderboard served from the rating_aggregates view"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+            await interaction.followup.send(
+                "❌ Only ADMIN or SUPER ADMIN can view compliance ratings!",
+                ephemeral=True
+            )
+            return
+        
+        try:
+            try:
+                period = datetime.strptime(month, '%m/%Y').strftime('%Y-%m') if month else 'all'
+            except ValueError:
+                await interaction.followup.send("❌ Invalid month! Use MM/YYYY.", ephemeral=True)
+                return
+            
+            custom_key = custom_field.strip().replace(' ', '_').lower() if custom_field else None
+            entries = await ComplianceRatingModel.get_rating_leaderboard(scope, period, metric, custom_key, limit)
+            
+            ranked_by = f"`{custom_key}`" if custom_key else {
+                'performance': "overall performance", 'task': "task submission", 'rule_breaks': "fewest rule breaks"
+            }[metric]
+            report = EmbedPacker(
+                title=f"🏆 Rating Leaderboard - {'Employees' if scope == 'user' else 'Departments'}",
+                description=f"**Period:** {month or 'All time'} | **Ranked by:** {ranked_by}",
+                color=discord.Color.gold(),
+                footer="Averages are refreshed shortly after each new rating",
+                attachment_name=f"rating_leaderboard_{period}.txt"
+            )
+            
+            if not entries:
+                report.add_field(name="📭 No ratings", value="Nothing rated for this period yet.")
+            else:
+                medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+                lines = []
+                for rank, entry in enumerate(entries, 1):
+                    name = entry['user_name'] if scope == 'user' else entry['scope_key']
+                    value = (
+                        f"{entry['custom_averages'].get(custom_key)}" if custom_key
+                        else f"{entry[RATING_METRICS[metric][0]]}"
+                    )
+                    lines.append(
+                        f"{medals.get(rank, f'`#{rank}`')} **{name}** - {value} "
+                        f"({entry['ratings']} rating(s), perf {entry['avg_performance_rating']}, "
+                        f"task {entry['avg_task_rating']}, breaks {entry['total_rule_breaks']})"
+                    )
+                report.add_lines("📊 Ranking", lines)
+            
+            await report.send(interaction)
+        
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    # ==================== RATING TREND ====================
+    @app_commands.command(
+        name="rating_trend",
+        description="Monthly average ratings for an employee, a department or the company (ADMIN+)"
+    )
+    @app_commands.describe(
+        user="Employee to show",
+        department="Department to show (when no employee is given)",
+        months="Number of months to show (default: 6)"
+    )
+    async def rating_trend(
+        self,
+        interaction: discord.Interaction,
+        user: discord.Member = None,
+        department: str = None,
+        months: app_commands.Range[int, 1, 24] = 6
+    ):
+        """Monthly and all-time averages served from the rating_aggregates view"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+            await interaction.followup.send(
+                "❌ Only ADMIN or SUPER ADMIN can view compliance ratings!",
+                ephemeral=True
+            )
+            return
+        
+        try:
+            if user:
+                employee = await UserModel.get_user_by_discord_id(user.id)
+                if not employee:
+                    await interaction.followup.send(f"❌ {user.mention} is not registered!", ephemeral=True)
+                    return
+                scope, scope_key, title = 'user', employee['user_id'], employee['name']
+            elif department:
+                scope, scope_key, title = 'department', department, department
+            else:
+                scope, scope_key, title = 'company', 'all', "Company"
+            
+            overall = await ComplianceRatingModel.get_rating_aggregate(scope, scope_key)
+            trend = await ComplianceRatingModel.get_rating_trend(scope, scope_key, months)
+            
+            report = EmbedPacker(
+                title=f"📈 Rating Trend - {title}",
+                description=(
+                    f"**All time:** {overall['ratings']} rating(s) | "
+                    f"**Performance:** {overall['avg_performance_rating']} | "
+                    f"**Tasks:** {overall['avg_task_rating']} | "
+                    f"**Rule breaks:** {overall['total_rule_breaks']} (avg {overall['avg_rule_breaks']})"
+                ) if overall else "No ratings recorded yet.",
+                color=discord.Color.blue(),
+                footer="Averages are refreshed shortly after each new rating",
+                attachment_name=f"rating_trend_{scope}.txt"
+            )
+            
+            if overall:
+                lines = []
+                for entry in trend:
+                    month_label = datetime.strptime(entry['period'], '%Y-%m').strftime('%b %Y')
+                    lines.append(
+                        f"**{month_label}:** perf {entry['avg_performance_rating']} | task {entry['avg_task_rating']} | "
+                        f"breaks {entry['total_rule_breaks']} ({entry['ratings']} rating(s))"
+                    )
+                if lines:
+                    report.add_lines(f"📅 Last {len(lines)} rated month(s)", lines)
+                
+                if overall['custom_averages']:
+                    report.add_lines("➕ Additional Fields (all time)", [
+                        f"**{key.replace('_', ' ').title()}:** {value}"
+                        for key, value in sorted(overall['custom_averages'].items())
+                    ])
+            
+            await report.send(interaction)
+        
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    # ==================== CUSTOM FIELD SEARCH ====================
+    @app_commands.command(
+        name="custom_rating_search",
+        description="Find ratings by an additional field, e.g. communication < 5 (ADMIN+)"
+    )
+    @app_commands.describe(
+        field="Additional rating field",
+        comparison="How to compare the field with the value",
+        value="Value to compare with (numbers for <, >, ...)",
+        days="Look back this many days (default: 30)",
+        department="Only employees of this department"
+    )
+    @app_commands.choices(comparison=[
+        app_commands.Choice(name="less than (<)", value="lt"),
+        app_commands.Choice(name="at most (<=)", value="lte"),
+        app_commands.Choice(name="greater than (>)", value="gt"),
+        app_commands.Choice(name="at least (>=)", value="gte"),
+        app_commands.Choice(name="equals (=)", value="eq"),
+        app_commands.Choice(name="not equal (!=)", value="ne"),
+    ])
+    async def custom_rating_search(
+        self,
+        interaction: discord.Interaction,
+        field: str,
+        comparison: str,
+        value: str,
+        days: app_commands.Range[int, 1, 3650] = 30,
+        department: str = None
+    ):
+        """Filter ratings on a custom_ratings key (served by the GIN index) and summarise the field"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+            await interaction.followup.send(
+                "❌ Only ADMIN or SUPER ADMIN can view compliance ratings!",
+                ephemeral=True
+            )
+            return
+        
+        try:
+            if not custom_rating_catalogue.loaded:
+                await custom_rating_catalogue.load()
+            
+            key = field.strip().replace(' ', '_').lower()
+            if key not in custom_rating_catalogue.keys:
+                known = ", ".join(f"`{k}`" for k in custom_rating_catalogue.search()[:15]) or "none yet"
+                await interaction.followup.send(
+                    f"❌ No ratings use the field `{key}`.\n**Known fields:** {known}",
+                    ephemeral=True
+                )
+                return
+            
+            end_date = datetime.now(pytz.utc).date()
+            start_date = end_date - timedelta(days=days - 1)
+            
+            try:
+                result = await ComplianceRatingModel.find_ratings_by_custom_field(
+                    key, comparison, value, start_date, end_date, department
+                )
+            except ValueError as e:
+                await interaction.followup.send(f"⚠️ {e}", ephemeral=True)
+                return
+            
+            symbol = {'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>=', 'eq': '=', 'ne': '!='}[comparison]
+            report = EmbedPacker(
+                title=f"🔎 Ratings where {key.replace('_', ' ')} {symbol} {value}",
+                description=(
+                    f"**Period:** {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
+                    f"{f' | **Department:** {department}' if department else ''}\n"
+                    f"**Matches:** {result['total']}"
+                ),
+                color=discord.Color.blue() if result['total'] else discord.Color.light_grey(),
+                attachment_name=f"custom_rating_search_{key}.txt"
+            )
+            
+            if result['ratings']:
+                lines = [
+                    f"`{r['rating_date'].strftime('%d/%m')}` **{r['user_name']}** ({r['department'] or 'N/A'}) - "
+                    f"{key}: **{r['field_value']}** | perf {r['overall_performance_rating']}"
+                    for r in result['ratings']
+                ]
+                shown = f" (newest {len(lines)})" if result['total'] > len(lines) else ""
+                report.add_lines(f"📋 Ratings{shown}", lines)
+            
+            if custom_rating_catalogue.is_numeric_key(key):
+                summary = await ComplianceRatingModel.get_custom_field_summary(key, start_date, end_date, department)
+                total = next((row for row in summary if row['is_total']), None)
+                if total and total['ratings']:
+                    lines = [
+                        f"**All:** avg {total['average']} (min {total['minimum']}, max {total['maximum']}, {total['ratings']} rating(s))"
+                    ] + [
+                        f"**{row['department'] or 'N/A'}:** avg {row['average']} ({row['ratings']})"
+                        for row in summary if not row['is_total']
+                    ]
+                    report.add_lines(f"📊 {key.replace('_', ' ').title()} in this period", lines)
+            
+            await report.send(interaction)
+        
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @custom_rating_search.autocomplete('field')
+    @rating_leaderboard.autocomplete('custom_field')
+    async def custom_field_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest additional rating fields from the cached catalogue"""
+        return custom_rating_catalogue.choices(current)
+
+    @custom_rating_search.autocomplete('department')
+    @rating_trend.autocomplete('department')
+    async def department_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest known departments from the in-memory index"""
+        return autocomplete_index.department_choices(current)
+
 
 async def setup(bot):
     await bot.add_cog(ComplianceRating(bot))
\ No newline at end of file
@@ -2,11 +2,15 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime
+from datetime import datetime, timedelta
 from models.user_model import UserModel
 from models.leave_model import LeaveRequestModel
-from views.leave_management_views import LeaveTypeSelectView, ReviewLeaveRequestsView, SickLeaveSettingsModal
+from models.leave_ledger_model import LeaveLedgerModel
+from models.settings_model import SettingsModel
+from views.leave_management_views import LeaveTypeSelectView, ReviewLeaveRequestsView, LeaveRequestSelect, SickLeaveSettingsModal
 from utils.verification_helper import check_user_permission, is_admin, is_super_admin
+from utils.work_calendar import work_calendar
+from utils.embed_packer import EmbedPacker
 import pytz
 
 
@@ -84,6 +88,36 @@ class LeaveManagement(commands.Cog):
             except Exception:
                 pass
     
+    @app_commands.command(
+        name="leave_alert_settings",
+        description="Set how many leaves in a week/month trigger an admin alert (Admin only)"
+    )
+    @app_commands.describe(
+        non_compliant="Non-compliant leaves in a rolling week/month before admins are alerted",
+        sick_leave="Sick leaves in a rolling week/month before admins are alerted"
+    )
+    async def leave_alert_settings(
+        self,
+        interaction: discord.Interaction,
+        non_compliant: app_commands.Range[int, 1, 31],
+        sick_leave: app_commands.Range[int, 1, 31]
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await is_admin(interaction.user.id) and not await is_super_admin(interaction.user.id):
+            await interaction.followup.send("❌ Only admins can update settings.", ephemeral=True)
+            return
+
+        try:
+            await SettingsModel.update_alert_thresholds(non_compliant, sick_leave)
+            await interaction.followup.send(
+                f"✅ Admins will be alerted at **{non_compliant}** non-compliant or **{sick_leave}** sick leave(s) "
+                f"within a rolling week or month.",
+                ephemeral=True
+            )
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+    
     # ==================== VIEW MY LEAVES ====================
     @app_commands.command(
         name="my_leaves",
@@ -124,6 +158,29 @@ class LeaveManagement(commands.Cog):
                 color=discord.Color.blue()
             )
             
+            # Approved/pending counts per type for this month and all time
+            today = datetime.now(pytz.UTC).date()
+            stats = await LeaveRequestModel.get_leave_stats(
+                user['user_id'],
+                {'month': (today.replace(day=1), today), 'all': None},
+                statuses=['approved', 'pending']
+            )
+            summary_types = {
+                "paid_leave": "💰 Paid",
+                "sick_leave": "🤒 Sick",
+                "non_compliant": "⚠️ Non-compliant",
+                "emergency_leave": "🚨 Emergency",
+                "unpaid_leave": "📝 Unpaid"
+            }
+            summary_lines = [
+                f"{label}: {stats['month']['by_type'].get(leave_type, 0)} this month / "
+                f"{stats['all']['by_type'].get(leave_type, 0)} total"
+                for leave_type, label in summary_types.items()
+                if stats['all']['by_type'].get(leave_type)
+            ]
+            if summary_lines:
+                embed.add_field(name="📊 Summary (approved + pending)", value="\n".join(summary_lines), inline=False)
+            
             status_emoji = {
                 "pending": "⏳",
                 "approved": "✅",
@@ -282,15 +339,16 @@ class LeaveManagement(commands.Cog):
                 )
                 return
             
-            embed = discord.Embed(
+            report = EmbedPacker(
                 title="📋 Pending Leave Requests - Review Required",
                 description=f"🔍 **Total Requests Awaiting Review:** `{len(pending_requests)}`\n\n"
                            f"Select one or multiple requests from the dropdown below to approve or reject them.",
-                color=0xFFA500  # Orange color
+                color=discord.Color(0xFFA500),  # Orange color
+                attachment_name="pending_leave_requests.txt"
             )
 
             # Add visual separator
-            embed.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
+            report.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
 
             for idx, req in enumerate(pending_requests, 1):
                 leave_type_display = {
@@ -336,14 +394,14 @@ class LeaveManagement(commands.Cog):
                 if idx < len(pending_requests):
                     field_value += "\n\n━━━━━━━━━━━━━━━━━━━━━━"
 
-                embed.add_field(
+                report.add_field(
                     name=f"🆔 Request #{req['leave_request_id']} - #{idx}",
                     value=field_value,
                     inline=False
                 )
             
             view = ReviewLeaveRequestsView(pending_requests, interaction.user.id)
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            await report.send(interaction, view=view)
         
         except Exception as e:
             await interaction.followup.send(
@@ -390,11 +448,14 @@ class LeaveManagement(commands.Cog):
                 limit
             )
 
-            # Create main embed with user info
-            embed = discord.Embed(
+            # Create main report with user info
+            report = EmbedPacker(
                 title=f"📋 Leave Information - {user_data['name']}",
                 description=f"**Discord:** {user.mention}\n**Department:** {user_data['department'] or 'N/A'}\n**Position:** {user_data['position'] or 'N/A'}",
-                color=discord.Color.blue()
+                color=discord.Color.blue(),
+                footer=f"Requested by {interaction.user.name}",
+                timestamp=datetime.now(pytz.UTC),
+                attachment_name=f"leave_history_{user_data['user_id']}.txt"
             )
 
             # Add pending leaves balance
@@ -406,7 +467,7 @@ class LeaveManagement(commands.Cog):
             else:
                 balance_color = "🔴"
 
-            embed.add_field(
+            report.add_field(
                 name="💼 Leave Balance",
                 value=(
                     f"{balance_color} **Pending Paid Leaves:** {pending_leaves} day(s)\n"
@@ -417,45 +478,39 @@ class LeaveManagement(commands.Cog):
 
             # Add leave history
             if not leave_requests:
-                embed.add_field(
+                report.add_field(
                     name="📜 Leave History",
                     value="No leave requests found.",
                     inline=False
                 )
             else:
-                # Count leave types
-                leave_stats = {
-                    'approved': 0,
-                    'pending': 0,
-                    'rejected': 0,
-                    'paid_leave': 0,
-                    'sick_leave': 0,
-                    'non_compliant': 0,
-                    'emergency_leave': 0
-                }
-
-                for req in leave_requests:
-                    leave_stats[req['status']] += 1
-                    if req['leave_type'] in leave_stats:
-                        leave_stats[req['leave_type']] += 1
+                # All-time and last-30-day counts in one query
+                today = datetime.now(pytz.UTC).date()
+                stats = await LeaveRequestModel.get_leave_stats(
+                    user_data['user_id'],
+                    {'all': None, 'month': (today - timedelta(days=29), today)}
+                )
+                by_status = stats['all']['by_status']
+                by_type = stats['all']['by_type']
 
-                embed.add_field(
-                    name="📊 Leave Statistics (Last 10 Requests)",
+                report.add_field(
+                    name="📊 Leave Statistics (All Requests)",
                     value=(
                         f"**Status:**\n"
-                        f"✅ Approved: {leave_stats['approved']}\n"
-                        f"⏳ Pending: {leave_stats['pending']}\n"
-                        f"❌ Rejected: {leave_stats['rejected']}\n\n"
+                        f"✅ Approved: {by_status.get('approved', 0)}\n"
+                        f"⏳ Pending: {by_status.get('pending', 0)}\n"
+                        f"❌ Rejected: {by_status.get('rejected', 0)}\n\n"
                         f"**Types:**\n"
-                        f"💰 Paid Leave: {leave_stats['paid_leave']}\n"
-                        f"🤒 Sick Leave: {leave_stats['sick_leave']}\n"
-                        f"⚠️ Non-compliant: {leave_stats['non_compliant']}\n"
-                        f"🚨 Emergency: {leave_stats['emergency_leave']}"
+                        f"💰 Paid Leave: {by_type.get('paid_leave', 0)}\n"
+                        f"🤒 Sick Leave: {by_type.get('sick_leave', 0)}\n"
+                        f"⚠️ Non-compliant: {by_type.get('non_compliant', 0)}\n"
+                        f"🚨 Emergency: {by_type.get('emergency_leave', 0)}\n\n"
+                        f"**Last 30 Days:** {stats['month']['total']} request(s)"
                     ),
                     inline=False
                 )
 
-                embed.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
+                report.add_field(name="\u200b", value="━━━━━━━━━━━━━━━━━━━━━━━━━━━━", inline=False)
 
                 # Show recent leave requests
                 status_emoji = {
@@ -464,7 +519,7 @@ class LeaveManagement(commands.Cog):
                     "rejected": "❌"
                 }
 
-                for idx, req in enumerate(leave_requests[:5], 1):  # Show only top 5 in detail
+                for idx, req in enumerate(leave_requests, 1):
                     leave_type_display = {
                         "non_compliant": "⚠️ Non-compliant",
                         "paid_leave": "💰 Paid Leave",
@@ -496,18 +551,86 @@ class LeaveManagement(commands.Cog):
                         f"**Requested:** {req['created_at'].strftime('%d/%m/%Y %H:%M')}"
                     )
 
-                    embed.add_field(
+                    report.add_field(
                         name=f"Request #{req['leave_request_id']}",
                         value=field_value,
                         inline=False
                     )
 
-                if len(leave_requests) > 5:
-                    embed.add_field(
-                        name="\u200b",
-                        value=f"*... and {len(leave_requests) - 5} more requests (use limit parameter to see more)*",
-                        inline=False
-                    )
+            await report.send(interaction)
+
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ An error occurred: {str(e)}",
+                ephemeral=True
+            )
+
+    # ==================== LEAVE LEDGER ====================
+    @app_commands.command(
+        name="leave_ledger",
+        description="[ADMIN] View the leave balance ledger of a user"
+    )
+    @app_commands.describe(
+        user="The user to view the ledger for",
+        limit="Number of recent entries to show (default: 15)"
+    )
+    async def leave_ledger(self, interaction: discord.Interaction, user: discord.Member, limit: int = 15):
+        """Show every change to a user's leave balance with a running total"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+            await interaction.followup.send(
+                "❌ Only ADMIN or SUPER ADMIN can view leave ledgers!",
+                ephemeral=True
+            )
+            return
+
+        try:
+            user_data = await UserModel.get_user_by_discord_id(user.id)
+
+            if not user_data:
+                await interaction.followup.send(
+                    f"❌ User {user.mention} is not registered in the system!",
+                    ephemeral=True
+                )
+                return
+
+            entries = await LeaveLedgerModel.get_user_ledger(user_data['user_id'], max(1, min(limit, 25)))
+
+            embed = discord.Embed(
+                title=f"📒 Leave Ledger - {user_data['name']}",
+                description=f"**Current Balance:** {user_data['pending_leaves']} day(s)",
+                color=discord.Color.blue()
+            )
+
+            entry_emoji = {
+                "opening": "🏁",
+                "accrual": "➕",
+                "deduction": "➖",
+                "adjustment": "✏️",
+                "reversal": "↩️"
+            }
+
+            if not entries:
+                embed.add_field(name="📜 Entries", value="No ledger entries found.", inline=False)
+
+            for entry in entries:
+                sign = "+" if entry['days'] >= 0 else ""
+                value = (
+                    f"**Change:** {sign}{entry['days']} day(s) → **Balance:** {entry['running_balance']}\n"
+                    f"**Date:** {entry['created_at'].strftime('%d/%m/%Y %H:%M')}"
+                )
+                if entry['created_by_name']:
+                    value += f" | **By:** {entry['created_by_name']}"
+                if entry['note']:
+                    value += f"\n{entry['note'][:200]}"
+
+                embed.add_field(
+                    name=f"{entry_emoji.get(entry['entry_type'], '❓')} #{entry['entry_id']} {entry['entry_type'].capitalize()}",
+                    value=value,
+                    inline=False
+                )
 
             embed.set_footer(text=f"Requested by {interaction.user.name}")
             embed.timestamp = datetime.now(pytz.UTC)
@@ -559,13 +682,16 @@ class LeaveManagement(commands.Cog):
             users_on_leave = await LeaveRequestModel.get_users_on_leave_for_date(date_obj)
             on_leave_user_ids = {user['user_id'] for user in users_on_leave}
             
-            # Separate present and absent
+            # Separate present, absent and day off (weekend/holiday for the user's department)
             absent_users = []
             present_users = []
+            day_off_users = []
             
             for user in all_users:
                 user_dict = dict(user)
-                if user_dict['user_id'] in on_leave_user_ids:
+                if not work_calendar.is_working_day(date_obj, user_dict['department']):
+                    day_off_users.append(user_dict)
+                elif user_dict['user_id'] in on_leave_user_ids:
                     # Find the leave details for this user
                     leave_info = next((u for u in users_on_leave if u['user_id'] == user_dict['user_id']), None)
                     absent_users.append({
@@ -575,17 +701,22 @@ class LeaveManagement(commands.Cog):
                 else:
                     present_users.append(user_dict)
             
-            # Create embed
-            embed = discord.Embed(
+            # Create report
+            report = EmbedPacker(
                 title=f"📊 Attendance Details - {date_obj.strftime('%d/%m/%Y')}",
-                description=f"**Total Employees:** {len(all_users)} | **Present:** {len(present_users)} | **Absent:** {len(absent_users)}",
-                color=discord.Color.blue()
+                description=(
+                    f"**Total Employees:** {len(all_users)} | **Present:** {len(present_users)} | "
+                    f"**Absent:** {len(absent_users)} | **Day Off:** {len(day_off_users)}"
+                ),
+                color=discord.Color.blue(),
+                footer=f"Requested by {interaction.user.name}",
+                attachment_name=f"attendance_{date_obj.isoformat()}.txt"
             )
             
             # Add absent users
             if absent_users:
                 absent_list = []
-                for item in absent_users[:20]:  # Limit to 20 to avoid embed limits
+                for item in absent_users:
                     user = item['user']
                     leave = item['leave_info']
                     
@@ -611,16 +742,9 @@ class LeaveManagement(commands.Cog):
                         f"  {leave_type_display} {status_emoji} | {leave_dates}"
                     )
                 
-                if len(absent_users) > 20:
-                    absent_list.append(f"\n*... and {len(absent_users) - 20} more*")
-                
-                embed.add_field(
-                    name=f"❌ Absent ({len(absent_users)})",
-                    value="\n".join(absent_list) if absent_list else "None",
-                    inline=False
-                )
+                report.add_lines(f"❌ Absent ({len(absent_users)})", absent_list)
             else:
-                embed.add_field(
+                report.add_field(
                     name=f"❌ Absent (0)",
                     value="No employees are on leave.",
                     inline=False
@@ -628,28 +752,21 @@ class LeaveManagement(commands.Cog):
             
             # Add present users
             if present_users:
-                present_list = []
-                for user in present_users[:20]:  # Limit to 20
-                    present_list.append(f"**{user['name']}** ({user['department'] or 'N/A'})")
-                
-                if len(present_users) > 20:
-                    present_list.append(f"\n*... and {len(present_users) - 20} more*")
-                
-                embed.add_field(
-                    name=f"✅ Present ({len(present_users)})",
-                    value="\n".join(present_list) if present_list else "None",
-                    inline=False
-                )
+                present_list = [f"**{user['name']}** ({user['department'] or 'N/A'})" for user in present_users]
+                report.add_lines(f"✅ Present ({len(present_users)})", present_list)
             else:
-                embed.add_field(
+                report.add_field(
                     name=f"✅ Present (0)",
                     value="No employees are present.",
                     inline=False
                 )
             
-            embed.set_footer(text=f"Requested by {interaction.user.name}")
+            # Add users with a day off (weekend or holiday)
+            if day_off_users:
+                day_off_list = [f"**{user['name']}** ({user['department'] or 'N/A'})" for user in day_off_users]
+                report.add_lines(f"🗓️ Day Off ({len(day_off_users)})", day_off_list)
             
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await report.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
@@ -660,4 +777,6 @@ class LeaveManagement(commands.Cog):
 
    
 async def setup(bot):
+    # The pending request picker is dispatched by custom_id, including lists sent before a restart
+    bot.add_dynamic_items(LeaveRequestSelect)
     await bot.add_cog(LeaveManagement(bot))
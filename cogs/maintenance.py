@@ -0,0 +1,488 @@
+"""Scheduled maintenance jobs and database diagnostics"""
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from datetime import datetime, timedelta, time as dt_time
+import logging
+import pytz
+from config import Config
+from models.time_tracking_model import TimeTrackingModel
+from models.screen_share_model import ScreenShareModel
+from models.leave_ledger_model import LeaveLedgerModel
+from models.admin_alert_model import AdminAlertModel
+from utils.database import db, summarize_plan, query_class
+from utils.embed_packer import EmbedPacker
+from utils.loop_monitor import loop_monitor
+from utils.rating_aggregates import rating_aggregates
+from utils.interaction_tracing import interaction_tracer, RESPONSE_DEADLINE_MS
+from utils.notifications import send_admin_dm
+from utils.send_queue import send_queue
+from utils.write_spool import write_spool
+from utils.verification_helper import is_admin, is_super_admin
+
+logger = logging.getLogger(__name__)
+
+
+class Maintenance(commands.Cog):
+    """Background jobs that keep attendance data consistent"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.reconcile_stats = None  # Drift metrics from the last screen share reconciliation
+        self.auto_close_open_days.start()
+        self.reconcile_screen_shares.start()
+        self.accrue_monthly_leave.start()
+        self.refresh_rating_aggregates.start()
+        self.send_admin_digest.start()
+
+    def cog_unload(self):
+        self.auto_close_open_days.cancel()
+        self.reconcile_screen_shares.cancel()
+        self.accrue_monthly_leave.cancel()
+        self.refresh_rating_aggregates.cancel()
+        self.send_admin_digest.cancel()
+
+    # ==================== NIGHTLY AUTO-CLOSE ====================
+    async def run_auto_close(self):
+        """Close all forgotten workdays before today and DM one summary to admins"""
+        today = datetime.now(pytz.utc).date()
+        cutoff_time = dt_time(Config.AUTO_CLOSE_CUTOFF_HOUR, 0)
+
+        result = await TimeTrackingModel.auto_close_open_days(today, cutoff_time)
+        closed_days = result['closed_days']
+
+        logger.info(
+            f"Auto-close: closed {len(closed_days)} workday(s), "
+            f"ended {result['sessions_ended']} screen share session(s)"
+        )
+
+        if closed_days or result['sessions_ended']:
+            await send_admin_dm(self.bot, self.build_auto_close_embed(result, cutoff_time))
+
+        return result
+
+    @staticmethod
+    def build_auto_close_embed(result, cutoff_time: dt_time) -> discord.Embed:
+        """Build the admin summary embed for an auto-close run"""
+        closed_days = result['closed_days']
+
+        embed = discord.Embed(
+            title="🌙 Nightly Auto-Close Summary",
+            description=(
+                f"**Workdays closed:** {len(closed_days)}\n"
+                f"**Screen share sessions ended:** {result['sessions_ended']}\n"
+                f"**Open sessions capped at:** {cutoff_time.strftime('%H:%M')} UTC"
+            ),
+            color=discord.Color.dark_blue()
+        )
+
+        if closed_days:
+            lines = []
+            for day in closed_days:
+                logged = day['time_logged_in'] or 0
+                marker = " ⏱️" if day['had_open_session'] else ""
+                lines.append(f"• **{day['name']}** - {day['present_date']} ({logged // 60}h {logged % 60}m){marker}")
+
+            # Keep within the embed field limit
+            value = ""
+            for index, line in enumerate(lines):
+                if len(value) + len(line) + 1 > 1000:
+                    value += f"\n…and {len(lines) - index} more"
+                    break
+                value += ("\n" if value else "") + line
+
+            embed.add_field(name="📋 Closed Workdays", value=value, inline=False)
+
+        embed.set_footer(text="⏱️ = last session was still open | Automated notification from Compliance Bot")
+        return embed
+
+    @tasks.loop(time=dt_time(Config.AUTO_CLOSE_RUN_HOUR, 5, tzinfo=pytz.utc))
+    async def auto_close_open_days(self):
+        try:
+            with query_class('maintenance'):
+                await self.run_auto_close()
+        except Exception as e:
+            logger.error(f"Nightly auto-close failed: {e}")
+
+    @auto_close_open_days.before_loop
+    async def before_auto_close_open_days(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(
+        name="close_open_days",
+        description="Close all forgotten workdays before today (Admin only)"
+    )
+    async def close_open_days(self, interaction: discord.Interaction):
+        """Run the nightly auto-close on demand"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        if not await is_admin(interaction.user.id) and not await is_super_admin(interaction.user.id):
+            await interaction.followup.send("❌ Only admins can close open workdays.", ephemeral=True)
+            return
+
+        try:
+            result = await self.run_auto_close()
+            await interaction.followup.send(
+                embed=self.build_auto_close_embed(result, dt_time(Config.AUTO_CLOSE_CUTOFF_HOUR, 0)),
+                ephemeral=True
+            )
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ An error occurred: {str(e)}",
+                ephemeral=True
+            )
+
+    # ==================== SCREEN SHARE RECONCILER ====================
+    async def run_screen_share_reconcile(self):
+        """End DB sessions whose users are no longer streaming in the voice channel"""
+        channel = self.bot.get_channel(Config.VOICE_CHANNEL_ID)
+        if channel is None:
+            logger.warning("Screen share reconcile skipped: voice channel not found")
+            return None
+
+        streaming_ids = [
+            member.id for member in channel.members
+            if member.voice and member.voice.self_stream
+        ]
+        started_before = datetime.now() - timedelta(minutes=Config.SCREEN_SHARE_ORPHAN_GRACE_MINUTES)
+
+        stats = await ScreenShareModel.end_orphaned_sessions(streaming_ids, started_before)
+        stats['streaming_members'] = len(streaming_ids)
+        stats['untracked_streamers'] = len(streaming_ids) - stats['tracked_streamers']
+        stats['checked_at'] = datetime.now(pytz.utc)
+        self.reconcile_stats = stats
+
+        if stats['orphans_ended'] or stats['untracked_streamers']:
+            logger.info(
+                f"Screen share reconcile: {stats['active_sessions']} active in DB, "
+                f"{stats['streaming_members']} streaming, ended {stats['orphans_ended']} orphan(s) "
+                f"({stats['orphaned_minutes']} min), {stats['untracked_streamers']} streaming without a session"
+            )
+
+        return stats
+
+    @tasks.loop(minutes=Config.SCREEN_SHARE_RECONCILE_MINUTES)
+    async def reconcile_screen_shares(self):
+        try:
+            with query_class('maintenance'):
+                await self.run_screen_share_reconcile()
+        except Exception as e:
+            logger.error(f"Screen share reconcile failed: {e}")
+
+    @reconcile_screen_shares.before_loop
+    async def before_reconcile_screen_shares(self):
+        await self.bot.wait_until_ready()
+
+    # ==================== MONTHLY LEAVE ACCRUAL ====================
+    @tasks.loop(time=dt_time(Config.AUTO_CLOSE_RUN_HOUR, 15, tzinfo=pytz.utc))
+    async def accrue_monthly_leave(self):
+        """Credit the monthly leave allowance on the 1st (safe to re-run, one credit per month)"""
+        today = datetime.now(pytz.utc).date()
+        if today.day != 1 or Config.LEAVE_MONTHLY_ACCRUAL_DAYS <= 0:
+            return
+
+        try:
+            with query_class('maintenance'):
+                credited = await LeaveLedgerModel.accrue_monthly(Config.LEAVE_MONTHLY_ACCRUAL_DAYS, today)
+            logger.info(f"Monthly leave accrual: credited {credited} user(s) with {Config.LEAVE_MONTHLY_ACCRUAL_DAYS} day(s)")
+        except Exception as e:
+            logger.error(f"Monthly leave accrual failed: {e}")
+
+    @accrue_monthly_leave.before_loop
+    async def before_accrue_monthly_leave(self):
+        await self.bot.wait_until_ready()
+
+    # ==================== RATING AGGREGATES ====================
+    @tasks.loop(minutes=Config.RATING_AGGREGATE_REFRESH_MINUTES)
+    async def refresh_rating_aggregates(self):
+        """Scheduled concurrent refresh (new ratings also trigger a debounced one)"""
+        try:
+            await rating_aggregates.refresh()
+        except Exception as e:
+            logger.error(f"Rating aggregates refresh failed: {e}")
+
+    @refresh_rating_aggregates.before_loop
+    async def before_refresh_rating_aggregates(self):
+        await self.bot.wait_until_ready()
+
+    # ==================== ADMIN ALERT DIGEST ====================
+    @staticmethod
+    def build_admin_digest(rows, as_of) -> EmbedPacker:
+        """One field per employee and alert type, high-severity first"""
+        alerts = sum(row['alerts'] for row in rows)
+        report = EmbedPacker(
+            title="📋 Daily Leave Alert Digest",
+            description=(
+                f"**{alerts}** alert(s) for **{len(rows)}** employee(s) since the last digest."
+                if rows else "✅ No leave threshold alerts since the last digest."
+            ),
+            color=discord.Color.red() if any(row['high_severity'] for row in rows) else discord.Color.orange(),
+            footer=f"Leave counts up to {as_of.strftime('%d/%m/%Y')} | 🔴 = high severity (also DMed when raised) | Automated notification from Compliance Bot",
+            timestamp=datetime.now(pytz.utc),
+            max_messages=1,
+            attachment_name=f"leave_alert_digest_{as_of.isoformat()}.txt"
+        )
+
+        labels = {'non_compliant': "Non-compliant", 'sick_leave': "Sick leave"}
+        for row in rows:
+            report.add_field(
+                name=f"{'🔴' if row['high_severity'] else '🟠'} {row['name']} - {labels.get(row['alert_type'], row['alert_type'])}",
+                value=(
+                    f"**Department:** {row['department'] or 'N/A'} | **Alerts:** {row['alerts']}\n"
+                    f"**Last 7 days:** {row['leaves_7d']} | **Last 30 days:** {row['leaves_30d']} "
+                    f"(peak reported {row['week_count']}/{row['month_count']})\n"
+                    f"**Latest Leave Date:** {row['latest_date'].strftime('%d/%m/%Y')}"
+                )
+            )
+        return report
+
+    async def run_admin_digest(self, send_empty: bool = False) -> dict:
+        """DM the pending alerts to every admin as one digest and mark them digested"""
+        as_of = datetime.now(pytz.utc).date()
+        rows = await AdminAlertModel.get_pending_digest(as_of)
+        if not rows and not send_empty:
+            return {'employees': 0, 'alerts': 0, 'admins': 0}
+
+        message = self.build_admin_digest(rows, as_of).pack()[0]
+        admins = await send_admin_dm(self.bot, embeds=message['embeds'], attachment=message['attachment'])
+
+        # Only events read above: alerts raised while sending wait for the next digest
+        if rows and admins:
+            await AdminAlertModel.mark_digested([event_id for row in rows for event_id in row['event_ids']])
+
+        alerts = sum(row['alerts'] for row in rows)
+        logger.info(f"Admin digest: {alerts} alert(s) for {len(rows)} employee(s) queued to {admins} admin(s)")
+        return {'employees': len(rows), 'alerts': alerts, 'admins': admins}
+
+    @tasks.loop(time=dt_time(Config.ADMIN_DIGEST_HOUR, Config.ADMIN_DIGEST_MINUTE, tzinfo=pytz.utc))
+    async def send_admin_digest(self):
+        try:
+            await self.run_admin_digest()
+        except Exception as e:
+            logger.error(f"Admin alert digest failed: {e}")
+
+    @send_admin_digest.before_loop
+    async def before_send_admin_digest(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(
+        name="alert_digest",
+        description="Preview or send the pending leave alert digest (Admin only)"
+    )
+    @app_commands.describe(send="Send the digest to all admins now instead of only previewing it")
+    async def alert_digest(self, interaction: discord.Interaction, send: bool = False):
+        """Show the alerts collected since the last digest, or send the digest now"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        if not await is_admin(interaction.user.id) and not await is_super_admin(interaction.user.id):
+            await interaction.followup.send("❌ Only admins can view the alert digest.", ephemeral=True)
+            return
+
+        try:
+            if send:
+                result = await self.run_admin_digest(send_empty=True)
+                await interaction.followup.send(
+                    f"✅ Digest with {result['alerts']} alert(s) for {result['employees']} employee(s) "
+                    f"queued to {result['admins']} admin(s).",
+                    ephemeral=True
+                )
+                return
+
+            as_of = datetime.now(pytz.utc).date()
+            rows = await AdminAlertModel.get_pending_digest(as_of)
+            await self.build_admin_digest(rows, as_of).send(interaction)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    # ==================== SLOW QUERIES ====================
+    @app_commands.command(
+        name="slow_queries",
+        description="Show the slowest captured database statements (Admin only)"
+    )
+    @app_commands.describe(limit="Number of statements to show (default: 5)")
+    async def slow_queries(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, 10] = 5):
+        """List captured slow statements grouped by normalized SQL, with plan highlights"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        if not await is_admin(interaction.user.id) and not await is_super_admin(interaction.user.id):
+            await interaction.followup.send("❌ Only admins can view slow queries.", ephemeral=True)
+            return
+
+        try:
+            groups = db.slow_queries.top(limit)
+
+            embed = discord.Embed(
+                title="🐢 Slow Queries",
+                description=(
+                    f"Statements slower than **{Config.DB_SLOW_QUERY_MS} ms**, "
+                    f"grouped and ranked by total time ({len(db.slow_queries.entries)} captured)."
+                    if Config.DB_SLOW_QUERY_MS > 0 else "Slow query capture is disabled (DB_SLOW_QUERY_MS=0)."
+                ),
+                color=discord.Color.orange()
+            )
+
+            if not groups and Config.DB_SLOW_QUERY_MS > 0:
+                embed.add_field(name="✅ Nothing captured", value="No statement crossed the threshold yet.", inline=False)
+
+            for index, group in enumerate(groups, 1):
+                plan_notes = summarize_plan(group['plan'])[:4]
+                value = (
+                    f"```sql\n{group['statement'][:350]}\n```"
+                    f"**Runs:** {group['count']} | **Avg:** {group['avg_ms']:.0f} ms | **Max:** {group['max_ms']:.0f} ms\n"
+                    f"**Params:** {', '.join(group['param_types']) or 'none'}\n"
+                )
+                if group['labels']:
+                    value += f"**From:** {', '.join(sorted(group['labels']))[:150]}\n"
+                if plan_notes:
+                    value += "**Plan:** " + " → ".join(plan_notes)
+                elif group['plan'] is None:
+                    value += "**Plan:** not captured"
+                embed.add_field(name=f"#{index} - {group['total_ms']:.0f} ms total", value=value[:1024], inline=False)
+
+            embed.set_footer(text="Plans are captured with EXPLAIN (no ANALYZE); seq scans and sorts point at missing indexes")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    # ==================== BOT HEALTH ====================
+    @app_commands.command(
+        name="bot_health",
+        description="Show event loop lag, blocking callbacks and response times (Admin only)"
+    )
+    @app_commands.describe(show_stacks="Include the stack of the most recent blocking callback")
+    async def health(self, interaction: discord.Interaction, show_stacks: bool = False):
+        """Event loop lag percentiles, blocking callbacks, time to first response and gateway latency"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        if not await is_admin(interaction.user.id) and not await is_super_admin(interaction.user.id):
+            await interaction.followup.send("❌ Only admins can view bot health.", ephemeral=True)
+            return
+
+        try:
+            health = loop_monitor.snapshot()
+            lag = health['lag_ms']
+            p99 = lag['p99']
+
+            embed = discord.Embed(
+                title="🩺 Bot Health",
+                color=discord.Color.green() if p99 < 100 else discord.Color.orange() if p99 < 500 else discord.Color.red()
+            )
+
+            if health['running']:
+                embed.add_field(
+                    name=f"⏱️ Loop Lag (last {health['window_seconds'] / 60:.0f} min)",
+                    value=(
+                        f"**p50:** {lag['p50']:.1f} ms | **p95:** {lag['p95']:.1f} ms\n"
+                        f"**p99:** {p99:.1f} ms | **max:** {lag['p100']:.1f} ms\n"
+                        f"**Samples:** {health['samples']}"
+                    ),
+                    inline=False
+                )
+            else:
+                embed.add_field(name="⏱️ Loop Lag", value="Loop monitor is disabled (LOOP_MONITOR_ENABLED).", inline=False)
+
+            embed.add_field(name="🌐 Gateway Latency", value=f"{self.bot.latency * 1000:.0f} ms", inline=True)
+
+            embed.add_field(
+                name="🐢 Slow Queries",
+                value=f"{len(db.slow_queries.entries)} captured (`/slow_queries`)",
+                inline=True
+            )
+            database = db.health()
+            db_stats = database['stats']
+            state_labels = {'closed': "✅ Closed", 'half_open': "🟡 Half-open", 'open': "🔴 Open (failing fast)"}
+            embed.add_field(
+                name="🛢️ Database",
+                value=(
+                    f"**Circuit:** {state_labels.get(database['state'], database['state'])} "
+                    f"(opened {database['opened']}x, {database['failures']} failure(s) in a row)\n"
+                    f"**Pool:** {database['pool_size'] - database['pool_idle']} busy / {database['pool_size']} open "
+                    f"(max {database['pool_max']})"
+                    + (f" | **Ping:** {database['last_health_ms']:.0f} ms" if database['last_health_ms'] is not None else "")
+                    + f"\n**Retries:** {db_stats.get('retries', 0)} | **Acquire timeouts:** {db_stats.get('acquire_timeouts', 0)} "
+                    f"| **Connect timeouts:** {db_stats.get('connect_timeouts', 0)} "
+                    f"| **Statement timeouts:** {db_stats.get('statement_timeouts', 0)} "
+                    f"| **Command timeouts:** {db_stats.get('command_timeouts', 0)} | **Failed fast:** {db_stats.get('fast_failures', 0)}"
+                    + (f"\n**Last error:** {database['last_error'][:200]}" if database['last_error'] else "")
+                ),
+                inline=False
+            )
+
+            blocks = loop_monitor.recent_blocks(5)
+            if blocks:
+                lines = [
+                    f"`{block['detected_at'].strftime('%H:%M:%S')}` **{block['duration_ms']:.0f} ms** in `{block['location']}`"
+                    for block in blocks
+                ]
+                embed.add_field(
+                    name=f"🧱 Blocking Callbacks ({health['blocks_in_window']} in window, >{Config.LOOP_BLOCK_THRESHOLD_MS} ms)",
+                    value="\n".join(lines)[:1024],
+                    inline=False
+                )
+                if show_stacks:
+                    stack = "".join(blocks[0]['stack'])
+                    embed.add_field(name="📚 Latest Stack", value=f"```\n{stack[-1000:]}\n```", inline=False)
+            else:
+                embed.add_field(name="🧱 Blocking Callbacks", value="✅ None captured", inline=False)
+
+            queue = send_queue.snapshot()
+            dropped = sum(queue['dropped'].values())
+            embed.add_field(
+                name="📬 Outbound Queue",
+                value=(
+                    f"**Depth:** {queue['depth']} ({queue['destinations']} destination(s), max {queue['max_depth']})\n"
+                    f"**Sent:** {queue['stats'].get('sent', 0)} in {queue['stats'].get('messages', 0)} message(s) "
+                    f"({queue['stats'].get('coalesced', 0)} coalesced) | **Retries:** {queue['stats'].get('retries', 0)}\n"
+                    f"**Dropped:** {dropped}"
+                    + (" (" + ", ".join(f"{reason}: {count}" for reason, count in queue['dropped'].items()) + ")" if dropped else "")
+                    + (f"\n**p95 wait:** {queue['p95_wait_seconds']:.1f}s" if queue['p95_wait_seconds'] is not None else "")
+                ),
+                inline=False
+            )
+
+            spool = await write_spool.snapshot()
+            if spool['pending'] or spool['failed'] or spool['stats']:
+                oldest = spool['oldest_pending']
+                embed.add_field(
+                    name="🗃️ Write Spool (offline clock events)",
+                    value=(
+                        f"**Waiting:** {spool['pending']} ({spool['users']} user(s))"
+                        + (f", oldest <t:{int(oldest.timestamp())}:R>" if oldest else "")
+                        + f" | **Failed:** {spool['failed']}\n"
+                        f"**Spooled:** {spool['stats'].get('spooled', 0)} | **Replayed:** {spool['stats'].get('replayed', 0)} "
+                        f"| **Retries:** {spool['stats'].get('retries', 0)} | **Refused (full):** {spool['stats'].get('full', 0)}\n"
+                        f"**Disk:** {spool['disk_bytes'] / 1024:.0f} KB of {spool['max_bytes'] / 1024 / 1024:.0f} MB"
+                        + (f" | **p95 replay lag:** {spool['p95_replay_lag_seconds']:.0f}s" if spool['p95_replay_lag_seconds'] is not None else "")
+                        + (f"\n**Last error:** {spool['last_error'][:200]}" if spool['last_error'] else "")
+                    ),
+                    inline=False
+                )
+
+            handlers = [h for h in interaction_tracer.slowest(5) if h['p95_ms'] is not None or h['missed']]
+            if handlers:
+                lines = [
+                    f"`{h['label']}` p95 **{h['p95_ms'] or 0:.0f} ms** ({h['count']} runs"
+                    + (f", {h['near_deadline']} near deadline" if h['near_deadline'] else "")
+                    + (f", {h['missed']} missed" if h['missed'] else "") + ")"
+                    for h in handlers
+                ]
+                embed.add_field(
+                    name=f"📨 Slowest First Response (deadline {RESPONSE_DEADLINE_MS} ms)",
+                    value="\n".join(lines)[:1024],
+                    inline=False
+                )
+
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Maintenance(bot))
@@ -2,13 +2,20 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from config import Config
+from datetime import datetime
 from models import ScreenShareModel, UserModel
+from utils.write_spool import write_spool, spool_interaction_event, SpoolRejected
+import pytz
 
 class ScreenShare(commands.Cog):
     """Screen sharing management commands"""
     
     def __init__(self, bot):
         self.bot = bot
+        
+        # Screen share events saved while the database was unreachable are replayed through these
+        write_spool.register('screen_share_on', self.replay_screen_share_on)
+        write_spool.register('screen_share_off', self.replay_screen_share_off)
     
     @app_commands.command(
         name="screen_share_on",
@@ -20,18 +27,25 @@ class ScreenShare(commands.Cog):
         
         await interaction.response.defer(ephemeral=True)
         
-        # Check if user is registered
-        user = await UserModel.get_user_by_discord_id(interaction.user.id)
-        if not user:
-            await interaction.followup.send(
-                "❌ You are not registered! Use `/user_register` first.",
-                ephemeral=True
-            )
-            return
-        
+        # Taken before any database call, so an event spooled during an outage keeps its time
+        utc_time = datetime.now(pytz.utc)
         channel = self.bot.get_channel(Config.VOICE_CHANNEL_ID)
         
         try:
+            if write_spool.has_pending(interaction.user.id):
+                # Earlier events of this user still wait for replay: queue behind them
+                await spool_interaction_event(interaction, 'screen_share_on', {'reason': reason}, utc_time, "screen share start")
+                return
+            
+            # Check if user is registered
+            user = await UserModel.get_user_by_discord_id(interaction.user.id)
+            if not user:
+                await interaction.followup.send(
+                    "❌ You are not registered! Use `/user_register` first.",
+                    ephemeral=True
+                )
+                return
+            
             # Check if user already has an active session
             active_session = await ScreenShareModel.get_active_session_by_user(user['user_id'])
             if active_session:
@@ -57,6 +71,9 @@ class ScreenShare(commands.Cog):
             await self.send_screen_share_on_instructions(interaction, channel, session_id)
             
         except Exception as e:
+            if write_spool.is_unavailable(e):
+                await spool_interaction_event(interaction, 'screen_share_on', {'reason': reason}, utc_time, "screen share start")
+                return
             await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
@@ -103,7 +120,15 @@ class ScreenShare(commands.Cog):
         
         await interaction.response.defer(ephemeral=True)
         
+        # Taken before any database call, so an event spooled during an outage keeps its time
+        utc_time = datetime.now(pytz.utc)
+        
         try:
+            if write_spool.has_pending(interaction.user.id):
+                # Earlier events of this user still wait for replay: queue behind them
+                await spool_interaction_event(interaction, 'screen_share_off', {'reason': reason}, utc_time, "screen share stop")
+                return
+            
             # Get user from database
             user = await UserModel.get_user_by_discord_id(interaction.user.id)
 
@@ -147,6 +172,9 @@ class ScreenShare(commands.Cog):
         
             
         except Exception as e:
+            if write_spool.is_unavailable(e):
+                await spool_interaction_event(interaction, 'screen_share_off', {'reason': reason}, utc_time, "screen share stop")
+                return
             await interaction.followup.send(
                 f"❌ An error occurred: {str(e)}",
                 ephemeral=True
@@ -187,6 +215,52 @@ class ScreenShare(commands.Cog):
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
+    # ==================== OFFLINE SPOOL REPLAY ====================
+    async def replay_screen_share_on(self, discord_id: int, payload: dict, recorded_at: datetime):
+        """Start a spooled session at its original time (skipped if it already landed)"""
+        user = await UserModel.get_user_by_discord_id(discord_id)
+        if not user:
+            raise SpoolRejected("you are not registered")
+        
+        # Sessions are stored in server local time
+        started_at = recorded_at.astimezone().replace(tzinfo=None)
+        active_session = await ScreenShareModel.get_active_session_by_user(user['user_id'])
+        if active_session:
+            if active_session['screen_share_on_time'] == started_at:
+                return None  # Written before the outage was noticed
+            raise SpoolRejected("you already had an active screen share session")
+        
+        session_id = await ScreenShareModel.start_session(
+            user_id=user['user_id'],
+            time_tracking_id=0,  # Same placeholder as /screen_share_on
+            reason=payload['reason'],
+            started_at=started_at
+        )
+        return f"✅ Your screen share start at **{recorded_at.strftime('%I:%M %p')} UTC** has been recorded (Session ID: {session_id})."
+    
+    async def replay_screen_share_off(self, discord_id: int, payload: dict, recorded_at: datetime):
+        """End the active session at the spooled time (skipped if it already landed)"""
+        user = await UserModel.get_user_by_discord_id(discord_id)
+        if not user:
+            raise SpoolRejected("you are not registered")
+        
+        ended_at = recorded_at.astimezone().replace(tzinfo=None)
+        active_session = await ScreenShareModel.get_active_session_by_user(user['user_id'])
+        if not active_session:
+            last_sessions = await ScreenShareModel.get_user_history(user['user_id'], 1)
+            if last_sessions and last_sessions[0]['screen_share_off_time'] == ended_at:
+                return None  # Written before the outage was noticed
+            raise SpoolRejected("you had no active screen share session")
+        if active_session['screen_share_on_time'] > ended_at:
+            raise SpoolRejected("your active screen share session started after that time")
+        
+        await ScreenShareModel.end_session(
+            session_id=active_session['session_id'],
+            reason=payload['reason'],
+            ended_at=ended_at
+        )
+        return f"✅ Your screen share stop at **{recorded_at.strftime('%I:%M %p')} UTC** has been recorded."
+    
     @app_commands.command(
         name="screen_share_status",
         description="Check screen share channel status"
@@ -274,6 +348,20 @@ class ScreenShare(commands.Cog):
                     inline=False
                 )
             
+            # Show drift found by the last background reconciliation
+            maintenance = self.bot.get_cog('Maintenance')
+            stats = maintenance.reconcile_stats if maintenance else None
+            if stats:
+                embed.add_field(
+                    name="🔄 Last Reconciliation",
+                    value=(
+                        f"**Checked:** <t:{int(stats['checked_at'].timestamp())}:R>\n"
+                        f"**Orphans Ended:** {stats['orphans_ended']} ({stats['orphaned_minutes']} mins)\n"
+                        f"**Streaming Without Session:** {stats['untracked_streamers']}"
+                    ),
+                    inline=False
+                )
+            
             await interaction.followup.send(embed=embed, ephemeral=True)
             
         except Exception as e:
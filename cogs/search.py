@@ -0,0 +1,104 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from datetime import datetime
+from typing import List
+from models.user_model import UserModel
+from views.search_views import SearchResultsView
+from utils.autocomplete import autocomplete_index
+from utils.verification_helper import is_admin, is_super_admin
+
+
+class Search(commands.Cog):
+    """Full-text search across leave reasons, work plans, late reasons and rating feedback"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(
+        name="search",
+        description="Search leave reasons, work plans, late reasons and rating feedback (ADMIN+)"
+    )
+    @app_commands.describe(
+        query="Words to search for (supports \"quoted phrases\", OR and -exclude)",
+        user="Only show results for this user",
+        department="Only show results for this department",
+        from_date="Start date (DD/MM/YYYY)",
+        to_date="End date (DD/MM/YYYY)"
+    )
+    async def search(
+        self,
+        interaction: discord.Interaction,
+        query: str,
+        user: discord.Member = None,
+        department: str = None,
+        from_date: str = None,
+        to_date: str = None
+    ):
+        """Search free-text fields and show ranked, paginated results"""
+
+        await interaction.response.defer(ephemeral=True)
+
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+            await interaction.followup.send(
+                "❌ Only ADMIN or SUPER ADMIN can search records!",
+                ephemeral=True
+            )
+            return
+
+        try:
+            # Parse dates
+            try:
+                start_date = datetime.strptime(from_date, '%d/%m/%Y').date() if from_date else None
+                end_date = datetime.strptime(to_date, '%d/%m/%Y').date() if to_date else None
+            except ValueError:
+                await interaction.followup.send(
+                    "❌ Invalid date format! Please use DD/MM/YYYY format.",
+                    ephemeral=True
+                )
+                return
+
+            user_id = None
+            if user:
+                user_data = await UserModel.get_user_by_discord_id(user.id, include_deleted=True)
+                if not user_data:
+                    await interaction.followup.send(
+                        f"❌ {user.mention} is not registered!",
+                        ephemeral=True
+                    )
+                    return
+                user_id = user_data['user_id']
+
+            filters = {
+                'user_id': user_id,
+                'department': department,
+                'start_date': start_date,
+                'end_date': end_date
+            }
+            view = SearchResultsView(query, filters)
+            rows = await view.fetch_page()
+
+            if not rows:
+                await interaction.followup.send(
+                    f"📋 No results found for **{query}**.",
+                    ephemeral=True
+                )
+                return
+
+            view.update_buttons()
+            await interaction.followup.send(embed=view.build_embed(rows), view=view, ephemeral=True)
+
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ An error occurred: {str(e)}",
+                ephemeral=True
+            )
+
+    @search.autocomplete('department')
+    async def department_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest known departments from the in-memory index"""
+        return autocomplete_index.department_choices(current)
+
+
+async def setup(bot):
+    await bot.add_cog(Search(bot))
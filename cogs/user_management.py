@@ -9,6 +9,7 @@ from views.user_management_views import (
 )
 from utils.verification_helper import check_user_permission, is_super_admin, is_admin
 from utils.database import db
+from utils.embed_packer import EmbedPacker
 
 class UserManagement(commands.Cog):
     def __init__(self, bot):
@@ -323,25 +324,23 @@ class UserManagement(commands.Cog):
                     await inter.response.send_message("❌ No users found in the system!", ephemeral=True)
                     return
                 
-                embed = discord.Embed(
+                report = EmbedPacker(
                     title=f"📋 User List ({len(users)} users)",
                     description="All users in the system:",
-                    color=discord.Color.blue()
+                    color=discord.Color.blue(),
+                    attachment_name="users.txt"
                 )
                 
-                for user in users[:25]:  # Discord embed field limit
+                for user in users:
                     role_name = {1: "SUPER", 2: "ADMIN", 3: "NORMAL"}.get(user['role_id'], "NORMAL")
                     status = "🔴" if user['is_deleted'] else "🟢"
-                    embed.add_field(
+                    report.add_field(
                         name=f"{status} {user['name']}",
                         value=f"ID: `{user['user_id']}` | Role: {role_name} | Dept: {user['department'] or 'N/A'}",
                         inline=False
                     )
                 
-                if len(users) > 25:
-                    embed.set_footer(text=f"Showing 25 of {len(users)} users")
-                
-                await inter.response.send_message(embed=embed, ephemeral=True)
+                await report.send(inter)
             
             modal = ActiveAllUsersModal(list_callback)
             await interaction.response.send_modal(modal)
@@ -358,24 +357,22 @@ class UserManagement(commands.Cog):
                 await interaction.followup.send("❌ No users found in the system!", ephemeral=True)
                 return
             
-            embed = discord.Embed(
+            report = EmbedPacker(
                 title=f"📋 Active Users ({len(users)} users)",
                 description="All active users in the system:",
-                color=discord.Color.blue()
+                color=discord.Color.blue(),
+                attachment_name="users.txt"
             )
             
-            for user in users[:25]:  # Discord embed field limit
+            for user in users:
                 role_name = {1: "SUPER", 2: "ADMIN", 3: "NORMAL"}.get(user['role_id'], "NORMAL")
-                embed.add_field(
+                report.add_field(
                     name=f"🟢 {user['name']}",
                     value=f"ID: `{user['user_id']}` | Role: {role_name} | Dept: {user['department'] or 'N/A'}",
                     inline=False
                 )
             
-            if len(users) > 25:
-                embed.set_footer(text=f"Showing 25 of {len(users)} users")
-            
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await report.send(interaction)
         
         else:
             await interaction.response.send_message(
@@ -409,44 +406,8 @@ class UserManagement(commands.Cog):
                 )
                 return
             
-            # Fetch first page
-            logs = await UserModel.get_delete_logs(limit=15, offset=0)
-            
-            # Create pagination view
             view = DeleteLogsPaginationView(total_count=total_count, per_page=15)
-            
-            # Create embed for first page
-            embed = discord.Embed(
-                title=f"🗑️ User Deletion Logs",
-                description=f"**Total Logs:** {total_count} | **Page:** 1/{view.total_pages}",
-                color=discord.Color.red(),
-                timestamp=datetime.now()
-            )
-            
-            for log in logs:
-                deleted_user_mention = f"<@{log['deleted_user_discord_id']}>" if log['deleted_user_discord_id'] else "Unknown"
-                deleted_by_mention = f"<@{log['deleted_by_discord_id']}>" if log['deleted_by_discord_id'] else "Unknown"
-                
-                field_value = (
-                    f"**Deleted User:** {deleted_user_mention} ({log['deleted_user_name'] or 'N/A'})\n"
-                    f"**Department:** {log['deleted_user_department'] or 'N/A'}\n"
-                    f"**Deleted By:** {deleted_by_mention} ({log['deleted_by_name'] or 'N/A'})\n"
-                    f"**Reason:** {log['reason'] or 'No reason provided'}\n"
-                    f"**Seniors Informed:** {'✅ Yes' if log['seniors_informed'] else '❌ No'} | "
-                    f"**Admins Informed:** {'✅ Yes' if log['admins_informed'] else '❌ No'} | "
-                    f"**Is With Us:** {'✅ Yes' if log['is_with_us'] else '❌ No'}\n"
-                    f"**Deleted At:** <t:{int(log['deleted_at'].timestamp())}:F>"
-                )
-                
-                embed.add_field(
-                    name=f"Log ID: {log['id']} | User ID: {log['deleted_user_id'] or 'N/A'}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"Showing logs 1-{min(15, total_count)} of {total_count}")
-            
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            await view.send(interaction)
             
         except Exception as e:
             await interaction.followup.send( 
@@ -37,67 +37,8 @@ class UserUpdateLogs(commands.Cog):
                 )
                 return
             
-            # Fetch first page
-            logs = await UserModel.get_update_logs(limit=15, offset=0)
-            
-            # Create pagination view
             view = UpdateLogsPaginationView(total_count=total_count, per_page=15)
-            
-            # Create embed for first page
-            embed = discord.Embed(
-                title=f"📝 Update Logs - All Users",
-                description=f"**Total Logs:** {total_count} | **Page:** 1/{view.total_pages}",
-                color=discord.Color.gold(),
-                timestamp=datetime.now()
-            )
-            
-            for log in logs:
-                updated_user_mention = f"<@{log['updated_user_discord_id']}>" if log['updated_user_discord_id'] else "Unknown"
-                updated_by_mention = f"<@{log['updated_by_discord_id']}>" if log['updated_by_discord_id'] else "Unknown"
-                
-                # Parse JSON values
-                old_values = json.loads(log['old_values']) if log['old_values'] else {}
-                new_values = json.loads(log['new_values']) if log['new_values'] else {}
-                
-                # Build field changes text
-                changes_text = []
-                if log['fields_updated']:
-                    for field in log['fields_updated']:
-                        old_val = old_values.get(field, 'N/A')
-                        new_val = new_values.get(field, 'N/A')
-                        changes_text.append(f"**{field}:** `{old_val}` → `{new_val}`")
-                
-                # Build permission changes text
-                perm_changes = []
-                if log['permissions_added']:
-                    perm_changes.append(f"✅ Added: {len(log['permissions_added'])} permission(s)")
-                if log['permissions_removed']:
-                    perm_changes.append(f"❌ Removed: {len(log['permissions_removed'])} permission(s)")
-                
-                field_value = (
-                    f"**Updated User:** {updated_user_mention} ({log['updated_user_name'] or 'N/A'})\n"
-                    f"**Updated By:** {updated_by_mention} ({log['updated_by_name'] or 'N/A'})\n"
-                    f"**Department:** {log['updated_user_department'] or 'N/A'}\n"
-                    f"**Update Type:** {log['update_type']}\n"
-                )
-                
-                if changes_text:
-                    field_value += f"**Changes:**\n" + "\n".join(changes_text) + "\n"
-                
-                if perm_changes:
-                    field_value += "**Permissions:**\n" + "\n".join(perm_changes) + "\n"
-                
-                field_value += f"**Updated At:** <t:{int(log['updated_at'].timestamp())}:f>"
-                
-                embed.add_field(
-                    name=f"Log ID: {log['id']} | User ID: {log['updated_user_id']}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"Showing logs 1-{min(15, total_count)} of {total_count}")
-            
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            await view.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
@@ -140,76 +81,13 @@ class UserUpdateLogs(commands.Cog):
                 )
                 return
             
-            # Fetch first page
-            logs = await UserModel.get_update_logs_by_user(
-                user_id=user_data['user_id'],
-                limit=15,
-                offset=0
-            )
-            
-            # Create pagination view
             view = UpdateLogsPaginationView(
                 total_count=total_count,
                 per_page=15,
-                user_id=user_data['user_id']
-            )
-            
-            # Create embed for first page
-            embed = discord.Embed(
-                title=f"📝 Update Logs - {user_data['name']}",
-                description=f"**Total Logs:** {total_count} | **Page:** 1/{view.total_pages}",
-                color=discord.Color.gold(),
-                timestamp=datetime.now()
+                user_id=user_data['user_id'],
+                thumbnail_url=user.display_avatar.url
             )
-            
-            for log in logs:
-                updated_user_mention = f"<@{log['updated_user_discord_id']}>" if log['updated_user_discord_id'] else "Unknown"
-                updated_by_mention = f"<@{log['updated_by_discord_id']}>" if log['updated_by_discord_id'] else "Unknown"
-                
-                # Parse JSON values
-                old_values = json.loads(log['old_values']) if log['old_values'] else {}
-                new_values = json.loads(log['new_values']) if log['new_values'] else {}
-                
-                # Build field changes text
-                changes_text = []
-                if log['fields_updated']:
-                    for field in log['fields_updated']:
-                        old_val = old_values.get(field, 'N/A')
-                        new_val = new_values.get(field, 'N/A')
-                        changes_text.append(f"**{field}:** `{old_val}` → `{new_val}`")
-                
-                # Build permission changes text
-                perm_changes = []
-                if log['permissions_added']:
-                    perm_changes.append(f"✅ Added: {len(log['permissions_added'])} permission(s)")
-                if log['permissions_removed']:
-                    perm_changes.append(f"❌ Removed: {len(log['permissions_removed'])} permission(s)")
-                
-                field_value = (
-                    f"**Updated User:** {updated_user_mention} ({log['updated_user_name'] or 'N/A'})\n"
-                    f"**Updated By:** {updated_by_mention} ({log['updated_by_name'] or 'N/A'})\n"
-                    f"**Department:** {log['updated_user_department'] or 'N/A'}\n"
-                    f"**Update Type:** {log['update_type']}\n"
-                )
-                
-                if changes_text:
-                    field_value += f"**Changes:**\n" + "\n".join(changes_text) + "\n"
-                
-                if perm_changes:
-                    field_value += "**Permissions:**\n" + "\n".join(perm_changes) + "\n"
-                
-                field_value += f"**Updated At:** <t:{int(log['updated_at'].timestamp())}:f>"
-                
-                embed.add_field(
-                    name=f"Log ID: {log['id']} | User ID: {log['updated_user_id']}",
-                    value=field_value,
-                    inline=False
-                )
-            
-            embed.set_footer(text=f"Showing logs 1-{min(15, total_count)} of {total_count}")
-            embed.set_thumbnail(url=user.display_avatar.url)
-            
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            await view.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
@@ -0,0 +1,445 @@
+"""Working calendar commands: holidays, department weekends, shifts and monthly hours"""
+import discord
+from discord import app_commands
+from discord.ext import commands
+from datetime import datetime, timedelta
+from typing import List
+from config import Config
+from models.calendar_model import CalendarModel
+from models.leave_model import LeaveRequestModel
+from models.settings_model import SettingsModel
+from models.shift_model import ShiftModel
+from models.time_tracking_model import TimeTrackingModel
+from models.user_model import UserModel
+from utils.autocomplete import autocomplete_index
+from utils.embed_packer import EmbedPacker
+from utils.verification_helper import is_admin, is_super_admin
+from utils.shift_schedule import shift_schedules
+from utils.work_calendar import work_calendar
+import pytz
+
+WEEKDAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+class WorkCalendar(commands.Cog):
+    """Holidays, weekends, shifts and expected working hours"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def _check_admin(self, interaction: discord.Interaction) -> bool:
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
+            await interaction.followup.send(
+                "❌ Only ADMIN or SUPER ADMIN can manage the working calendar!",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    # ==================== HOLIDAYS ====================
+    @app_commands.command(
+        name="add_holiday",
+        description="Add a holiday to the working calendar (ADMIN+)"
+    )
+    @app_commands.describe(
+        date="Holiday date (DD/MM/YYYY)",
+        name="Holiday name",
+        department="Only for this department (leave empty for company-wide)"
+    )
+    async def add_holiday(self, interaction: discord.Interaction, date: str, name: str, department: str = None):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            try:
+                holiday_date = datetime.strptime(date, '%d/%m/%Y').date()
+            except ValueError:
+                await interaction.followup.send("❌ Invalid date format! Please use DD/MM/YYYY format.", ephemeral=True)
+                return
+
+            admin_user = await UserModel.get_user_by_discord_id(interaction.user.id)
+            holiday_id = await CalendarModel.add_holiday(
+                holiday_date, name, department, created_by=admin_user['user_id'] if admin_user else None
+            )
+
+            if not holiday_id:
+                await interaction.followup.send(
+                    f"⚠️ A holiday already exists on **{holiday_date.strftime('%d/%m/%Y')}** for "
+                    f"{department or 'the whole company'}.",
+                    ephemeral=True
+                )
+                return
+
+            await interaction.followup.send(
+                f"✅ Holiday **#{holiday_id} {name}** added on **{holiday_date.strftime('%d/%m/%Y')}** "
+                f"({department or 'company-wide'}).",
+                ephemeral=True
+            )
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(
+        name="remove_holiday",
+        description="Remove a holiday from the working calendar (ADMIN+)"
+    )
+    @app_commands.describe(holiday_id="Holiday ID (see /holidays)")
+    async def remove_holiday(self, interaction: discord.Interaction, holiday_id: int):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            if await CalendarModel.remove_holiday(holiday_id):
+                await interaction.followup.send(f"✅ Holiday #{holiday_id} removed.", ephemeral=True)
+            else:
+                await interaction.followup.send(f"❌ Holiday #{holiday_id} not found.", ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(
+        name="holidays",
+        description="List holidays for a year"
+    )
+    @app_commands.describe(
+        year="Year (default: current year)",
+        department="Department (default: company-wide and all departments)"
+    )
+    async def holidays(self, interaction: discord.Interaction, year: int = None, department: str = None):
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            year = year or datetime.now(pytz.UTC).year
+            holidays = await CalendarModel.get_holidays(year, department)
+
+            embed = discord.Embed(
+                title=f"🗓️ Holidays {year}" + (f" - {department}" if department else ""),
+                color=discord.Color.blue()
+            )
+
+            if not holidays:
+                embed.description = "No holidays found."
+            else:
+                lines = [
+                    f"`#{h['holiday_id']}` **{h['holiday_date'].strftime('%d/%m/%Y')}** - {h['name']}"
+                    + (f" ({h['department']})" if h['department'] else "")
+                    for h in holidays
+                ]
+                description = ""
+                for index, line in enumerate(lines):
+                    if len(description) + len(line) + 1 > 4000:
+                        description += f"\n…and {len(lines) - index} more"
+                        break
+                    description += ("\n" if description else "") + line
+                embed.description = description
+
+            weekend = work_calendar.weekend_days.get(department, set(Config.DEFAULT_WEEKEND_DAYS))
+            embed.set_footer(text=f"Weekend: {', '.join(WEEKDAY_NAMES[d - 1] for d in sorted(weekend)) or 'none'}")
+
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(
+        name="set_weekend",
+        description="Set the weekend days of a department (ADMIN+)"
+    )
+    @app_commands.describe(
+        department="Department name",
+        days="Comma-separated days off, e.g. Sat,Sun"
+    )
+    async def set_weekend(self, interaction: discord.Interaction, department: str, days: str):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            lookup = {name.lower(): index + 1 for index, name in enumerate(WEEKDAY_NAMES)}
+            weekend_days = []
+            for day in days.split(','):
+                day = day.strip()[:3].lower()
+                if not day:
+                    continue
+                if day not in lookup:
+                    await interaction.followup.send(
+                        f"❌ Unknown day **{day}**. Use: {', '.join(WEEKDAY_NAMES)}",
+                        ephemeral=True
+                    )
+                    return
+                weekend_days.append(lookup[day])
+
+            admin_user = await UserModel.get_user_by_discord_id(interaction.user.id)
+            await CalendarModel.set_weekend_days(
+                department, weekend_days, updated_by=admin_user['user_id'] if admin_user else None
+            )
+
+            await interaction.followup.send(
+                f"✅ Weekend for **{department}** set to "
+                f"**{', '.join(WEEKDAY_NAMES[d - 1] for d in sorted(set(weekend_days))) or 'no days'}**.",
+                ephemeral=True
+            )
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    # ==================== MONTHLY HOURS ====================
+    @app_commands.command(
+        name="monthly_hours",
+        description="Compare required working hours with logged hours for a month (ADMIN+)"
+    )
+    @app_commands.describe(
+        month="Month (MM/YYYY, default: current month)",
+        department="Only show this department"
+    )
+    async def monthly_hours(self, interaction: discord.Interaction, month: str = None, department: str = None):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            today = datetime.now(pytz.UTC).date()
+            try:
+                month_start = datetime.strptime(month, '%m/%Y').date() if month else today.replace(day=1)
+            except ValueError:
+                await interaction.followup.send("❌ Invalid month format! Please use MM/YYYY format.", ephemeral=True)
+                return
+
+            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            period_end = min(month_end, today)
+            if period_end < month_start:
+                await interaction.followup.send("❌ That month has not started yet.", ephemeral=True)
+                return
+
+            users = [dict(u) for u in await UserModel.get_all_users(include_deleted=False)]
+            if department:
+                users = [u for u in users if u['department'] == department]
+
+            logged = await TimeTrackingModel.get_logged_minutes_by_user(month_start, period_end)
+            leaves = await LeaveRequestModel.get_approved_leaves_in_range(month_start, period_end)
+
+            # Each user's shift decides the required minutes per working day
+            shifts = {u['user_id']: shift_schedules.for_user(u['user_id'], u['department']) for u in users}
+
+            # Working days on approved leave, clipped to the period
+            leave_days = {}
+            departments = {u['user_id']: u['department'] for u in users}
+            for leave in leaves:
+                if leave['user_id'] not in departments:
+                    continue
+                start = max(leave['start_date'], month_start)
+                end = min(leave['end_date'] or period_end, period_end)
+                days = work_calendar.working_days_between(start, end, departments[leave['user_id']])
+                if leave['duration_hours']:
+                    # Hour-based leave as a share of the working day (a 0-minute shift has nothing to subtract)
+                    required_minutes = shifts[leave['user_id']]['required_minutes']
+                    days = min(days, float(leave['duration_hours']) * 60 / required_minutes) if required_minutes > 0 else 0
+                leave_days[leave['user_id']] = leave_days.get(leave['user_id'], 0) + days
+
+            lines = []
+            for user in sorted(users, key=lambda u: u['name'].lower()):
+                expected_days = work_calendar.working_days_between(month_start, period_end, user['department'])
+                expected_days -= leave_days.get(user['user_id'], 0)
+                required = max(expected_days, 0) * shifts[user['user_id']]['required_minutes']
+                worked = logged.get(user['user_id'], {}).get('logged_minutes', 0)
+                difference = worked - required
+                marker = "✅" if difference >= 0 else "⚠️"
+                sign = "+" if difference >= 0 else "-"
+                lines.append(
+                    f"{marker} **{user['name']}** - {worked // 60}h {worked % 60}m / "
+                    f"{int(required) // 60}h {int(required) % 60}m "
+                    f"({sign}{int(abs(difference)) // 60}h {int(abs(difference)) % 60}m, {expected_days:g} day(s))"
+                )
+
+            report = EmbedPacker(
+                title=f"⏱️ Monthly Hours - {month_start.strftime('%m/%Y')}" + (f" - {department}" if department else ""),
+                description=(
+                    f"**Period:** {month_start.strftime('%d/%m/%Y')} → {period_end.strftime('%d/%m/%Y')}\n"
+                    f"**Required per working day:** from each employee's shift"
+                ),
+                color=discord.Color.blue(),
+                footer="Logged / required (difference, expected working days excluding approved leave)",
+                attachment_name=f"monthly_hours_{month_start.strftime('%Y-%m')}.txt"
+            )
+            report.add_lines("👥 Employees", lines, empty="No employees found.")
+            await report.send(interaction)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    # ==================== SHIFTS ====================
+    @app_commands.command(
+        name="set_shift",
+        description="Set the shift of a department or a user (ADMIN+)"
+    )
+    @app_commands.describe(
+        start_time="Shift start (HH:MM, local to the timezone)",
+        grace_minutes="Minutes after the start before a clock-in counts as late",
+        required_minutes="Minutes of work required per day",
+        department="Department the shift applies to",
+        user="User the shift applies to (overrides the department shift)",
+        timezone="IANA timezone, e.g. Asia/Dhaka (default: UTC)"
+    )
+    async def set_shift(
+        self,
+        interaction: discord.Interaction,
+        start_time: str,
+        grace_minutes: app_commands.Range[int, 0, 240],
+        required_minutes: app_commands.Range[int, 1, 1440],
+        department: str = None,
+        user: discord.Member = None,
+        timezone: str = 'UTC'
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            if (department is None) == (user is None):
+                await interaction.followup.send("❌ Choose either a department or a user.", ephemeral=True)
+                return
+
+            try:
+                start = datetime.strptime(start_time, '%H:%M').time()
+            except ValueError:
+                await interaction.followup.send("❌ Invalid time format! Please use HH:MM format.", ephemeral=True)
+                return
+
+            if timezone not in pytz.all_timezones_set:
+                await interaction.followup.send(f"❌ Unknown timezone **{timezone}**.", ephemeral=True)
+                return
+
+            user_id = None
+            if user:
+                user_data = await UserModel.get_user_by_discord_id(user.id)
+                if not user_data:
+                    await interaction.followup.send(f"❌ User {user.mention} is not registered!", ephemeral=True)
+                    return
+                user_id = user_data['user_id']
+
+            admin_user = await UserModel.get_user_by_discord_id(interaction.user.id)
+            shift_id = await ShiftModel.set_shift(
+                start, grace_minutes, required_minutes, timezone,
+                department=department, user_id=user_id,
+                updated_by=admin_user['user_id'] if admin_user else None
+            )
+
+            await interaction.followup.send(
+                f"✅ Shift **#{shift_id}** for **{department or user.display_name}**: starts {start.strftime('%H:%M')} "
+                f"{timezone}, late after {grace_minutes} min, {required_minutes // 60}h {required_minutes % 60}m required.",
+                ephemeral=True
+            )
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(
+        name="default_shift",
+        description="Set the company-wide default shift in UTC (ADMIN+)"
+    )
+    @app_commands.describe(
+        start_time="Shift start (HH:MM UTC)",
+        grace_minutes="Minutes after the start before a clock-in counts as late",
+        required_minutes="Minutes of work required per day"
+    )
+    async def default_shift(
+        self,
+        interaction: discord.Interaction,
+        start_time: str,
+        grace_minutes: app_commands.Range[int, 0, 240],
+        required_minutes: app_commands.Range[int, 1, 1440]
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            try:
+                start = datetime.strptime(start_time, '%H:%M').time()
+            except ValueError:
+                await interaction.followup.send("❌ Invalid time format! Please use HH:MM format.", ephemeral=True)
+                return
+
+            await SettingsModel.update_shift_defaults(start.hour * 60 + start.minute, grace_minutes, required_minutes)
+
+            await interaction.followup.send(
+                f"✅ Default shift: starts {start.strftime('%H:%M')} UTC, late after {grace_minutes} min, "
+                f"{required_minutes // 60}h {required_minutes % 60}m required.",
+                ephemeral=True
+            )
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(
+        name="remove_shift",
+        description="Remove a department or user shift (ADMIN+)"
+    )
+    @app_commands.describe(shift_id="Shift ID (see /shifts)")
+    async def remove_shift(self, interaction: discord.Interaction, shift_id: int):
+        await interaction.response.defer(ephemeral=True)
+
+        if not await self._check_admin(interaction):
+            return
+
+        try:
+            if await ShiftModel.remove_shift(shift_id):
+                await interaction.followup.send(f"✅ Shift #{shift_id} removed.", ephemeral=True)
+            else:
+                await interaction.followup.send(f"❌ Shift #{shift_id} not found.", ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(
+        name="shifts",
+        description="List the default shift and all department/user shifts"
+    )
+    async def shifts(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            shifts = await ShiftModel.get_shifts()
+            default = shift_schedules.default
+
+            def describe(shift):
+                required = shift['required_minutes']
+                return (
+                    f"{shift['start_time'].strftime('%H:%M')} {shift['timezone']} "
+                    f"(+{shift['grace_minutes']} min grace, {required // 60}h {required % 60}m)"
+                )
+
+            lines = [f"**Default:** {describe(default)}"]
+            for shift in shifts:
+                target = shift['department'] or f"👤 {shift['user_name'] or shift['user_id']}"
+                lines.append(f"`#{shift['shift_id']}` **{target}:** {describe(shift)}")
+
+            embed = discord.Embed(
+                title="🕘 Shift Schedules",
+                description="\n".join(lines)[:4000],
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text="User shifts override department shifts, which override the default")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @add_holiday.autocomplete('department')
+    @holidays.autocomplete('department')
+    @set_weekend.autocomplete('department')
+    @monthly_hours.autocomplete('department')
+    @set_shift.autocomplete('department')
+    async def department_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest known departments from the in-memory index"""
+        return autocomplete_index.department_choices(current)
+
+
+async def setup(bot):
+    await bot.add_cog(WorkCalendar(bot))
@@ -7,107 +7,142 @@ from models.late_reason_model import LateReasonModel
 from models.user_model import UserModel
 from models.time_tracking_model import TimeTrackingModel
 from utils.verification_helper import is_admin, is_super_admin
+from utils.autocomplete import autocomplete_index
+from utils.embed_packer import EmbedPacker
+from typing import List
 import pytz
 
 
-class LateReasonApprovalView(ui.View):
-    """View for approving/rejecting late reasons"""
+class LateReasonApprovalButton(ui.DynamicItem[ui.Button], template=r'late_reason:(?P<action>approve|reject):(?P<id>[0-9]+)'):
+    """Approve/reject button for a late reason; the ID lives in the custom_id so it keeps working after restarts"""
     
-    def __init__(self, late_reason_id: int, user_name: str, is_already_approved: bool = False):
-        super().__init__(timeout=180)
+    def __init__(self, action: str, late_reason_id: int):
+        approve = action == 'approve'
+        super().__init__(ui.Button(
+            label="✅ Approve" if approve else "❌ Reject",
+            style=discord.ButtonStyle.success if approve else discord.ButtonStyle.danger,
+            custom_id=f"late_reason:{action}:{late_reason_id}"
+        ))
+        self.action = action
         self.late_reason_id = late_reason_id
-        self.user_name = user_name
-        self.is_already_approved = is_already_approved  # Only True if already approved
     
-    @ui.button(label="✅ Approve", style=discord.ButtonStyle.success)
-    async def approve_button(self, interaction: discord.Interaction, button: ui.Button):
-        if self.is_already_approved:
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['action'], int(match['id']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
             await interaction.response.send_message(
-                f"⚠️ Late reason for {self.user_name} is already approved!",
+                "❌ Only ADMIN or SUPER ADMIN can approve late reasons!",
                 ephemeral=True
             )
             return
         
-        success = await LateReasonModel.update_admin_approval(self.late_reason_id, True)
+        await interaction.response.defer()
         
-        if success:
-            await interaction.response.edit_message(
-                content=f"✅ **Late reason APPROVED** for {self.user_name}",
-                view=None
-            )
-        else:
-            await interaction.response.edit_message(
-                content=f"❌ Failed to update approval status for {self.user_name}",
+        # State is loaded on click, so stale messages act on the current record
+        late_reason = await LateReasonModel.get_late_reason_by_id(self.late_reason_id)
+        if not late_reason:
+            await interaction.edit_original_response(
+                content=f"❌ Late reason `{self.late_reason_id}` no longer exists.",
+                embed=None,
                 view=None
             )
-        self.stop()
-    
-    @ui.button(label="❌ Reject", style=discord.ButtonStyle.danger)
-    async def reject_button(self, interaction: discord.Interaction, button: ui.Button):
+            return
+        
+        approve = self.action == 'approve'
+        user_name = late_reason['name']
+        
         # Always allow reject, even if already rejected before
-        success = await LateReasonModel.update_admin_approval(self.late_reason_id, False)
+        if approve and late_reason.get('admin_approval') is True:
+            await interaction.followup.send(
+                f"⚠️ Late reason for {user_name} is already approved!",
+                ephemeral=True
+            )
+            return
+        
+        success = await LateReasonModel.update_admin_approval(self.late_reason_id, approve)
         
         if success:
-            await interaction.response.edit_message(
-                content=f"❌ **Late reason REJECTED** for {self.user_name}",
-                view=None
-            )
+            content = f"✅ **Late reason APPROVED** for {user_name}" if approve else f"❌ **Late reason REJECTED** for {user_name}"
         else:
-            await interaction.response.edit_message(
-                content=f"❌ Failed to update approval status for {self.user_name}",
-                view=None
-            )
-        self.stop()
+            content = f"❌ Failed to update approval status for {user_name}"
+        await interaction.edit_original_response(content=content, view=None)
 
 
-class WorkUpdateApprovalView(ui.View):
-    """View for approving/rejecting work updates"""
+class LateReasonApprovalView(ui.View):
+    """View for approving/rejecting late reasons (persistent)"""
     
-    def __init__(self, work_update_id: int, user_name: str, is_already_approved: bool = False):
-        super().__init__(timeout=180)
+    def __init__(self, late_reason_id: int):
+        super().__init__(timeout=None)
+        self.add_item(LateReasonApprovalButton('approve', late_reason_id))
+        self.add_item(LateReasonApprovalButton('reject', late_reason_id))
+
+
+class WorkUpdateApprovalButton(ui.DynamicItem[ui.Button], template=r'work_update:(?P<action>approve|reject):(?P<id>[0-9]+)'):
+    """Approve/reject button for a work plan; the ID lives in the custom_id so it keeps working after restarts"""
+    
+    def __init__(self, action: str, work_update_id: int):
+        approve = action == 'approve'
+        super().__init__(ui.Button(
+            label="✅ Approve Work Plan" if approve else "❌ Reject Work Plan",
+            style=discord.ButtonStyle.success if approve else discord.ButtonStyle.danger,
+            custom_id=f"work_update:{action}:{work_update_id}"
+        ))
+        self.action = action
         self.work_update_id = work_update_id
-        self.user_name = user_name
-        self.is_already_approved = is_already_approved  # Only True if already approved
     
-    @ui.button(label="✅ Approve Work Plan", style=discord.ButtonStyle.success)
-    async def approve_button(self, interaction: discord.Interaction, button: ui.Button):
-        if self.is_already_approved:
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['action'], int(match['id']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        if not (await is_admin(interaction.user.id) or await is_super_admin(interaction.user.id)):
             await interaction.response.send_message(
-                f"⚠️ Work plan for {self.user_name} is already approved!",
+                "❌ Only ADMIN or SUPER ADMIN can approve work plans!",
                 ephemeral=True
             )
             return
         
-        success = await WorkUpdateModel.update_admin_approval(self.work_update_id, True)
+        await interaction.response.defer()
         
-        if success:
-            await interaction.response.edit_message(
-                content=f"✅ **Work plan APPROVED** for {self.user_name}",
+        # State is loaded on click, so stale messages act on the current record
+        work_update = await WorkUpdateModel.get_work_update_by_id(self.work_update_id)
+        if not work_update:
+            await interaction.edit_original_response(
+                content=f"❌ Work update `{self.work_update_id}` no longer exists.",
+                embed=None,
                 view=None
             )
-        else:
-            await interaction.response.edit_message(
-                content=f"❌ Failed to update approval status for {self.user_name}",
-                view=None
-            )
-        self.stop()
-    
-    @ui.button(label="❌ Reject Work Plan", style=discord.ButtonStyle.danger)
-    async def reject_button(self, interaction: discord.Interaction, button: ui.Button):
+            return
+        
+        approve = self.action == 'approve'
+        user_name = work_update['name']
+        
         # Always allow reject, even if already rejected before
-        success = await WorkUpdateModel.update_admin_approval(self.work_update_id, False)
+        if approve and work_update.get('admin_approval') is True:
+            await interaction.followup.send(
+                f"⚠️ Work plan for {user_name} is already approved!",
+                ephemeral=True
+            )
+            return
+        
+        success = await WorkUpdateModel.update_admin_approval(self.work_update_id, approve)
         
         if success:
-            await interaction.response.edit_message(
-                content=f"❌ **Work plan REJECTED** for {self.user_name}",
-                view=None
-            )
+            content = f"✅ **Work plan APPROVED** for {user_name}" if approve else f"❌ **Work plan REJECTED** for {user_name}"
         else:
-            await interaction.response.edit_message(
-                content=f"❌ Failed to update approval status for {self.user_name}",
-                view=None
-            )
-        self.stop()
+            content = f"❌ Failed to update approval status for {user_name}"
+        await interaction.edit_original_response(content=content, view=None)
+
+
+class WorkUpdateApprovalView(ui.View):
+    """View for approving/rejecting work updates (persistent)"""
+    
+    def __init__(self, work_update_id: int):
+        super().__init__(timeout=None)
+        self.add_item(WorkUpdateApprovalButton('approve', work_update_id))
+        self.add_item(WorkUpdateApprovalButton('reject', work_update_id))
 
 
 class WorkManagement(commands.Cog):
@@ -145,13 +180,14 @@ class WorkManagement(commands.Cog):
                 )
                 return
             
-            embed = discord.Embed(
+            report = EmbedPacker(
                 title=f"📋 Work Updates - {today.strftime('%d/%m/%Y')}",
                 description=f"**Total Updates:** {len(updates)}",
-                color=discord.Color.blue()
+                color=discord.Color.blue(),
+                attachment_name=f"work_updates_{today.isoformat()}.txt"
             )
             
-            for update in updates[:10]:  # Limit to 10 to avoid embed limits
+            for update in updates:
                 tasks = update['start_of_the_day_plan'] if update['start_of_the_day_plan'] else []
                 task_list = "\n".join([f"{i+1}. {task}" for i, task in enumerate(tasks)]) if tasks else "No tasks"
                 
@@ -161,7 +197,7 @@ class WorkManagement(commands.Cog):
                 
                 user_mention = f"<@{update['discord_id']}>" if update['discord_id'] else update['name']
                 
-                embed.add_field(
+                report.add_field(
                     name=f"👤 {update['name']} - {approval_status}",
                     value=(
                         f"**Tasks:**\n{task_list}\n"
@@ -172,10 +208,7 @@ class WorkManagement(commands.Cog):
                     inline=False
                 )
             
-            if len(updates) > 10:
-                embed.set_footer(text=f"Showing 10 of {len(updates)} updates")
-            
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await report.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
@@ -203,7 +236,8 @@ class WorkManagement(commands.Cog):
         
         try:
             today = datetime.now(pytz.utc).date()
-            late_users = await LateReasonModel.get_late_users_list(date_filter=today, limit=20)
+            # LIMIT NULL: every late arrival of the day
+            late_users = await LateReasonModel.get_late_users_list(date_filter=today, limit=None)
             
             if not late_users:
                 await interaction.followup.send(
@@ -212,10 +246,11 @@ class WorkManagement(commands.Cog):
                 )
                 return
             
-            embed = discord.Embed(
+            report = EmbedPacker(
                 title=f"⏰ Late Arrivals - {today.strftime('%d/%m/%Y')}",
                 description=f"**Total Late Users:** {len(late_users)}",
-                color=discord.Color.orange()
+                color=discord.Color.orange(),
+                attachment_name=f"late_arrivals_{today.isoformat()}.txt"
             )
             
             for late in late_users:
@@ -227,7 +262,7 @@ class WorkManagement(commands.Cog):
                 if isinstance(date_str, date):
                     date_str = date_str.strftime('%Y-%m-%d')
                 
-                embed.add_field(
+                report.add_field(
                     name=f"👤 {late['name']} - {late['late_mins']} min late",
                     value=(
                         f"**Date:** {date_str}\n"
@@ -240,7 +275,7 @@ class WorkManagement(commands.Cog):
                     inline=False
                 )
             
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            await report.send(interaction)
             
         except Exception as e:
             await interaction.followup.send(
@@ -350,13 +385,7 @@ class WorkManagement(commands.Cog):
             embed.add_field(name="👔 Admin Informed", value="✅ Yes" if user_late['is_admin_informed'] else "❌ No", inline=True)
             embed.add_field(name="📞 Meeting Attended", value="✅ Yes" if user_late['morning_meeting_attended'] else "❌ No", inline=True)
             
-            # Pass whether it's already approved (only True if already approved)
-            is_already_approved = user_late.get('admin_approval') is True
-            view = LateReasonApprovalView(
-                user_late['id'], 
-                user_data['name'],
-                is_already_approved=is_already_approved
-            )
+            view = LateReasonApprovalView(user_late['id'])
             
             await interaction.followup.send(
                 embed=embed,
@@ -370,6 +399,12 @@ class WorkManagement(commands.Cog):
                 ephemeral=True
             )
     
+    @late_approval.autocomplete('late_id')
+    async def late_id_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest today's unapproved late reasons from the in-memory index"""
+        selected_user = getattr(interaction.namespace, 'user', None)
+        return autocomplete_index.late_reason_choices(current, getattr(selected_user, 'id', None))
+    
     # ==================== APPROVE/REJECT WORK UPDATE ====================
     @app_commands.command(
         name="work_approval",
@@ -462,13 +497,7 @@ class WorkManagement(commands.Cog):
             embed.add_field(name="🖥️ Desklog", value=desklog_status, inline=True)
             embed.add_field(name="📊 Trackabi", value=trackabi_status, inline=True)
             
-            # Pass whether it's already approved (only True if already approved)
-            is_already_approved = work_update.get('admin_approval') is True
-            view = WorkUpdateApprovalView(
-                work_update['id'], 
-                user_data['name'],
-                is_already_approved=is_already_approved
-            )
+            view = WorkUpdateApprovalView(work_update['id'])
             
             await interaction.followup.send(
                 embed=embed,
@@ -482,6 +511,15 @@ class WorkManagement(commands.Cog):
                 ephemeral=True
             )
 
+    
+    @work_approval.autocomplete('update_id')
+    async def update_id_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest today's unapproved work updates from the in-memory index"""
+        selected_user = getattr(interaction.namespace, 'user', None)
+        return autocomplete_index.work_update_choices(current, getattr(selected_user, 'id', None))
+
 
 async def setup(bot):
+    # Approval buttons are dispatched by custom_id, including on messages sent before a restart
+    bot.add_dynamic_items(LateReasonApprovalButton, WorkUpdateApprovalButton)
     await bot.add_cog(WorkManagement(bot))
\ No newline at end of file
@@ -15,12 +15,106 @@ class Config:
     SICK_LEAVE_EARLY_HOURS = int(os.getenv('SICK_LEAVE_EARLY_HOURS', 12))  # window start hours before anchor
     SICK_LEAVE_LATE_HOURS = int(os.getenv('SICK_LEAVE_LATE_HOURS', 2))     # window end hours before anchor
     
+    # Nightly Auto-Close Config (UTC)
+    AUTO_CLOSE_RUN_HOUR = int(os.getenv('AUTO_CLOSE_RUN_HOUR', 0))         # hour the nightly job runs
+    AUTO_CLOSE_CUTOFF_HOUR = int(os.getenv('AUTO_CLOSE_CUTOFF_HOUR', 14))  # last open session is capped at this hour
+    
+    # Screen Share Reconciler Config
+    SCREEN_SHARE_RECONCILE_MINUTES = int(os.getenv('SCREEN_SHARE_RECONCILE_MINUTES', 5))        # how often to reconcile
+    SCREEN_SHARE_ORPHAN_GRACE_MINUTES = int(os.getenv('SCREEN_SHARE_ORPHAN_GRACE_MINUTES', 10)) # time to join the channel
+    
+    # Leave Ledger Config
+    LEAVE_MONTHLY_ACCRUAL_DAYS = float(os.getenv('LEAVE_MONTHLY_ACCRUAL_DAYS', 0))  # days credited on the 1st (0 = disabled)
+    
+    # Working Calendar Config
+    DEFAULT_WEEKEND_DAYS = [int(d) for d in os.getenv('DEFAULT_WEEKEND_DAYS', '6,7').split(',') if d.strip()]  # ISO weekdays
+    
+    # Rating Aggregates Config
+    RATING_AGGREGATE_DEBOUNCE_SECONDS = int(os.getenv('RATING_AGGREGATE_DEBOUNCE_SECONDS', 30))  # refresh delay after a new rating
+    RATING_AGGREGATE_REFRESH_MINUTES = int(os.getenv('RATING_AGGREGATE_REFRESH_MINUTES', 60))    # scheduled refresh interval
+    
+    # Pagination Config
+    PAGINATION_CACHE_PAGES = int(os.getenv('PAGINATION_CACHE_PAGES', 3))  # fetched pages kept per open list view
+    
+    # Embed Packing Config
+    EMBED_PACK_MAX_MESSAGES = int(os.getenv('EMBED_PACK_MAX_MESSAGES', 1))  # messages per report before rows spill into an attachment
+    
+    # Outbound Message Queue Config
+    SEND_QUEUE_CONCURRENCY = int(os.getenv('SEND_QUEUE_CONCURRENCY', 5))                   # sends in flight across all destinations
+    SEND_COALESCE_SECONDS = float(os.getenv('SEND_COALESCE_SECONDS', 2))                   # messages to one recipient within this window go out together
+    SEND_QUEUE_MAX_PER_DESTINATION = int(os.getenv('SEND_QUEUE_MAX_PER_DESTINATION', 50))  # oldest message dropped beyond this
+    SEND_MAX_RETRIES = int(os.getenv('SEND_MAX_RETRIES', 4))
+    SEND_RETRY_BASE_SECONDS = float(os.getenv('SEND_RETRY_BASE_SECONDS', 1))               # doubled per attempt, with jitter
+    SEND_RETRY_MAX_SECONDS = float(os.getenv('SEND_RETRY_MAX_SECONDS', 30))
+    
+    # Admin Alert Digest Config (UTC)
+    ADMIN_DIGEST_HOUR = int(os.getenv('ADMIN_DIGEST_HOUR', 17))                                 # hour the daily digest is sent
+    ADMIN_DIGEST_MINUTE = int(os.getenv('ADMIN_DIGEST_MINUTE', 0))
+    ALERT_HIGH_SEVERITY_MULTIPLIER = float(os.getenv('ALERT_HIGH_SEVERITY_MULTIPLIER', 2))     # threshold x this is DMed right away
+    
+    # Write Spool Config (clock events saved locally while the database is unreachable)
+    WRITE_SPOOL_PATH = os.getenv('WRITE_SPOOL_PATH', 'data/write_spool.sqlite3')
+    WRITE_SPOOL_MAX_ENTRIES = int(os.getenv('WRITE_SPOOL_MAX_ENTRIES', 10000))                    # new events refused beyond this
+    WRITE_SPOOL_MAX_MB = int(os.getenv('WRITE_SPOOL_MAX_MB', 20))                                 # disk cap for the spool file
+    WRITE_SPOOL_REPLAY_SECONDS = float(os.getenv('WRITE_SPOOL_REPLAY_SECONDS', 10))               # how often replay is tried
+    WRITE_SPOOL_MAX_ATTEMPTS = int(os.getenv('WRITE_SPOOL_MAX_ATTEMPTS', 5))                      # replay errors before an entry is given up
+    WRITE_SPOOL_FAILED_RETENTION_DAYS = int(os.getenv('WRITE_SPOOL_FAILED_RETENTION_DAYS', 14))  # failed entries kept for inspection
+    
     # Database Config
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_PORT = int(os.getenv('DB_PORT', 5432))
     DB_NAME = os.getenv('DB_NAME')
     DB_USER = os.getenv('DB_USER')
     DB_PASSWORD = os.getenv('DB_PASSWORD')
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 5))
+    DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 20))
+    
+    # Database Resilience Config
+    DB_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv('DB_ACQUIRE_TIMEOUT_SECONDS', 3))                   # wait for a free connection
+    DB_CONNECT_TIMEOUT_SECONDS = float(os.getenv('DB_CONNECT_TIMEOUT_SECONDS', 5))                   # opening a new connection
+    DB_CONNECT_RETRIES = int(os.getenv('DB_CONNECT_RETRIES', 2))                                     # retries of a failed connection attempt
+    DB_RETRY_BASE_SECONDS = float(os.getenv('DB_RETRY_BASE_SECONDS', 0.2))                           # doubled per retry, with jitter
+    DB_INTERACTIVE_TIMEOUT_MS = int(os.getenv('DB_INTERACTIVE_TIMEOUT_MS', 5000))                    # statement_timeout for commands
+    DB_REPORTING_TIMEOUT_MS = int(os.getenv('DB_REPORTING_TIMEOUT_MS', 60000))                       # reports, digests, scheduled jobs
+    DB_MAINTENANCE_TIMEOUT_MS = int(os.getenv('DB_MAINTENANCE_TIMEOUT_MS', 1800000))                 # schema setup, nightly jobs (0 = none)
+    DB_COMMAND_TIMEOUT_GRACE_SECONDS = float(os.getenv('DB_COMMAND_TIMEOUT_GRACE_SECONDS', 5))       # client-side limit = statement timeout + this
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 30000))  # abandoned transactions are closed
+    DB_BREAKER_FAILURES = int(os.getenv('DB_BREAKER_FAILURES', 5))                                   # connection failures in a row to open
+    DB_BREAKER_RESET_SECONDS = float(os.getenv('DB_BREAKER_RESET_SECONDS', 15))                      # fail fast this long before retrying
+    DB_HEALTH_CHECK_SECONDS = float(os.getenv('DB_HEALTH_CHECK_SECONDS', 30))                        # SELECT 1 probe interval (0 = off)
+    DB_MAX_QUERIES_PER_CONNECTION = int(os.getenv('DB_MAX_QUERIES_PER_CONNECTION', 50000))           # connection recycled after this
+    DB_MAX_IDLE_SECONDS = float(os.getenv('DB_MAX_IDLE_SECONDS', 300))                               # idle connections closed after this
+    
+    # Query Diagnostics Config (development)
+    DB_QUERY_DIAGNOSTICS = os.getenv('DB_QUERY_DIAGNOSTICS', 'false').lower() in ('1', 'true', 'yes')
+    DB_QUERY_BUDGET = int(os.getenv('DB_QUERY_BUDGET', 10))                # round trips per interaction
+    DB_QUERY_BUDGET_OVERRIDES = {                                           # e.g. "/review_leave_requests:30,ReviewLeaveRequestsActionView.approve:40"
+        label.strip(): int(limit)
+        for label, limit in (
+            item.split(':') for item in os.getenv('DB_QUERY_BUDGET_OVERRIDES', '').split(',') if ':' in item
+        )
+    }
+    DB_REPEATED_QUERY_THRESHOLD = int(os.getenv('DB_REPEATED_QUERY_THRESHOLD', 3))  # same statement N times = N+1 suspect
+    
+    # Slow Query Capture Config
+    DB_SLOW_QUERY_MS = int(os.getenv('DB_SLOW_QUERY_MS', 250))                    # 0 disables capture
+    DB_SLOW_QUERY_BUFFER = int(os.getenv('DB_SLOW_QUERY_BUFFER', 200))            # captured queries kept in memory
+    DB_SLOW_QUERY_EXPLAIN_MINUTES = int(os.getenv('DB_SLOW_QUERY_EXPLAIN_MINUTES', 10))  # re-EXPLAIN a statement at most this often
+    
+    # Event Loop Monitor Config
+    LOOP_MONITOR_ENABLED = os.getenv('LOOP_MONITOR_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    LOOP_LAG_INTERVAL_MS = int(os.getenv('LOOP_LAG_INTERVAL_MS', 250))        # heartbeat period
+    LOOP_LAG_SAMPLES = int(os.getenv('LOOP_LAG_SAMPLES', 2400))               # samples kept (2400 x 250 ms = 10 min)
+    LOOP_BLOCK_THRESHOLD_MS = int(os.getenv('LOOP_BLOCK_THRESHOLD_MS', 100))  # stall long enough to capture a stack
+    LOOP_BLOCK_BUFFER = int(os.getenv('LOOP_BLOCK_BUFFER', 50))               # blocking callbacks kept in memory
+    LOOP_BLOCK_STACK_DEPTH = int(os.getenv('LOOP_BLOCK_STACK_DEPTH', 8))      # innermost frames kept per capture
+    
+    # Interaction Tracing Config
+    INTERACTION_TRACING = os.getenv('INTERACTION_TRACING', 'true').lower() in ('1', 'true', 'yes')
+    INTERACTION_DEFER_WARN_MS = int(os.getenv('INTERACTION_DEFER_WARN_MS', 2000))  # warn when first response is this late
+    INTERACTION_TRACE_FILE = os.getenv('INTERACTION_TRACE_FILE', 'logs/interaction_traces.jsonl')  # empty = no export
+    INTERACTION_TRACE_MAX_MB = float(os.getenv('INTERACTION_TRACE_MAX_MB', 10))    # export file rotated at this size
+    INTERACTION_TRACE_BACKUPS = int(os.getenv('INTERACTION_TRACE_BACKUPS', 3))      # rotated files kept
     
     @classmethod
     def validate(cls):
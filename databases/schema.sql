@@ -24,7 +24,7 @@ CREATE TABLE IF NOT EXISTS users (
     trackabi_id VARCHAR(100),
     desklog_id VARCHAR(100),
     role_id INTEGER REFERENCES roles(role_id) ON DELETE SET NULL DEFAULT 3,
-    pending_leaves INTEGER DEFAULT 10,
+    pending_leaves DECIMAL(5,1) DEFAULT 10,
     is_deleted BOOLEAN DEFAULT FALSE,
     registered_by INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
     contract_started_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP),
@@ -281,14 +281,14 @@ CREATE INDEX IF NOT EXISTS idx_work_updates_user ON work_updates(user_id);
 CREATE INDEX IF NOT EXISTS idx_activity_log_user ON activity_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_leave_requests_user ON leave_requests(user_id);
 CREATE INDEX IF NOT EXISTS idx_leave_requests_status ON leave_requests(status);
-CREATE INDEX IF NOT EXISTS idx_leave_requests_date ON leave_requests(start_date);
 CREATE INDEX IF NOT EXISTS idx_leave_requests_user ON leave_requests(user_id);
 CREATE INDEX IF NOT EXISTS idx_leave_requests_status ON leave_requests(status);
-CREATE INDEX IF NOT EXISTS idx_leave_requests_date ON leave_requests(start_date);
 CREATE INDEX IF NOT EXISTS idx_user_update_logs_updated_user ON user_update_logs(updated_user_id);
 CREATE INDEX IF NOT EXISTS idx_user_update_logs_updated_by ON user_update_logs(updated_by_user_id);
 CREATE INDEX IF NOT EXISTS idx_user_update_logs_date ON user_update_logs(updated_at);
 CREATE INDEX IF NOT EXISTS idx_screen_share_time_tracking ON screen_share_sessions(time_tracking_id);
+CREATE INDEX IF NOT EXISTS idx_screen_share_open_sessions ON screen_share_sessions(user_id, screen_share_on_time DESC)
+    INCLUDE (session_id) WHERE screen_share_off_time IS NULL;
 CREATE INDEX IF NOT EXISTS idx_compliance_ratings_user ON compliance_ratings(user_id);
 CREATE INDEX IF NOT EXISTS idx_compliance_ratings_date ON compliance_ratings(rating_date);
 CREATE INDEX IF NOT EXISTS idx_compliance_ratings_rated_by ON compliance_ratings(rated_by_user_id);
@@ -322,3 +322,241 @@ ON compliance_ratings USING GIN (custom_ratings);
 -- Add comment for documentation
 COMMENT ON COLUMN compliance_ratings.custom_ratings IS 'JSONB storage for additional rating fields in key-value format';
 
+
+-- Full-text search: generated tsvector columns with GIN indexes
+-- (array_to_string is only STABLE, so work plans go through an IMMUTABLE wrapper)
+CREATE OR REPLACE FUNCTION immutable_text_array_to_string(TEXT[])
+RETURNS TEXT LANGUAGE sql IMMUTABLE AS $$ SELECT array_to_string($1, ' ') $$;
+
+ALTER TABLE leave_requests
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(reason, ''))) STORED;
+
+ALTER TABLE work_updates
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(immutable_text_array_to_string(start_of_the_day_plan), ''))) STORED;
+
+ALTER TABLE late_reasons
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(reason, ''))) STORED;
+
+ALTER TABLE compliance_ratings
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(task_submission_feedback, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(overall_performance_feedback, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_leave_requests_search ON leave_requests USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_work_updates_search ON work_updates USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_late_reasons_search ON late_reasons USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_compliance_ratings_search ON compliance_ratings USING GIN (search_vector);
+
+-- Leave balance ledger (append-only); users.pending_leaves is the cached balance snapshot
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='users' AND column_name='pending_leaves' AND data_type='integer') THEN
+        ALTER TABLE users ALTER COLUMN pending_leaves TYPE DECIMAL(5,1);
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS leave_ledger (
+    entry_id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    entry_type VARCHAR(20) NOT NULL CHECK (entry_type IN ('opening', 'accrual', 'deduction', 'adjustment', 'reversal')),
+    days DECIMAL(5,1) NOT NULL,
+    leave_request_id INTEGER REFERENCES leave_requests(leave_request_id) ON DELETE SET NULL,
+    reversed_entry_id INTEGER REFERENCES leave_ledger(entry_id) ON DELETE SET NULL,
+    accrual_period DATE,
+    note TEXT,
+    created_by INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leave_ledger_user ON leave_ledger(user_id, created_at DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_leave_ledger_accrual_period ON leave_ledger(user_id, accrual_period)
+    WHERE entry_type = 'accrual';
+CREATE UNIQUE INDEX IF NOT EXISTS idx_leave_ledger_reversed_entry ON leave_ledger(reversed_entry_id)
+    WHERE reversed_entry_id IS NOT NULL;
+
+-- One deduction per leave request (approval deducts in the same transaction as the status change).
+-- A backstop only: skipped (with a notice) while legacy double deductions exist.
+DO $$
+BEGIN
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_leave_ledger_leave_deduction ON leave_ledger(leave_request_id)
+        WHERE entry_type = 'deduction';
+EXCEPTION
+    WHEN unique_violation THEN
+        RAISE NOTICE 'idx_leave_ledger_leave_deduction not added: leave requests with several deductions exist';
+END $$;
+
+-- Seed an opening entry from the current balance for users without ledger history
+INSERT INTO leave_ledger (user_id, entry_type, days, note)
+SELECT u.user_id, 'opening', COALESCE(u.pending_leaves, 0), 'Opening balance'
+FROM users u
+WHERE NOT EXISTS (SELECT 1 FROM leave_ledger l WHERE l.user_id = u.user_id);
+
+-- Leave periods as a daterange (NULL end_date = open-ended) for index-driven overlap queries
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE leave_requests ADD COLUMN IF NOT EXISTS leave_period DATERANGE
+    GENERATED ALWAYS AS (daterange(start_date, end_date, '[]')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_leave_requests_period ON leave_requests USING GIST (leave_period);
+
+-- A user cannot hold two approved/pending leaves covering the same day.
+-- Skipped (with a notice) while legacy overlapping rows still exist.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'leave_requests_no_overlap') THEN
+        ALTER TABLE leave_requests ADD CONSTRAINT leave_requests_no_overlap
+            EXCLUDE USING GIST (user_id WITH =, leave_period WITH &&)
+            WHERE (status IN ('approved', 'pending'));
+    END IF;
+EXCEPTION
+    WHEN exclusion_violation THEN
+        RAISE NOTICE 'leave_requests_no_overlap not added: overlapping approved/pending leaves exist';
+END $$;
+
+DROP INDEX IF EXISTS idx_leave_requests_date;
+
+-- Per-user, per-type leave counters (LeaveRequestModel.get_leave_stats)
+CREATE INDEX IF NOT EXISTS idx_leave_requests_user_type_start ON leave_requests(user_id, leave_type, start_date);
+
+-- Working-day calendar: holidays (NULL department = company-wide) and weekend days per department
+CREATE TABLE IF NOT EXISTS holidays (
+    holiday_id SERIAL PRIMARY KEY,
+    holiday_date DATE NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    department VARCHAR(100),
+    created_by INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_holidays_date_department ON holidays(holiday_date, COALESCE(department, ''));
+
+CREATE TABLE IF NOT EXISTS department_work_weeks (
+    department VARCHAR(100) PRIMARY KEY,
+    weekend_days SMALLINT[] NOT NULL,  -- ISO weekdays (1 = Monday ... 7 = Sunday)
+    updated_by INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    updated_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)
+);
+
+-- Shift schedules: company default lives in settings, overrides per department or per user
+INSERT INTO settings (name, int_value)
+VALUES
+    ('shift_start_minute', 240),      -- 04:00 UTC
+    ('shift_grace_minutes', 10),
+    ('shift_required_minutes', 480)
+ON CONFLICT (name) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS shift_schedules (
+    shift_id SERIAL PRIMARY KEY,
+    department VARCHAR(100),
+    user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    start_time TIME NOT NULL,                 -- local time in `timezone`
+    grace_minutes INTEGER NOT NULL DEFAULT 0,
+    required_minutes INTEGER NOT NULL DEFAULT 480,
+    timezone VARCHAR(64) NOT NULL DEFAULT 'UTC',
+    updated_by INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    updated_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP),
+    CHECK ((department IS NULL) <> (user_id IS NULL))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_shift_schedules_department ON shift_schedules(department) WHERE department IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_shift_schedules_user ON shift_schedules(user_id) WHERE user_id IS NOT NULL;
+
+-- Activity logs are listed newest first (overall and per user)
+CREATE INDEX IF NOT EXISTS idx_activity_logs_created_at ON activity_logs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_logs_user_created_at ON activity_logs(user_id, created_at DESC);
+
+-- One discipline compliance record per user per day (re-recording a day updates it).
+-- Existing rows get the UTC date of recorded_at, the same day new records default to.
+ALTER TABLE daily_compliance ADD COLUMN IF NOT EXISTS compliance_date DATE;
+UPDATE daily_compliance SET compliance_date = recorded_at::DATE WHERE compliance_date IS NULL;
+ALTER TABLE daily_compliance ALTER COLUMN compliance_date SET DEFAULT (TIMEZONE('utc', CURRENT_TIMESTAMP))::DATE;
+ALTER TABLE daily_compliance ALTER COLUMN compliance_date SET NOT NULL;
+
+-- The compliance upserts need this index. Days recorded several times before it existed
+-- stop startup here: run migrations/dedupe_daily_compliance.sql (archives, then deletes them).
+DO $$
+BEGIN
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_compliance_user_day ON daily_compliance(user_id, compliance_date);
+EXCEPTION
+    WHEN unique_violation THEN
+        RAISE EXCEPTION 'idx_daily_compliance_user_day cannot be created: users with several compliance records on one day exist. Run migrations/dedupe_daily_compliance.sql first.';
+END $$;
+
+-- Rolling compliance rates are rebuilt from the last 90 days (utils.compliance_trends)
+CREATE INDEX IF NOT EXISTS idx_daily_compliance_compliance_date ON daily_compliance(compliance_date);
+
+-- Rating averages per user / department / company, per month ('YYYY-MM') and all time ('all').
+-- Numeric custom_ratings values are averaged per key. Refreshed concurrently (utils.rating_aggregates).
+CREATE MATERIALIZED VIEW IF NOT EXISTS rating_aggregates AS
+WITH rated AS (
+    SELECT
+        cr.user_id,
+        COALESCE(u.department, 'Unassigned') AS department,
+        to_char(cr.rating_date, 'YYYY-MM') AS month,
+        cr.rating_date,
+        cr.task_submission_rating,
+        cr.overall_performance_rating,
+        cr.compliance_rule_breaks,
+        CASE WHEN jsonb_typeof(cr.custom_ratings) = 'object' THEN cr.custom_ratings ELSE '{}'::JSONB END AS custom_ratings
+    FROM compliance_ratings cr
+    JOIN users u ON u.user_id = cr.user_id
+    WHERE u.is_deleted = FALSE
+),
+scoped AS (
+    SELECT r.*, s.scope, s.scope_key, p.period
+    FROM rated r
+    CROSS JOIN LATERAL (VALUES ('user', r.user_id::TEXT), ('department', r.department), ('company', 'all')) AS s(scope, scope_key)
+    CROSS JOIN LATERAL (VALUES (r.month), ('all')) AS p(period)
+),
+base AS (
+    SELECT
+        scope, scope_key, period,
+        COUNT(*) AS ratings,
+        ROUND(AVG(task_submission_rating), 2) AS avg_task_rating,
+        ROUND(AVG(overall_performance_rating), 2) AS avg_performance_rating,
+        COALESCE(SUM(compliance_rule_breaks), 0) AS total_rule_breaks,
+        ROUND(AVG(compliance_rule_breaks), 2) AS avg_rule_breaks,
+        MAX(rating_date) AS last_rating_date
+    FROM scoped
+    GROUP BY scope, scope_key, period
+),
+custom AS (
+    SELECT scope, scope_key, period, jsonb_object_agg(key, avg_value) AS custom_averages
+    FROM (
+        SELECT sc.scope, sc.scope_key, sc.period, kv.key, ROUND(AVG(TRIM(kv.value)::NUMERIC), 2) AS avg_value
+        FROM scoped sc
+        CROSS JOIN LATERAL jsonb_each_text(sc.custom_ratings) AS kv(key, value)
+        WHERE kv.value ~ '^\s*-?[0-9]+(\.[0-9]+)?\s*$'
+        GROUP BY sc.scope, sc.scope_key, sc.period, kv.key
+    ) averages
+    GROUP BY scope, scope_key, period
+)
+SELECT b.*, COALESCE(c.custom_averages, '{}'::JSONB) AS custom_averages
+FROM base b
+LEFT JOIN custom c USING (scope, scope_key, period);
+
+-- Required for REFRESH ... CONCURRENTLY; also the constant-time lookup key
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rating_aggregates_key ON rating_aggregates(scope, scope_key, period);
+CREATE INDEX IF NOT EXISTS idx_rating_aggregates_period ON rating_aggregates(scope, period);
+
+-- Leave threshold alerts (non-compliant / sick leave), summarised for admins once a day.
+-- High-severity alerts are also DMed right away (notified_at).
+CREATE TABLE IF NOT EXISTS admin_alert_events (
+    id SERIAL PRIMARY KEY,
+    alert_type VARCHAR(50) NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    event_date DATE NOT NULL,
+    week_count INTEGER NOT NULL DEFAULT 0,
+    month_count INTEGER NOT NULL DEFAULT 0,
+    severity VARCHAR(10) NOT NULL DEFAULT 'normal',
+    notified_at TIMESTAMP,
+    digested_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)
+);
+
+CREATE INDEX IF NOT EXISTS idx_admin_alert_events_pending ON admin_alert_events(user_id, alert_type) WHERE digested_at IS NULL;
@@ -5,6 +5,17 @@ import asyncio
 import logging
 from config import Config
 from utils.database import db
+from utils.autocomplete import autocomplete_index
+from utils.settings_cache import settings_cache
+from utils.work_calendar import work_calendar
+from utils.shift_schedule import shift_schedules
+from utils.compliance_trends import compliance_trends
+from utils.custom_rating_catalogue import custom_rating_catalogue
+from utils.query_diagnostics import install_query_diagnostics
+from utils.loop_monitor import loop_monitor
+from utils.interaction_tracing import interaction_tracer
+from utils.send_queue import send_queue
+from utils.write_spool import write_spool
 from models.user_model import UserModel
 from models.activity_log_model import ActivityLogModel
 
@@ -29,14 +40,51 @@ class CustomBot(commands.Bot):
     
     async def setup_hook(self):
         """Load cogs and sync commands when bot starts"""
+        # Measure event loop lag and capture callbacks that block it
+        if Config.LOOP_MONITOR_ENABLED:
+            loop_monitor.start()
+        
+        # Trace every interaction's time to first response (before connecting, to hook DB calls)
+        if Config.INTERACTION_TRACING:
+            interaction_tracer.install()
+        
+        # Outbound DMs/channel messages go through one rate-limited, coalescing queue
+        send_queue.start(self)
+        
+        # Local spool for clock events made while the database is unreachable
+        await write_spool.load()
+        
         logger.info("Connecting to the database...")
         
         # Connect to database
         await db.connect()
         
+        # Development only: count round trips per interaction and flag N+1 patterns
+        if Config.DB_QUERY_DIAGNOSTICS:
+            install_query_diagnostics()
+        
         # Create tables from SQL file
         await db.execute_sql_file('databases/schema.sql')
         
+        # Load settings into memory and follow changes made by other processes
+        await settings_cache.load()
+        await settings_cache.start_listening()
+        
+        # Warm the in-memory autocomplete index
+        await autocomplete_index.load()
+        
+        # Build the working-day calendar (holidays and department weekends)
+        await work_calendar.load()
+        
+        # Load shift schedules (late threshold and required minutes)
+        await shift_schedules.load()
+        
+        # Rebuild rolling compliance rates from the last 90 days
+        await compliance_trends.load()
+        
+        # Catalogue of additional rating fields (for custom field search/autocomplete)
+        await custom_rating_catalogue.load()
+        
         # Load cogs
         logger.info("Loading cogs...")
         await self.load_extension('cogs.user_management')
@@ -48,6 +96,12 @@ class CustomBot(commands.Bot):
         await self.load_extension('cogs.clockin_clockout')
         await self.load_extension('cogs.work_management')
         await self.load_extension('cogs.compliance_rating')
+        await self.load_extension('cogs.maintenance')
+        await self.load_extension('cogs.search')
+        await self.load_extension('cogs.work_calendar')
+        
+        # Replay spooled clock events (the cogs registered their handlers)
+        write_spool.start()
         
         # Sync commands to guild
         guild = discord.Object(id=Config.GUILD_ID)
@@ -96,6 +150,10 @@ class CustomBot(commands.Bot):
     async def close(self):
         """Clean up when bot shuts down"""
         logger.info("Disconnecting from the database...")
+        loop_monitor.stop()
+        await write_spool.close()
+        await send_queue.close()
+        await settings_cache.stop_listening()
         await db.disconnect()
         await super().close()
 
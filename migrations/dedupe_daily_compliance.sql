@@ -0,0 +1,43 @@
+-- Migration: Keep one discipline compliance record per user per day
+-- Needed once on databases that recorded the same day several times before
+-- idx_daily_compliance_user_day existed; the bot refuses to start until it ran.
+-- compliance_date was backfilled from recorded_at (UTC date, the day the bot uses for new records).
+-- Older records of a day are copied to daily_compliance_archive before they are deleted.
+
+BEGIN;
+
+-- Step 0: compliance_date as schema.sql adds it (its startup run rolled back on the duplicates)
+ALTER TABLE daily_compliance ADD COLUMN IF NOT EXISTS compliance_date DATE;
+UPDATE daily_compliance SET compliance_date = recorded_at::DATE WHERE compliance_date IS NULL;
+
+-- Step 1: Archive table (same columns, plus when the row was archived)
+CREATE TABLE IF NOT EXISTS daily_compliance_archive (LIKE daily_compliance);
+ALTER TABLE daily_compliance_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP);
+
+-- Step 2: Every record except the latest of its user and day
+CREATE TEMP TABLE superseded_compliance ON COMMIT DROP AS
+SELECT dc.compliance_id
+FROM daily_compliance dc
+JOIN daily_compliance newer
+  ON newer.user_id = dc.user_id
+ AND newer.compliance_date = dc.compliance_date
+ AND (COALESCE(newer.recorded_at, '-infinity'), newer.compliance_id)
+   > (COALESCE(dc.recorded_at, '-infinity'), dc.compliance_id)
+GROUP BY dc.compliance_id;
+
+-- Step 3: Copy them to the archive, then delete them
+INSERT INTO daily_compliance_archive
+SELECT dc.*
+FROM daily_compliance dc
+WHERE dc.compliance_id IN (SELECT compliance_id FROM superseded_compliance);
+
+DELETE FROM daily_compliance
+WHERE compliance_id IN (SELECT compliance_id FROM superseded_compliance);
+
+-- Step 4: The index the compliance upserts rely on
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_compliance_user_day ON daily_compliance(user_id, compliance_date);
+
+COMMIT;
+
+-- Verification query (optional - archived rows per day)
+-- SELECT user_id, compliance_date, COUNT(*) FROM daily_compliance_archive GROUP BY user_id, compliance_date;
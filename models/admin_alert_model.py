@@ -0,0 +1,92 @@
+"""Leave threshold alert events and the grouped admin digest over them"""
+from utils.database import db, reporting
+from datetime import date
+from typing import Dict, Any, List
+
+
+class AdminAlertModel:
+    """
+    Every threshold breach is one row in admin_alert_events. The digest groups
+    the events not yet digested per employee and alert type, together with the
+    employee's current 7/30-day leave counts, in a single query.
+    """
+
+    @staticmethod
+    async def record_alert(
+        alert_type: str,
+        user_id: int,
+        event_date: date,
+        week_count: int,
+        month_count: int,
+        severity: str = 'normal',
+        notified: bool = False
+    ) -> int:
+        """Store an alert event, returns its id"""
+        async with db.pool.acquire() as conn:
+            return await conn.fetchval('''
+                INSERT INTO admin_alert_events (
+                    alert_type, user_id, event_date, week_count, month_count, severity, notified_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, CASE WHEN $7::BOOLEAN THEN TIMEZONE('utc', CURRENT_TIMESTAMP) END)
+                RETURNING id
+            ''', alert_type, user_id, event_date, week_count, month_count, severity, notified)
+
+    @staticmethod
+    @reporting
+    async def get_pending_digest(as_of: date) -> List[Dict[str, Any]]:
+        """
+        One row per (employee, alert type) with undigested events: number of
+        alerts and their ids, highest counts reported, latest leave date, whether
+        any was high severity, and the leave counts of that type in the 7/30 days
+        up to as_of.
+        """
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                WITH pending AS (
+                    SELECT
+                        user_id,
+                        alert_type,
+                        COUNT(*) AS alerts,
+                        MAX(week_count) AS week_count,
+                        MAX(month_count) AS month_count,
+                        MAX(event_date) AS latest_date,
+                        BOOL_OR(severity = 'high') AS high_severity,
+                        ARRAY_AGG(id ORDER BY id) AS event_ids
+                    FROM admin_alert_events
+                    WHERE digested_at IS NULL
+                    GROUP BY user_id, alert_type
+                )
+                SELECT
+                    p.*,
+                    u.name,
+                    u.department,
+                    COUNT(lr.leave_request_id) FILTER (
+                        WHERE lr.leave_period && daterange($1::DATE - 6, $1::DATE, '[]')
+                    ) AS leaves_7d,
+                    COUNT(lr.leave_request_id) AS leaves_30d
+                FROM pending p
+                JOIN users u ON u.user_id = p.user_id
+                LEFT JOIN leave_requests lr
+                    ON lr.user_id = p.user_id
+                   AND lr.leave_type = p.alert_type
+                   AND lr.status IN ('approved', 'pending')
+                   AND lr.leave_period && daterange($1::DATE - 29, $1::DATE, '[]')
+                GROUP BY p.user_id, p.alert_type, p.alerts, p.week_count, p.month_count,
+                         p.latest_date, p.high_severity, p.event_ids, u.name, u.department
+                ORDER BY p.high_severity DESC, leaves_30d DESC, u.name
+            ''', as_of)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def mark_digested(event_ids: List[int]) -> int:
+        """
+        Mark exactly the digested events, returns how many. Not an id range: an
+        event with a lower id can commit after the digest was read.
+        """
+        async with db.pool.acquire() as conn:
+            result = await conn.execute('''
+                UPDATE admin_alert_events
+                SET digested_at = TIMEZONE('utc', CURRENT_TIMESTAMP)
+                WHERE digested_at IS NULL AND id = ANY($1::INTEGER[])
+            ''', event_ids)
+            return int(result.split()[-1])
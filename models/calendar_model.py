@@ -0,0 +1,63 @@
+from utils.database import db
+from utils.work_calendar import work_calendar
+from datetime import date
+from typing import Optional, List, Dict, Any
+
+
+class CalendarModel:
+    """Holidays and department weekends backing the in-memory work calendar"""
+
+    @staticmethod
+    async def add_holiday(holiday_date: date, name: str, department: Optional[str] = None,
+                          created_by: int = None) -> Optional[int]:
+        """Add a holiday (department None = company-wide). Returns None if it already exists."""
+        async with db.pool.acquire() as conn:
+            holiday_id = await conn.fetchval('''
+                INSERT INTO holidays (holiday_date, name, department, created_by)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (holiday_date, COALESCE(department, '')) DO NOTHING
+                RETURNING holiday_id
+            ''', holiday_date, name, department, created_by)
+
+        if holiday_id:
+            await work_calendar.load()
+        return holiday_id
+
+    @staticmethod
+    async def remove_holiday(holiday_id: int) -> bool:
+        async with db.pool.acquire() as conn:
+            result = await conn.execute('DELETE FROM holidays WHERE holiday_id = $1', holiday_id)
+
+        removed = result == 'DELETE 1'
+        if removed:
+            await work_calendar.load()
+        return removed
+
+    @staticmethod
+    async def get_holidays(year: int, department: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a year's holidays that apply to a department (company-wide ones included)"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT holiday_id, holiday_date, name, department
+                FROM holidays
+                WHERE holiday_date >= make_date($1, 1, 1)
+                    AND holiday_date < make_date($1 + 1, 1, 1)
+                    AND (department IS NULL OR $2::VARCHAR IS NULL OR department = $2)
+                ORDER BY holiday_date, department NULLS FIRST
+            ''', year, department)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    async def set_weekend_days(department: str, weekend_days: List[int], updated_by: int = None):
+        """Set the ISO weekdays a department does not work"""
+        async with db.pool.acquire() as conn:
+            await conn.execute('''
+                INSERT INTO department_work_weeks (department, weekend_days, updated_by, updated_at)
+                VALUES ($1, $2, $3, TIMEZONE('utc', CURRENT_TIMESTAMP))
+                ON CONFLICT (department) DO UPDATE
+                SET weekend_days = EXCLUDED.weekend_days,
+                    updated_by = EXCLUDED.updated_by,
+                    updated_at = EXCLUDED.updated_at
+            ''', department, sorted(set(weekend_days)), updated_by)
+
+        await work_calendar.load()
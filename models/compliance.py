@@ -1,5 +1,7 @@
 from utils.database import db
-from datetime import datetime
+from utils.compliance_trends import compliance_trends, CATEGORIES
+from datetime import datetime, date
+import pytz
 from typing import Optional, List, Dict, Any
 
 class ComplianceModel:
@@ -18,9 +20,11 @@ class ComplianceModel:
         break_reason: Optional[str],
         google_drive_usage: bool,
         google_drive_reason: Optional[str],
-        recorded_by_discord_id: int
+        recorded_by_discord_id: int,
+        compliance_date: date = None
     ) -> int:
-        """Create a new compliance record and return compliance_id"""
+        """Create (or replace) a user's compliance record for the day and return compliance_id"""
+        compliance_date = compliance_date or datetime.now(pytz.utc).date()
         async with db.pool.acquire() as conn:
             compliance_id = await conn.fetchval('''
                 INSERT INTO daily_compliance (
@@ -30,14 +34,98 @@ class ComplianceModel:
                     discord_usage, discord_reason,
                     break_usage, break_reason,
                     google_drive_usage, google_drive_reason,
-                    recorded_by_discord_id
+                    recorded_by_discord_id, compliance_date
                 )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+                ON CONFLICT (user_id, compliance_date) DO UPDATE SET
+                    desklog_usage = EXCLUDED.desklog_usage, desklog_reason = EXCLUDED.desklog_reason,
+                    trackabi_usage = EXCLUDED.trackabi_usage, trackabi_reason = EXCLUDED.trackabi_reason,
+                    discord_usage = EXCLUDED.discord_usage, discord_reason = EXCLUDED.discord_reason,
+                    break_usage = EXCLUDED.break_usage, break_reason = EXCLUDED.break_reason,
+                    google_drive_usage = EXCLUDED.google_drive_usage, google_drive_reason = EXCLUDED.google_drive_reason,
+                    recorded_by_discord_id = EXCLUDED.recorded_by_discord_id,
+                    recorded_at = TIMEZONE('utc', CURRENT_TIMESTAMP)
                 RETURNING compliance_id
             ''', user_id, desklog_usage, desklog_reason, trackabi_usage, trackabi_reason,
                 discord_usage, discord_reason, break_usage, break_reason,
-                google_drive_usage, google_drive_reason, recorded_by_discord_id)
-            return compliance_id
+                google_drive_usage, google_drive_reason, recorded_by_discord_id, compliance_date)
+        
+        compliance_trends.record(user_id, compliance_date, {
+            'desklog': desklog_usage,
+            'trackabi': trackabi_usage,
+            'discord': discord_usage,
+            'break': break_usage,
+            'google_drive': google_drive_usage
+        })
+        return compliance_id
+    
+    @staticmethod
+    async def record_day(compliance_date: date, records: List[Dict[str, Any]], recorded_by_discord_id: int) -> int:
+        """
+        Record a whole team's compliance for one day in a single statement.
+        Each record has user_id plus the five <check>_usage / <check>_reason keys;
+        users already recorded that day are updated, so re-submitting is safe.
+        Returns the number of rows written.
+        """
+        if not records:
+            return 0
+        
+        columns = [
+            'desklog_usage', 'desklog_reason',
+            'trackabi_usage', 'trackabi_reason',
+            'discord_usage', 'discord_reason',
+            'break_usage', 'break_reason',
+            'google_drive_usage', 'google_drive_reason'
+        ]
+        arrays = [[record['user_id'] for record in records]] + [
+            [record.get(column) for record in records] for column in columns
+        ]
+        
+        async with db.pool.acquire() as conn:
+            result = await conn.execute('''
+                INSERT INTO daily_compliance (
+                    user_id,
+                    desklog_usage, desklog_reason,
+                    trackabi_usage, trackabi_reason,
+                    discord_usage, discord_reason,
+                    break_usage, break_reason,
+                    google_drive_usage, google_drive_reason,
+                    recorded_by_discord_id, compliance_date
+                )
+                SELECT r.*, $12::BIGINT, $13::DATE
+                FROM unnest(
+                    $1::INTEGER[],
+                    $2::BOOLEAN[], $3::TEXT[],
+                    $4::BOOLEAN[], $5::TEXT[],
+                    $6::BOOLEAN[], $7::TEXT[],
+                    $8::BOOLEAN[], $9::TEXT[],
+                    $10::BOOLEAN[], $11::TEXT[]
+                ) AS r
+                ON CONFLICT (user_id, compliance_date) DO UPDATE SET
+                    desklog_usage = EXCLUDED.desklog_usage, desklog_reason = EXCLUDED.desklog_reason,
+                    trackabi_usage = EXCLUDED.trackabi_usage, trackabi_reason = EXCLUDED.trackabi_reason,
+                    discord_usage = EXCLUDED.discord_usage, discord_reason = EXCLUDED.discord_reason,
+                    break_usage = EXCLUDED.break_usage, break_reason = EXCLUDED.break_reason,
+                    google_drive_usage = EXCLUDED.google_drive_usage, google_drive_reason = EXCLUDED.google_drive_reason,
+                    recorded_by_discord_id = EXCLUDED.recorded_by_discord_id,
+                    recorded_at = TIMEZONE('utc', CURRENT_TIMESTAMP)
+            ''', *arrays, recorded_by_discord_id, compliance_date)
+        
+        for record in records:
+            compliance_trends.record(record['user_id'], compliance_date, {
+                category: record.get(f'{category}_usage') for category in CATEGORIES
+            })
+        return int(result.split()[-1])
+    
+    @staticmethod
+    async def get_recorded_user_ids(compliance_date: date, user_ids: List[int]) -> List[int]:
+        """Which of the given users already have a compliance record for the day"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT user_id FROM daily_compliance
+                WHERE compliance_date = $1 AND user_id = ANY($2::INTEGER[])
+            ''', compliance_date, user_ids)
+            return [row['user_id'] for row in rows]
     
     @staticmethod
     async def get_user_compliance_history(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
@@ -1,8 +1,20 @@
-from utils.database import db
+from utils.database import db, reporting
+from utils.rating_aggregates import rating_aggregates
+from utils.custom_rating_catalogue import custom_rating_catalogue, KEY_PATTERN, is_numeric
 from datetime import date
 from typing import Dict, Any, List, Optional
 import json
 
+# Leaderboard metrics: rating_aggregates column and whether higher is better
+RATING_METRICS = {
+    'performance': ('avg_performance_rating', True),
+    'task': ('avg_task_rating', True),
+    'rule_breaks': ('avg_rule_breaks', False),
+}
+
+# Custom field comparisons -> jsonpath operator
+CUSTOM_FIELD_OPERATORS = {'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>=', 'eq': '==', 'ne': '!='}
+
 
 class ComplianceRatingModel:
     """Database operations for compliance_ratings table with additional fields support"""
@@ -50,8 +62,11 @@ class ComplianceRatingModel:
                 ''', user_id, rated_by_user_id, rating_date, compliance_rule_breaks,
                     task_submission_rating, task_submission_feedback,
                     overall_performance_rating, overall_performance_feedback)
-            
-            return rating_id
+        
+        # Fold the new rating into the averages shortly (debounced)
+        rating_aggregates.schedule_refresh()
+        custom_rating_catalogue.add(custom_ratings)
+        return rating_id
     
     @staticmethod
     async def get_user_ratings(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
@@ -116,6 +131,62 @@ class ComplianceRatingModel:
                 ''', user_id, limit)
                 return [dict(row) for row in rows]
     
+    @staticmethod
+    @reporting
+    async def get_ratings_count_for_users(user_ids: List[int], start_date: date = None, end_date: date = None) -> int:
+        """Number of ratings of the given users, optionally within a date range"""
+        async with db.pool.acquire() as conn:
+            return await conn.fetchval('''
+                SELECT COUNT(*)
+                FROM compliance_ratings
+                WHERE user_id = ANY($1::INTEGER[])
+                  AND ($2::DATE IS NULL OR rating_date >= $2)
+                  AND ($3::DATE IS NULL OR rating_date <= $3)
+            ''', user_ids, start_date, end_date)
+
+    @staticmethod
+    @reporting
+    async def get_ratings_for_users(
+        user_ids: List[int],
+        start_date: date = None,
+        end_date: date = None,
+        limit: int = 5,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """One page of ratings of the given users, newest first (paginated)"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT
+                    er.rating_id,
+                    er.user_id,
+                    er.rating_date,
+                    er.compliance_rule_breaks,
+                    er.task_submission_rating,
+                    er.task_submission_feedback,
+                    er.overall_performance_rating,
+                    er.overall_performance_feedback,
+                    er.custom_ratings,
+                    er.created_at,
+                    ru.name as user_name,
+                    ru.discord_id as user_discord_id,
+                    u.name as rated_by_name
+                FROM compliance_ratings er
+                JOIN users ru ON er.user_id = ru.user_id
+                JOIN users u ON er.rated_by_user_id = u.user_id
+                WHERE er.user_id = ANY($1::INTEGER[])
+                  AND ($2::DATE IS NULL OR er.rating_date >= $2)
+                  AND ($3::DATE IS NULL OR er.rating_date <= $3)
+                ORDER BY er.rating_date DESC, er.created_at DESC, er.rating_id DESC
+                LIMIT $4 OFFSET $5
+            ''', user_ids, start_date, end_date, limit, offset)
+
+            results = []
+            for row in rows:
+                row_dict = dict(row)
+                row_dict['custom_ratings'] = json.loads(row_dict['custom_ratings']) if row_dict.get('custom_ratings') else {}
+                results.append(row_dict)
+            return results
+
     @staticmethod
     async def get_ratings_by_date(user_id: int, rating_date: date) -> List[Dict[str, Any]]:
         """Get all ratings for a user on a specific date including additional fields"""
@@ -300,4 +371,155 @@ class ComplianceRatingModel:
                     WHERE er.rating_date = $1
                     ORDER BY u.name
                 ''', rating_date)
-                return [dict(row) for row in rows]
\ No newline at end of file
+                return [dict(row) for row in rows]
+
+    # ==================== AGGREGATES (rating_aggregates view) ====================
+    @staticmethod
+    def _aggregate_row(row) -> Dict[str, Any]:
+        row_dict = dict(row)
+        custom_averages = row_dict.get('custom_averages')
+        if isinstance(custom_averages, str):
+            row_dict['custom_averages'] = json.loads(custom_averages)
+        return row_dict
+
+    @staticmethod
+    async def get_rating_aggregate(scope: str, scope_key: str, period: str = 'all') -> Optional[Dict[str, Any]]:
+        """Averages for one user (scope_key = user_id), department or 'company', for a month ('YYYY-MM') or 'all'"""
+        async with db.pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                SELECT * FROM rating_aggregates
+                WHERE scope = $1 AND scope_key = $2 AND period = $3
+            ''', scope, str(scope_key), period)
+            return ComplianceRatingModel._aggregate_row(row) if row else None
+
+    @staticmethod
+    async def get_rating_leaderboard(
+        scope: str,
+        period: str = 'all',
+        metric: str = 'performance',
+        custom_key: str = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Users or departments ranked by an average (or a numeric custom rating key), best first"""
+        if custom_key:
+            order_by, higher_is_better = "(ra.custom_averages ->> $3)::NUMERIC", True
+        else:
+            column, higher_is_better = RATING_METRICS[metric]
+            order_by = f"ra.{column}"
+
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch(f'''
+                SELECT ra.*, u.name AS user_name
+                FROM rating_aggregates ra
+                LEFT JOIN users u ON ra.scope = 'user' AND u.user_id::TEXT = ra.scope_key
+                WHERE ra.scope = $1 AND ra.period = $2
+                  {"AND ra.custom_averages ? $3" if custom_key else ""}
+                ORDER BY {order_by} {"DESC" if higher_is_better else "ASC"} NULLS LAST, ra.ratings DESC
+                LIMIT {"$4" if custom_key else "$3"}
+            ''', *([scope, period, custom_key, limit] if custom_key else [scope, period, limit]))
+            return [ComplianceRatingModel._aggregate_row(row) for row in rows]
+
+    @staticmethod
+    @reporting
+    async def get_rating_trend(scope: str, scope_key: str, months: int = 6) -> List[Dict[str, Any]]:
+        """Monthly averages for a user/department/company, most recent month first"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT * FROM rating_aggregates
+                WHERE scope = $1 AND scope_key = $2 AND period <> 'all'
+                ORDER BY period DESC
+                LIMIT $3
+            ''', scope, str(scope_key), months)
+            return [ComplianceRatingModel._aggregate_row(row) for row in rows]
+
+    # ==================== CUSTOM FIELD QUERIES (GIN on custom_ratings) ====================
+    @staticmethod
+    def _custom_field_predicate(key: str, operator: str, value: str) -> tuple:
+        """
+        Build an index-servable predicate on custom_ratings: a jsonpath filter
+        (@?) for numeric comparisons, containment (@>) for text equality.
+        Values may be stored as numbers or numeric strings, hence .double().
+        """
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid field name: {key}")
+        if operator not in CUSTOM_FIELD_OPERATORS:
+            raise ValueError(f"Invalid comparison: {operator}")
+
+        if is_numeric(value):
+            number = ('%.6f' % float(value)).rstrip('0').rstrip('.')
+            path = f'$."{key}" ? (@.double() {CUSTOM_FIELD_OPERATORS[operator]} {number})'
+            return "cr.custom_ratings @? $1::JSONPATH", path
+        if operator == 'eq':
+            return "cr.custom_ratings @> $1::JSONB", json.dumps({key: value.strip()})
+        raise ValueError("Only 'equals' can be used with a non-numeric value")
+
+    @staticmethod
+    async def find_ratings_by_custom_field(
+        key: str,
+        operator: str,
+        value: str,
+        start_date: date,
+        end_date: date,
+        department: str = None,
+        limit: int = 25
+    ) -> Dict[str, Any]:
+        """
+        Ratings in a date range whose custom field matches, e.g. communication < 5.
+        Returns {'total': matching ratings, 'ratings': newest first (up to limit)}.
+        """
+        predicate, argument = ComplianceRatingModel._custom_field_predicate(key, operator, value)
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch(f'''
+                SELECT
+                    cr.rating_id,
+                    cr.user_id,
+                    u.name AS user_name,
+                    u.department,
+                    cr.rating_date,
+                    cr.custom_ratings ->> $2 AS field_value,
+                    cr.overall_performance_rating,
+                    cr.task_submission_rating,
+                    COUNT(*) OVER () AS total
+                FROM compliance_ratings cr
+                JOIN users u ON cr.user_id = u.user_id
+                WHERE {predicate}
+                  AND cr.rating_date BETWEEN $3 AND $4
+                  AND ($5::TEXT IS NULL OR u.department = $5)
+                ORDER BY cr.rating_date DESC, u.name
+                LIMIT $6
+            ''', argument, key, start_date, end_date, department, limit)
+            return {
+                'total': rows[0]['total'] if rows else 0,
+                'ratings': [dict(row) for row in rows]
+            }
+
+    @staticmethod
+    @reporting
+    async def get_custom_field_summary(
+        key: str,
+        start_date: date,
+        end_date: date,
+        department: str = None
+    ) -> List[Dict[str, Any]]:
+        """Count/avg/min/max of a numeric custom field per department (plus a NULL-department total row)"""
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid field name: {key}")
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT
+                    u.department,
+                    COUNT(*) AS ratings,
+                    ROUND(AVG(TRIM(cr.custom_ratings ->> $1)::NUMERIC), 2) AS average,
+                    MIN(TRIM(cr.custom_ratings ->> $1)::NUMERIC) AS minimum,
+                    MAX(TRIM(cr.custom_ratings ->> $1)::NUMERIC) AS maximum,
+                    GROUPING(u.department) AS is_total
+                FROM compliance_ratings cr
+                JOIN users u ON cr.user_id = u.user_id
+                WHERE cr.custom_ratings ? $1
+                  AND cr.custom_ratings ->> $1 ~ '^\s*-?[0-9]+(\.[0-9]+)?\s*$'
+                  AND cr.rating_date BETWEEN $2 AND $3
+                  AND ($4::TEXT IS NULL OR u.department = $4)
+                GROUP BY ROLLUP (u.department)
+                ORDER BY is_total DESC, average
+            ''', key, start_date, end_date, department)
+            return [dict(row) for row in rows]
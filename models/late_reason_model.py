@@ -1,4 +1,5 @@
 from utils.database import db
+from utils.autocomplete import autocomplete_index
 from datetime import datetime, date
 from typing import List, Dict, Any
 
@@ -24,6 +25,7 @@ class LateReasonModel:
                 VALUES ($1, $2, $3, $4, $5, $6)
                 RETURNING id
             ''', user_id, time_tracking_id, late_mins, reason, is_admin_informed, morning_meeting_attended)
+            autocomplete_index.add_late_reason(late_id, user_id, late_mins)
             return late_id
     
     @staticmethod
@@ -94,6 +96,7 @@ class LateReasonModel:
                 SET admin_approval = $1
                 WHERE id = $2
             ''', admin_approval, late_reason_id)
+            autocomplete_index.set_late_reason_approval(late_reason_id, admin_approval)
             return result != "UPDATE 0"
     
     @staticmethod
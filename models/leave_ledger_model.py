@@ -0,0 +1,206 @@
+"""Append-only leave balance ledger with a cached balance on users.pending_leaves"""
+from utils.database import db, reporting
+from datetime import date
+from decimal import Decimal
+from typing import Optional, List, Dict, Any
+
+
+class LeaveLedgerModel:
+    """
+    Every balance change is an entry in leave_ledger (opening, accrual, deduction,
+    adjustment, reversal). users.pending_leaves is only ever changed together with
+    a ledger entry, in the same statement, so balance reads stay a single-row lookup.
+    """
+
+    @staticmethod
+    async def record_entry(
+        user_id: int,
+        entry_type: str,
+        days: float,
+        leave_request_id: int = None,
+        reversed_entry_id: int = None,
+        note: str = None,
+        created_by: int = None,
+        clamp_at_zero: bool = False,
+        conn=None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Append a ledger entry and apply it to the cached balance.
+        With clamp_at_zero a negative entry never takes the balance below 0
+        (the recorded amount is what was actually deducted).
+        Returns {'entry_id', 'days', 'balance'} or None if the user does not exist.
+        """
+        query = '''
+            WITH current_balance AS (
+                SELECT user_id, COALESCE(pending_leaves, 0) AS balance
+                FROM users
+                WHERE user_id = $1
+                FOR UPDATE
+            ),
+            entry AS (
+                INSERT INTO leave_ledger (
+                    user_id, entry_type, days, leave_request_id,
+                    reversed_entry_id, note, created_by
+                )
+                SELECT user_id, $2::VARCHAR,
+                       CASE
+                           WHEN $8::BOOLEAN AND $3::DECIMAL < 0 THEN GREATEST($3::DECIMAL, -GREATEST(balance, 0))
+                           ELSE $3::DECIMAL
+                       END,
+                       $4::INTEGER, $5::INTEGER, $6::TEXT, $7::INTEGER
+                FROM current_balance
+                RETURNING entry_id, days
+            )
+            UPDATE users u
+            SET pending_leaves = COALESCE(u.pending_leaves, 0) + entry.days,
+                updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP)
+            FROM entry
+            WHERE u.user_id = $1
+            RETURNING entry.entry_id, entry.days, u.pending_leaves AS balance
+        '''
+        args = (user_id, entry_type, Decimal(str(days)), leave_request_id,
+                reversed_entry_id, note, created_by, clamp_at_zero)
+
+        if conn is not None:
+            row = await conn.fetchrow(query, *args)
+        else:
+            async with db.pool.acquire() as conn:
+                row = await conn.fetchrow(query, *args)
+        return dict(row) if row else None
+
+    @staticmethod
+    async def record_opening_balance(user_id: int, created_by: int = None, conn=None):
+        """Record the balance a user was registered with as their opening entry"""
+        query = '''
+            INSERT INTO leave_ledger (user_id, entry_type, days, note, created_by)
+            SELECT user_id, 'opening', COALESCE(pending_leaves, 0), 'Opening balance', $2::INTEGER
+            FROM users
+            WHERE user_id = $1
+        '''
+        if conn is not None:
+            await conn.execute(query, user_id, created_by)
+        else:
+            async with db.pool.acquire() as conn:
+                await conn.execute(query, user_id, created_by)
+
+    @staticmethod
+    async def deduct_for_leave(user_id: int, days: float, leave_request_id: int, created_by: int = None, conn=None):
+        """Deduct approved leave days from the balance (clamped at 0)"""
+        return await LeaveLedgerModel.record_entry(
+            user_id=user_id,
+            entry_type='deduction',
+            days=-days,
+            leave_request_id=leave_request_id,
+            note=f"Approved leave #{leave_request_id} ({days} day(s) requested)",
+            created_by=created_by,
+            clamp_at_zero=True,
+            conn=conn
+        )
+
+    @staticmethod
+    async def adjust_balance_to(user_id: int, new_balance: float, created_by: int = None, note: str = None, conn=None):
+        """Set the balance to an exact value through an adjustment entry"""
+        query = '''
+            SELECT COALESCE(pending_leaves, 0) FROM users WHERE user_id = $1
+        '''
+        if conn is not None:
+            current = await conn.fetchval(query, user_id)
+        else:
+            async with db.pool.acquire() as pool_conn:
+                current = await pool_conn.fetchval(query, user_id)
+
+        if current is None:
+            return None
+
+        difference = Decimal(str(new_balance)) - current
+        if difference == 0:
+            return None
+
+        return await LeaveLedgerModel.record_entry(
+            user_id=user_id,
+            entry_type='adjustment',
+            days=difference,
+            note=note or f"Balance set to {new_balance}",
+            created_by=created_by,
+            conn=conn
+        )
+
+    @staticmethod
+    async def reverse_entry(entry_id: int, created_by: int = None, note: str = None, conn=None) -> Optional[Dict[str, Any]]:
+        """Append an entry cancelling a previous one (each entry can be reversed once)"""
+        if conn is None:
+            async with db.pool.acquire() as conn:
+                async with conn.transaction():
+                    return await LeaveLedgerModel.reverse_entry(entry_id, created_by, note, conn=conn)
+
+        original = await conn.fetchrow('''
+            SELECT entry_id, user_id, days, leave_request_id
+            FROM leave_ledger
+            WHERE entry_id = $1 AND entry_type != 'reversal'
+        ''', entry_id)
+
+        if not original:
+            return None
+
+        already_reversed = await conn.fetchval(
+            'SELECT EXISTS(SELECT 1 FROM leave_ledger WHERE reversed_entry_id = $1)', entry_id
+        )
+        if already_reversed:
+            return None
+
+        return await LeaveLedgerModel.record_entry(
+            user_id=original['user_id'],
+            entry_type='reversal',
+            days=-original['days'],
+            leave_request_id=original['leave_request_id'],
+            reversed_entry_id=entry_id,
+            note=note or f"Reversal of entry #{entry_id}",
+            created_by=created_by,
+            conn=conn
+        )
+
+    @staticmethod
+    @reporting
+    async def accrue_monthly(days: float, period: date, note: str = None) -> int:
+        """
+        Credit every active user for the given month in one statement.
+        Idempotent: a user is credited at most once per accrual period.
+        Returns the number of users credited.
+        """
+        async with db.pool.acquire() as conn:
+            result = await conn.execute('''
+                WITH credited AS (
+                    INSERT INTO leave_ledger (user_id, entry_type, days, accrual_period, note)
+                    SELECT user_id, 'accrual', $1::DECIMAL, $2::DATE, $3::TEXT
+                    FROM users
+                    WHERE is_deleted = FALSE
+                    ON CONFLICT (user_id, accrual_period) WHERE entry_type = 'accrual' DO NOTHING
+                    RETURNING user_id, days
+                )
+                UPDATE users u
+                SET pending_leaves = COALESCE(u.pending_leaves, 0) + c.days,
+                    updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP)
+                FROM credited c
+                WHERE u.user_id = c.user_id
+            ''', Decimal(str(days)), period, note or f"Monthly accrual {period.strftime('%m/%Y')}")
+            return int(result.split()[-1])
+
+    @staticmethod
+    async def get_user_ledger(user_id: int, limit: int = 15) -> List[Dict[str, Any]]:
+        """Get a user's most recent ledger entries with a running balance"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT *
+                FROM (
+                    SELECT l.entry_id, l.entry_type, l.days, l.leave_request_id,
+                           l.reversed_entry_id, l.note, l.created_at,
+                           cb.name AS created_by_name,
+                           SUM(l.days) OVER (ORDER BY l.created_at, l.entry_id) AS running_balance
+                    FROM leave_ledger l
+                    LEFT JOIN users cb ON l.created_by = cb.user_id
+                    WHERE l.user_id = $1
+                ) ledger
+                ORDER BY created_at DESC, entry_id DESC
+                LIMIT $2
+            ''', user_id, limit)
+            return [dict(row) for row in rows]
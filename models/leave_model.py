@@ -1,6 +1,9 @@
 """Leave request model for managing employee leave requests"""
-from datetime import datetime
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple
 from utils.database import db
+from models.leave_ledger_model import LeaveLedgerModel
+import asyncpg
 
 
 class LeaveRequestModel:
@@ -18,7 +21,11 @@ class LeaveRequestModel:
         compensating_day: str = None,
         proof_provided: bool = False
     ) -> int:
-        """Create a new leave request"""
+        """
+        Create a new leave request.
+        Raises ValueError when it overlaps one of the user's approved or pending
+        leaves (enforced by the leave_requests_no_overlap exclusion constraint).
+        """
         try:
             query = """
             INSERT INTO leave_requests (
@@ -47,6 +54,8 @@ class LeaveRequestModel:
             
             return leave_request_id
         
+        except asyncpg.exceptions.ExclusionViolationError:
+            raise ValueError("You already have an approved or pending leave overlapping these dates.")
         except Exception as e:
             print(f"❌ Error creating leave request: {e}")
             raise
@@ -60,6 +69,7 @@ class LeaveRequestModel:
                 lr.leave_request_id,
                 lr.user_id,
                 u.name,
+                u.department,
                 lr.leave_type,
                 lr.start_date,
                 lr.end_date,
@@ -119,19 +129,36 @@ class LeaveRequestModel:
             raise
     
     @staticmethod
-    async def approve_leave_request(leave_request_id: int, approved_by_user_id: int) -> bool:
-        """Approve a leave request"""
+    async def approve_leave_request(leave_request_id: int, approved_by_user_id: int, deduct_days: float = 0) -> bool:
+        """
+        Approve a pending leave request and deduct deduct_days from the user's balance,
+        in one transaction. Returns False if the request is missing or no longer pending,
+        so two admins approving at once deduct only once.
+        """
         try:
             query = """
             UPDATE leave_requests
             SET status = 'approved', approved_by = $1, updated_at = NOW()
-            WHERE leave_request_id = $2
+            WHERE leave_request_id = $2 AND status = 'pending'
+            RETURNING user_id
             """
             
             async with db.pool.acquire() as conn:
-                result = await conn.execute(query, approved_by_user_id, leave_request_id)
+                async with conn.transaction():
+                    user_id = await conn.fetchval(query, approved_by_user_id, leave_request_id)
+                    if user_id is None:
+                        return False
+
+                    if deduct_days > 0:
+                        await LeaveLedgerModel.deduct_for_leave(
+                            user_id,
+                            deduct_days,
+                            leave_request_id=leave_request_id,
+                            created_by=approved_by_user_id,
+                            conn=conn
+                        )
             
-            return result == 'UPDATE 1'
+            return True
         
         except Exception as e:
             print(f"❌ Error approving leave request: {e}")
@@ -139,12 +166,16 @@ class LeaveRequestModel:
     
     @staticmethod
     async def reject_leave_request(leave_request_id: int, rejection_reason: str) -> bool:
-        """Reject a leave request"""
+        """
+        Reject a pending leave request. Returns False if the request is missing or
+        was already approved or rejected, so an approved leave never keeps its
+        deduction under a rejected status.
+        """
         try:
             query = """
             UPDATE leave_requests
             SET status = 'rejected', rejection_reason = $1, updated_at = NOW()
-            WHERE leave_request_id = $2
+            WHERE leave_request_id = $2 AND status = 'pending'
             """
             
             async with db.pool.acquire() as conn:
@@ -187,8 +218,8 @@ class LeaveRequestModel:
             raise
     
     @staticmethod
-    async def check_pending_leaves(user_id: int) -> int:
-        """Get number of pending leaves for a user"""
+    async def check_pending_leaves(user_id: int) -> float:
+        """Get number of pending leaves for a user (cached balance maintained by LeaveLedgerModel)"""
         try:
             query = """
             SELECT pending_leaves FROM users WHERE user_id = $1
@@ -203,28 +234,6 @@ class LeaveRequestModel:
             print(f"❌ Error checking pending leaves: {e}")
             raise
     
-    @staticmethod
-    async def deduct_pending_leave(user_id: int, days: int = 1) -> bool:
-        """Deduct a number of days from pending paid leaves (clamped at 0)"""
-        try:
-            query = """
-            UPDATE users
-            SET pending_leaves = CASE 
-                WHEN pending_leaves > 0 THEN GREATEST(pending_leaves - $2, 0)
-                ELSE 0
-            END
-            WHERE user_id = $1
-            """
-            
-            async with db.pool.acquire() as conn:
-                result = await conn.execute(query, user_id, days)
-            
-            return result == 'UPDATE 1'
-        
-        except Exception as e:
-            print(f"❌ Error deducting pending leave: {e}")
-            raise
-    
     @staticmethod
     async def get_users_on_leave_for_date(check_date):
         """Get all users who are on leave (approved or pending) for a specific date"""
@@ -243,8 +252,7 @@ class LeaveRequestModel:
             JOIN users u ON lr.user_id = u.user_id
             WHERE u.is_deleted = FALSE
                 AND lr.status IN ('approved', 'pending')
-                AND lr.start_date <= $1
-                AND (lr.end_date >= $1 OR lr.end_date IS NULL)
+                AND lr.leave_period @> $1::DATE
             ORDER BY u.name
             """
             
@@ -258,44 +266,89 @@ class LeaveRequestModel:
             raise
     
     @staticmethod
-    async def get_non_compliant_count(user_id: int, start_date, end_date) -> int:
-        """Get count of non-compliant leave requests for a user where the leave date falls within a date range"""
+    async def get_approved_leaves_in_range(start_date, end_date):
+        """Get all approved leaves whose period overlaps a date range"""
         try:
             query = """
-            SELECT COUNT(*) 
-            FROM leave_requests
-            WHERE user_id = $1
-                AND leave_type = 'non_compliant'
-                AND status IN ('approved', 'pending')
-                AND start_date >= $2
-                AND start_date <= $3
+            SELECT lr.user_id, lr.leave_type, lr.start_date, lr.end_date, lr.duration_hours
+            FROM leave_requests lr
+            WHERE lr.status = 'approved'
+                AND lr.leave_period && daterange($1::DATE, $2::DATE, '[]')
             """
             
             async with db.pool.acquire() as conn:
-                count = await conn.fetchval(query, user_id, start_date, end_date)
+                rows = await conn.fetch(query, start_date, end_date)
             
-            return count or 0
+            return [dict(row) for row in rows]
         
         except Exception as e:
-            print(f"❌ Error counting non-compliant leaves: {e}")
-            return 0
-
+            print(f"❌ Error fetching approved leaves: {e}")
+            raise
+    
     @staticmethod
-    async def get_sick_leave_count(user_id: int, start_date, end_date) -> int:
-        """Get count of sick leave requests for a user within a date range"""
+    async def get_leave_stats(
+        user_id: int,
+        windows: Dict[str, Optional[Tuple[date, date]]],
+        leave_types: List[str] = None,
+        statuses: List[str] = None
+    ) -> Dict[str, dict]:
+        """
+        Count a user's leave requests for several date windows in one query.
+        `windows` maps a name to an inclusive (start, end) date range, or None for all time;
+        a leave counts in a window when its period overlaps it.
+        Returns {window: {'total': n, 'by_type': {leave_type: n}, 'by_status': {status: n}}}
+        """
         try:
-            query = """
-            SELECT COUNT(*)
+            names = list(windows)
+            params = [user_id]
+            columns = []
+            for index, name in enumerate(names):
+                window = windows[name]
+                if window is None:
+                    columns.append(f"COUNT(*) AS w{index}")
+                else:
+                    params.extend(window)
+                    columns.append(
+                        f"COUNT(*) FILTER (WHERE leave_period && "
+                        f"daterange(${len(params) - 1}::DATE, ${len(params)}::DATE, '[]')) AS w{index}"
+                    )
+
+            conditions = ["user_id = $1"]
+            if leave_types:
+                params.append(list(leave_types))
+                conditions.append(f"leave_type = ANY(${len(params)}::TEXT[])")
+            if statuses:
+                params.append(list(statuses))
+                conditions.append(f"status = ANY(${len(params)}::TEXT[])")
+            if names and all(windows[name] is not None for name in names):
+                # Bound the scan to the outer edges of all windows
+                params.append(min(windows[name][0] for name in names))
+                params.append(max(windows[name][1] for name in names))
+                conditions.append(f"start_date <= ${len(params)}::DATE")
+                conditions.append(f"(end_date IS NULL OR end_date >= ${len(params) - 1}::DATE)")
+
+            query = f"""
+            SELECT leave_type, status, {', '.join(columns)}
             FROM leave_requests
-            WHERE user_id = $1
-                AND leave_type = 'sick_leave'
-                AND status IN ('approved', 'pending')
-                AND start_date >= $2
-                AND start_date <= $3
+            WHERE {' AND '.join(conditions)}
+            GROUP BY leave_type, status
             """
+
             async with db.pool.acquire() as conn:
-                count = await conn.fetchval(query, user_id, start_date, end_date)
-            return count or 0
+                rows = await conn.fetch(query, *params)
+
+            stats = {name: {'total': 0, 'by_type': {}, 'by_status': {}} for name in names}
+            for row in rows:
+                for index, name in enumerate(names):
+                    count = row[f"w{index}"]
+                    if not count:
+                        continue
+                    stats[name]['total'] += count
+                    stats[name]['by_type'][row['leave_type']] = stats[name]['by_type'].get(row['leave_type'], 0) + count
+                    stats[name]['by_status'][row['status']] = stats[name]['by_status'].get(row['status'], 0) + count
+
+            return stats
+
         except Exception as e:
-            print(f"❌ Error counting sick leaves: {e}")
-            return 0
+            print(f"❌ Error fetching leave stats: {e}")
+            raise
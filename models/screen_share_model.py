@@ -1,63 +1,70 @@
 from utils.database import db
 from datetime import datetime
+from typing import List, Dict, Any
 
 class ScreenShareModel:
     """Database operations for screen_share_sessions table"""
     
     @staticmethod
-    async def start_session(user_id: int,time_tracking_id:int, reason: str = None):
-        """Start a new screen share session"""
+    async def start_session(user_id: int,time_tracking_id:int, reason: str = None, started_at: datetime = None):
+        """Start a new screen share session (started_at defaults to now, set when replaying)"""
         async with db.pool.acquire() as conn:
             session_id = await conn.fetchval('''
                 INSERT INTO screen_share_sessions 
                 (user_id,time_tracking_id, screen_share_on_time, screen_share_on_reason, is_screen_shared)
                 VALUES ($1, $2, $3, $4, TRUE)
                 RETURNING session_id
-            ''', user_id,time_tracking_id, datetime.now(), reason)
+            ''', user_id,time_tracking_id, started_at or datetime.now(), reason)
             return session_id
     
     @staticmethod
-    async def end_session(session_id: int, reason: str = None):
-        """End the active screen share session for a user"""
-        async with db.pool.acquire() as conn:
-            # Get the active session
-            session = await conn.fetchrow('''
-                SELECT screen_share_on_time 
-                FROM screen_share_sessions
-                WHERE session_id = $1 
-            ''', session_id)
-            
-            if not session:
-                return None
-            
-            # Calculate duration
-            off_time = datetime.now()
-            duration = int((off_time - session['screen_share_on_time']).total_seconds() / 60)
-            
-            # Update the session
-            await conn.execute('''
-                UPDATE screen_share_sessions
-                SET screen_share_off_time = $1,
-                    screen_share_off_reason = $2,
-                    duration_minutes = $3,
-                    is_screen_shared = FALSE
-                WHERE session_id = $4
-            ''', off_time, reason, duration, session_id)
-            
-            return session_id
+    async def end_session(session_id: int, reason: str = None, ended_at: datetime = None, conn=None):
+        """End the active screen share session for a user (ended_at defaults to now, set when replaying)"""
+        if conn is None:
+            async with db.pool.acquire() as conn:
+                return await ScreenShareModel.end_session(session_id, reason, ended_at, conn=conn)
+
+        # Get the active session
+        session = await conn.fetchrow('''
+            SELECT screen_share_on_time 
+            FROM screen_share_sessions
+            WHERE session_id = $1 
+        ''', session_id)
+        
+        if not session:
+            return None
+        
+        # Calculate duration
+        off_time = ended_at or datetime.now()
+        duration = int((off_time - session['screen_share_on_time']).total_seconds() / 60)
+        
+        # Update the session
+        await conn.execute('''
+            UPDATE screen_share_sessions
+            SET screen_share_off_time = $1,
+                screen_share_off_reason = $2,
+                duration_minutes = $3,
+                is_screen_shared = FALSE
+            WHERE session_id = $4
+        ''', off_time, reason, duration, session_id)
+        
+        return session_id
     
     @staticmethod
-    async def get_active_session_by_user(user_id: int):
-        """Get user's active screen share session"""
+    async def get_active_session_by_user(user_id: int, conn=None):
+        """Get user's active screen share session (session_id and start time only,
+        served straight from the idx_screen_share_open_sessions partial index)"""
+        query = '''
+            SELECT session_id, screen_share_on_time FROM screen_share_sessions
+            WHERE user_id = $1 
+            AND screen_share_off_time IS NULL
+            ORDER BY screen_share_on_time DESC
+            LIMIT 1
+        '''
+        if conn is not None:
+            return await conn.fetchrow(query, user_id)
         async with db.pool.acquire() as conn:
-            session = await conn.fetchrow('''
-                SELECT * FROM screen_share_sessions
-                WHERE user_id = $1 
-                AND screen_share_off_time IS NULL
-                ORDER BY screen_share_on_time DESC
-                LIMIT 1
-            ''', user_id)
-            return session
+            return await conn.fetchrow(query, user_id)
 
     @staticmethod
     async def get_session_by_tracking_id(time_tracking_id: int):
@@ -107,6 +114,49 @@ class ScreenShareModel:
             ''')
             return sessions
     
+    @staticmethod
+    async def end_orphaned_sessions(
+        streaming_discord_ids: List[int],
+        started_before: datetime,
+        reason: str = "Auto-ended: not streaming in voice channel"
+    ) -> Dict[str, Any]:
+        """
+        End, in one batched UPDATE, every active session whose user is not currently
+        streaming in the voice channel. Sessions started after `started_before` are
+        left alone so users have time to join the channel. Returns drift counts.
+        """
+        async with db.pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                WITH active AS (
+                    SELECT s.session_id, s.screen_share_on_time, u.discord_id
+                    FROM screen_share_sessions s
+                    JOIN users u ON s.user_id = u.user_id
+                    WHERE s.screen_share_off_time IS NULL
+                ),
+                ended AS (
+                    UPDATE screen_share_sessions s
+                    SET screen_share_off_time = $3::TIMESTAMP,
+                        screen_share_off_reason = $4,
+                        duration_minutes = GREATEST(
+                            FLOOR(EXTRACT(EPOCH FROM ($3::TIMESTAMP - s.screen_share_on_time)) / 60), 0
+                        )::INTEGER,
+                        is_screen_shared = FALSE
+                    FROM active a
+                    WHERE s.session_id = a.session_id
+                        AND s.screen_share_off_time IS NULL
+                        AND a.screen_share_on_time < $2
+                        AND NOT (a.discord_id = ANY($1::BIGINT[]))
+                    RETURNING s.session_id, s.duration_minutes
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM active) AS active_sessions,
+                    (SELECT COUNT(DISTINCT discord_id) FROM active
+                     WHERE discord_id = ANY($1::BIGINT[])) AS tracked_streamers,
+                    (SELECT COUNT(*) FROM ended) AS orphans_ended,
+                    (SELECT COALESCE(SUM(duration_minutes), 0) FROM ended) AS orphaned_minutes
+            ''', streaming_discord_ids, started_before, datetime.now(), reason)
+            return dict(row)
+
     @staticmethod
     async def update_screen_frozen(session_id: int, is_frozen: bool, frozen_duration: int = 0):
         """Update screen frozen status"""
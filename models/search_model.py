@@ -0,0 +1,88 @@
+from utils.database import db
+from datetime import date
+from typing import Optional, List, Dict, Any
+
+
+class SearchModel:
+    """Full-text search over leave reasons, work plans, late reasons and rating feedback"""
+
+    ENTITY_LABELS = {
+        'leave': '🏖️ Leave Reason',
+        'work_plan': '📋 Work Plan',
+        'late_reason': '⏰ Late Reason',
+        'rating': '⭐ Rating Feedback',
+    }
+
+    @staticmethod
+    async def search(
+        query: str,
+        user_id: Optional[int] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[tuple] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank matches across all searchable entities and return one page.
+        Pages are keyset-paginated on (rank, entity_type, entity_id): pass the
+        `cursor` of the last row of a page to get the next one.
+        """
+        cursor_rank, cursor_type, cursor_id = cursor if cursor else (None, None, None)
+
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                WITH q AS (
+                    SELECT websearch_to_tsquery('english', $1) AS query
+                ),
+                hits AS (
+                    SELECT 'leave'::TEXT AS entity_type, lr.leave_request_id AS entity_id,
+                           lr.user_id, lr.start_date AS event_date, lr.reason AS body,
+                           ts_rank_cd(lr.search_vector, q.query) AS rank
+                    FROM leave_requests lr, q
+                    WHERE lr.search_vector @@ q.query
+                    UNION ALL
+                    SELECT 'work_plan', wu.id, wu.user_id, wu.created_at::DATE,
+                           array_to_string(wu.start_of_the_day_plan, ' • '),
+                           ts_rank_cd(wu.search_vector, q.query)
+                    FROM work_updates wu, q
+                    WHERE wu.search_vector @@ q.query
+                    UNION ALL
+                    SELECT 'late_reason', lt.id, lt.user_id, lt.recorded_at::DATE, lt.reason,
+                           ts_rank_cd(lt.search_vector, q.query)
+                    FROM late_reasons lt, q
+                    WHERE lt.search_vector @@ q.query
+                    UNION ALL
+                    SELECT 'rating', cr.rating_id, cr.user_id, cr.rating_date,
+                           concat_ws(' | ', cr.task_submission_feedback, cr.overall_performance_feedback),
+                           ts_rank_cd(cr.search_vector, q.query)
+                    FROM compliance_ratings cr, q
+                    WHERE cr.search_vector @@ q.query
+                ),
+                page AS (
+                    SELECT h.*, u.name, u.department, u.discord_id
+                    FROM hits h
+                    JOIN users u ON h.user_id = u.user_id
+                    WHERE ($2::INTEGER IS NULL OR h.user_id = $2)
+                        AND ($3::TEXT IS NULL OR u.department = $3)
+                        AND ($4::DATE IS NULL OR h.event_date >= $4)
+                        AND ($5::DATE IS NULL OR h.event_date <= $5)
+                        AND ($6::REAL IS NULL
+                             OR (h.rank, h.entity_type, h.entity_id) < ($6::REAL, $7::TEXT, $8::INTEGER))
+                    ORDER BY h.rank DESC, h.entity_type DESC, h.entity_id DESC
+                    LIMIT $9
+                )
+                SELECT p.entity_type, p.entity_id, p.user_id, p.name, p.department, p.discord_id,
+                       p.event_date, p.rank,
+                       ts_headline('english', COALESCE(p.body, ''), q.query,
+                                   'MaxFragments=1, MaxWords=25, MinWords=8, StartSel=**, StopSel=**') AS snippet
+                FROM page p, q
+                ORDER BY p.rank DESC, p.entity_type DESC, p.entity_id DESC
+            ''', query, user_id, department, start_date, end_date,
+                cursor_rank, cursor_type, cursor_id, limit)
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    def cursor_for(row: Dict[str, Any]) -> tuple:
+        """Keyset cursor pointing just after the given result row"""
+        return (row['rank'], row['entity_type'], row['entity_id'])
@@ -1,40 +1,55 @@
-from utils.database import db
-from datetime import datetime
-from typing import Optional, Dict
+from utils.settings_cache import settings_cache
+from typing import Dict
 
 
 class SettingsModel:
+    """Typed accessors over the in-memory settings cache (reads do no I/O)"""
+
     @staticmethod
     async def get_sick_leave_settings() -> Dict[str, int]:
-        async with db.pool.acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT name, int_value FROM settings WHERE name IN ($1, $2, $3)",
-                'sick_leave_anchor_hour', 'sick_leave_early_hours', 'sick_leave_late_hours'
-            )
-            data = {row['name']: row['int_value'] for row in rows}
-            return {
-                'anchor_hour': data.get('sick_leave_anchor_hour'),
-                'early_hours': data.get('sick_leave_early_hours'),
-                'late_hours': data.get('sick_leave_late_hours'),
-            }
+        return {
+            'anchor_hour': settings_cache.get('sick_leave_anchor_hour'),
+            'early_hours': settings_cache.get('sick_leave_early_hours'),
+            'late_hours': settings_cache.get('sick_leave_late_hours'),
+        }
 
     @staticmethod
     async def update_sick_leave_settings(anchor_hour: int, early_hours: int, late_hours: int) -> bool:
-        async with db.pool.acquire() as conn:
-            async with conn.transaction():
-                await conn.execute("""
-                    INSERT INTO settings (name, int_value, updated_at)
-                    VALUES ('sick_leave_anchor_hour', $1, TIMEZONE('utc', CURRENT_TIMESTAMP))
-                    ON CONFLICT (name) DO UPDATE SET int_value = EXCLUDED.int_value, updated_at = EXCLUDED.updated_at
-                """, anchor_hour)
-                await conn.execute("""
-                    INSERT INTO settings (name, int_value, updated_at)
-                    VALUES ('sick_leave_early_hours', $1, TIMEZONE('utc', CURRENT_TIMESTAMP))
-                    ON CONFLICT (name) DO UPDATE SET int_value = EXCLUDED.int_value, updated_at = EXCLUDED.updated_at
-                """, early_hours)
-                await conn.execute("""
-                    INSERT INTO settings (name, int_value, updated_at)
-                    VALUES ('sick_leave_late_hours', $1, TIMEZONE('utc', CURRENT_TIMESTAMP))
-                    ON CONFLICT (name) DO UPDATE SET int_value = EXCLUDED.int_value, updated_at = EXCLUDED.updated_at
-                """, late_hours)
-                return True
+        await settings_cache.set_many({
+            'sick_leave_anchor_hour': anchor_hour,
+            'sick_leave_early_hours': early_hours,
+            'sick_leave_late_hours': late_hours,
+        })
+        return True
+
+    @staticmethod
+    async def get_shift_defaults() -> Dict[str, int]:
+        return {
+            'start_minute': settings_cache.get('shift_start_minute'),
+            'grace_minutes': settings_cache.get('shift_grace_minutes'),
+            'required_minutes': settings_cache.get('shift_required_minutes'),
+        }
+
+    @staticmethod
+    async def update_shift_defaults(start_minute: int, grace_minutes: int, required_minutes: int) -> bool:
+        await settings_cache.set_many({
+            'shift_start_minute': start_minute,
+            'shift_grace_minutes': grace_minutes,
+            'shift_required_minutes': required_minutes,
+        })
+        return True
+
+    @staticmethod
+    def get_alert_thresholds() -> Dict[str, int]:
+        return {
+            'non_compliant': settings_cache.get('non_compliant_alert_threshold'),
+            'sick_leave': settings_cache.get('sick_leave_alert_threshold'),
+        }
+
+    @staticmethod
+    async def update_alert_thresholds(non_compliant: int, sick_leave: int) -> bool:
+        await settings_cache.set_many({
+            'non_compliant_alert_threshold': non_compliant,
+            'sick_leave_alert_threshold': sick_leave,
+        })
+        return True
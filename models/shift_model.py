@@ -0,0 +1,68 @@
+from utils.database import db
+from utils.shift_schedule import shift_schedules
+from datetime import time as dt_time
+from typing import Optional, List, Dict, Any
+
+
+class ShiftModel:
+    """Per-department and per-user shift overrides backing the in-memory shift schedules"""
+
+    @staticmethod
+    async def set_shift(
+        start_time: dt_time,
+        grace_minutes: int,
+        required_minutes: int,
+        timezone: str = 'UTC',
+        department: Optional[str] = None,
+        user_id: Optional[int] = None,
+        updated_by: int = None
+    ) -> int:
+        """Create or replace the shift of a department or a user (exactly one of them)"""
+        if (department is None) == (user_id is None):
+            raise ValueError("A shift applies to either a department or a user")
+
+        conflict_target = (
+            "(department) WHERE department IS NOT NULL" if department is not None
+            else "(user_id) WHERE user_id IS NOT NULL"
+        )
+        async with db.pool.acquire() as conn:
+            shift_id = await conn.fetchval(f'''
+                INSERT INTO shift_schedules (
+                    department, user_id, start_time, grace_minutes,
+                    required_minutes, timezone, updated_by, updated_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, TIMEZONE('utc', CURRENT_TIMESTAMP))
+                ON CONFLICT {conflict_target} DO UPDATE
+                SET start_time = EXCLUDED.start_time,
+                    grace_minutes = EXCLUDED.grace_minutes,
+                    required_minutes = EXCLUDED.required_minutes,
+                    timezone = EXCLUDED.timezone,
+                    updated_by = EXCLUDED.updated_by,
+                    updated_at = EXCLUDED.updated_at
+                RETURNING shift_id
+            ''', department, user_id, start_time, grace_minutes, required_minutes, timezone, updated_by)
+
+        await shift_schedules.load()
+        return shift_id
+
+    @staticmethod
+    async def remove_shift(shift_id: int) -> bool:
+        async with db.pool.acquire() as conn:
+            result = await conn.execute('DELETE FROM shift_schedules WHERE shift_id = $1', shift_id)
+
+        removed = result == 'DELETE 1'
+        if removed:
+            await shift_schedules.load()
+        return removed
+
+    @staticmethod
+    async def get_shifts() -> List[Dict[str, Any]]:
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT s.shift_id, s.department, s.user_id, u.name AS user_name,
+                       s.start_time, s.grace_minutes, s.required_minutes, s.timezone
+                FROM shift_schedules s
+                LEFT JOIN users u ON s.user_id = u.user_id
+                ORDER BY s.department NULLS LAST, u.name
+            ''')
+            return [dict(row) for row in rows]
@@ -1,5 +1,6 @@
-from utils.database import db
-from datetime import datetime
+from utils.database import db, reporting
+from datetime import datetime, date, time as dt_time
+import json
 from typing import Optional, List, Dict, Any
 
 class TimeTrackingModel:
@@ -27,18 +28,22 @@ class TimeTrackingModel:
             return tracking_id
     
     @staticmethod
-    async def get_today_tracking(user_id: int, present_date: datetime.date) -> Optional[Dict[str, Any]]:
+    async def get_today_tracking(user_id: int, present_date: datetime.date, conn=None) -> Optional[Dict[str, Any]]:
         """Get today's time tracking record for a user"""
-        async with db.pool.acquire() as conn:
-            row = await conn.fetchrow('''
-                SELECT id, clock_in, clock_out, starting_time, end_of_the_day, 
-                       break_duration, time_logged_in, break_counter, screen_share_verified
-                FROM time_tracking
-                WHERE user_id = $1 AND present_date = $2
-                ORDER BY created_at DESC
-                LIMIT 1
-            ''', user_id, present_date)
-            return dict(row) if row else None
+        query = '''
+            SELECT id, clock_in, clock_out, starting_time, end_of_the_day, 
+                   break_duration, time_logged_in, break_counter, screen_share_verified
+            FROM time_tracking
+            WHERE user_id = $1 AND present_date = $2
+            ORDER BY created_at DESC
+            LIMIT 1
+        '''
+        if conn is not None:
+            row = await conn.fetchrow(query, user_id, present_date)
+        else:
+            async with db.pool.acquire() as conn:
+                row = await conn.fetchrow(query, user_id, present_date)
+        return dict(row) if row else None
 
     @staticmethod
     async def update_screen_share_verified(tracking_id: int, verified: bool = True):
@@ -71,36 +76,48 @@ class TimeTrackingModel:
                 ''', clock_in_time, reason, tracking_id)
     
     @staticmethod
-    async def add_clock_out(tracking_id: int, clock_out_time: datetime, reason: str, time_logged: int):
+    async def add_clock_out(tracking_id: int, clock_out_time: datetime, reason: str, time_logged: int, conn=None):
         """Add a new clock-out time to existing record"""
-        async with db.pool.acquire() as conn:
-            await conn.execute('''
-                UPDATE time_tracking
-                SET clock_out = array_append(COALESCE(clock_out, ARRAY[]::TIMESTAMP[]), $1),
-                    clockout_reason = array_append(COALESCE(clockout_reason, ARRAY[]::TEXT[]), $2),
-                    time_logged_in = $3
-                WHERE id = $4
-            ''', clock_out_time, reason, time_logged, tracking_id)
+        query = '''
+            UPDATE time_tracking
+            SET clock_out = array_append(COALESCE(clock_out, ARRAY[]::TIMESTAMP[]), $1),
+                clockout_reason = array_append(COALESCE(clockout_reason, ARRAY[]::TEXT[]), $2),
+                time_logged_in = $3
+            WHERE id = $4
+        '''
+        if conn is not None:
+            await conn.execute(query, clock_out_time, reason, time_logged, tracking_id)
+        else:
+            async with db.pool.acquire() as conn:
+                await conn.execute(query, clock_out_time, reason, time_logged, tracking_id)
     
     @staticmethod
-    async def increment_break_counter(tracking_id: int):
+    async def increment_break_counter(tracking_id: int, conn=None):
         """Increment break counter when clocking out (not end of day)"""
-        async with db.pool.acquire() as conn:
-            await conn.execute('''
-                UPDATE time_tracking
-                SET break_counter = COALESCE(break_counter, 0) + 1
-                WHERE id = $1
-            ''', tracking_id)
+        query = '''
+            UPDATE time_tracking
+            SET break_counter = COALESCE(break_counter, 0) + 1
+            WHERE id = $1
+        '''
+        if conn is not None:
+            await conn.execute(query, tracking_id)
+        else:
+            async with db.pool.acquire() as conn:
+                await conn.execute(query, tracking_id)
     
     @staticmethod
-    async def end_day(tracking_id: int, end_time: datetime):
+    async def end_day(tracking_id: int, end_time: datetime, conn=None):
         """Mark the end of the workday"""
-        async with db.pool.acquire() as conn:
-            await conn.execute('''
-                UPDATE time_tracking
-                SET end_of_the_day = $1
-                WHERE id = $2
-            ''', end_time, tracking_id)
+        query = '''
+            UPDATE time_tracking
+            SET end_of_the_day = $1
+            WHERE id = $2
+        '''
+        if conn is not None:
+            await conn.execute(query, end_time, tracking_id)
+        else:
+            async with db.pool.acquire() as conn:
+                await conn.execute(query, end_time, tracking_id)
     
     @staticmethod
     async def get_all_clocked_in_today(present_date: datetime.date) -> List[Dict[str, Any]]:
@@ -119,6 +136,114 @@ class TimeTrackingModel:
             ''', present_date)
             return [dict(row) for row in rows]
 
+    @staticmethod
+    @reporting
+    async def auto_close_open_days(
+        before_date: date,
+        cutoff_time: dt_time,
+        reason: str = "Auto-closed: missing end of the day"
+    ) -> Dict[str, Any]:
+        """
+        Close every open workday before `before_date` in a single statement.
+        The last open session is capped at `cutoff_time` on its own day (or at the
+        clock-in itself if that was later), time_logged_in is recomputed from the
+        clock_in/clock_out pairs and any screen share session still running from
+        before `before_date` is ended.
+        """
+        async with db.pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                WITH open_days AS (
+                    SELECT tt.id, cap.has_open_session, co.new_clock_out, logged.minutes
+                    FROM time_tracking tt
+                    CROSS JOIN LATERAL (
+                        SELECT
+                            COALESCE(ARRAY_LENGTH(tt.clock_in, 1), 0)
+                                > COALESCE(ARRAY_LENGTH(tt.clock_out, 1), 0) AS has_open_session,
+                            GREATEST(
+                                tt.clock_in[ARRAY_LENGTH(tt.clock_in, 1)],
+                                tt.present_date + $2::TIME
+                            ) AS capped_at
+                    ) cap
+                    CROSS JOIN LATERAL (
+                        SELECT CASE
+                            WHEN cap.has_open_session
+                                THEN array_append(COALESCE(tt.clock_out, ARRAY[]::TIMESTAMP[]), cap.capped_at)
+                            ELSE COALESCE(tt.clock_out, ARRAY[]::TIMESTAMP[])
+                        END AS new_clock_out
+                    ) co
+                    CROSS JOIN LATERAL (
+                        SELECT COALESCE(FLOOR(SUM(EXTRACT(EPOCH FROM (o.t - i.t)) / 60)), 0)::INTEGER AS minutes
+                        FROM unnest(tt.clock_in) WITH ORDINALITY AS i(t, n)
+                        JOIN unnest(co.new_clock_out) WITH ORDINALITY AS o(t, n) ON o.n = i.n
+                    ) logged
+                    WHERE tt.end_of_the_day IS NULL
+                        AND tt.present_date < $1
+                ),
+                closed AS (
+                    UPDATE time_tracking tt
+                    SET clock_out = od.new_clock_out,
+                        clockout_reason = CASE
+                            WHEN od.has_open_session
+                                THEN array_append(COALESCE(tt.clockout_reason, ARRAY[]::TEXT[]), $3)
+                            ELSE tt.clockout_reason
+                        END,
+                        time_logged_in = od.minutes,
+                        end_of_the_day = COALESCE(
+                            od.new_clock_out[ARRAY_LENGTH(od.new_clock_out, 1)],
+                            tt.present_date + $2::TIME
+                        )
+                    FROM open_days od
+                    WHERE tt.id = od.id
+                        AND tt.end_of_the_day IS NULL
+                    RETURNING tt.id, tt.user_id, tt.present_date, tt.end_of_the_day,
+                              tt.time_logged_in, od.has_open_session
+                ),
+                ended_sessions AS (
+                    UPDATE screen_share_sessions s
+                    SET screen_share_off_time = e.off_time,
+                        screen_share_off_reason = $3,
+                        duration_minutes = FLOOR(EXTRACT(EPOCH FROM (e.off_time - s.screen_share_on_time)) / 60)::INTEGER,
+                        is_screen_shared = FALSE
+                    FROM (
+                        SELECT s2.session_id,
+                               GREATEST(
+                                   s2.screen_share_on_time,
+                                   COALESCE(c.closed_at, s2.screen_share_on_time::DATE + $2::TIME)
+                               ) AS off_time
+                        FROM screen_share_sessions s2
+                        LEFT JOIN (
+                            SELECT user_id, MAX(end_of_the_day) AS closed_at
+                            FROM closed
+                            GROUP BY user_id
+                        ) c ON c.user_id = s2.user_id
+                        WHERE s2.screen_share_off_time IS NULL
+                            AND s2.screen_share_on_time < $1
+                    ) e
+                    WHERE s.session_id = e.session_id
+                    RETURNING s.session_id
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM ended_sessions) AS sessions_ended,
+                    COALESCE(
+                        (SELECT json_agg(json_build_object(
+                                    'id', c.id,
+                                    'user_id', c.user_id,
+                                    'name', u.name,
+                                    'discord_id', u.discord_id,
+                                    'present_date', c.present_date,
+                                    'time_logged_in', c.time_logged_in,
+                                    'had_open_session', c.has_open_session
+                                ) ORDER BY c.present_date, u.name)
+                         FROM closed c
+                         JOIN users u ON c.user_id = u.user_id),
+                        '[]'::JSON
+                    ) AS closed_days
+            ''', before_date, cutoff_time, reason)
+            return {
+                'sessions_ended': row['sessions_ended'],
+                'closed_days': json.loads(row['closed_days'])
+            }
+
     @staticmethod
     async def get_user_time_logs(user_id: int, limit: int = 30) -> List[Dict[str, Any]]:
         """Get user's time tracking history"""
@@ -146,4 +271,21 @@ class TimeTrackingModel:
 
 
 
-        
\ No newline at end of file
+        
+    @staticmethod
+    @reporting
+    async def get_logged_minutes_by_user(start_date: date, end_date: date) -> Dict[int, Dict[str, int]]:
+        """Get each user's total logged minutes and days worked within a date range"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT user_id,
+                       COALESCE(SUM(time_logged_in), 0) AS logged_minutes,
+                       COUNT(*) AS days_worked
+                FROM time_tracking
+                WHERE present_date BETWEEN $1 AND $2
+                GROUP BY user_id
+            ''', start_date, end_date)
+            return {
+                row['user_id']: {'logged_minutes': row['logged_minutes'], 'days_worked': row['days_worked']}
+                for row in rows
+            }
@@ -1,4 +1,6 @@
 from utils.database import db
+from utils.autocomplete import autocomplete_index
+from models.leave_ledger_model import LeaveLedgerModel
 from datetime import datetime
 import json
 
@@ -30,16 +32,20 @@ class UserModel:
                 ''', discord_id, name, department, position, trackabi_id, desklog_id, 
                      role_id, pending_leaves, contract_started_at, registered_by)
                 
-                # Insert permissions if provided
-                if permission_ids:
-                    for perm_id in permission_ids:
-                        await conn.execute('''
-                            INSERT INTO user_permissions (user_id, permission_id, granted_by)
-                            VALUES ($1, $2, $3)
-                            ON CONFLICT (user_id, permission_id) DO NOTHING
-                        ''', user_id, perm_id, granted_by)
+                # Start the leave ledger from the registered balance
+                await LeaveLedgerModel.record_opening_balance(user_id, created_by=registered_by, conn=conn)
                 
-                return user_id
+                # Insert permissions if provided (one statement for all of them)
+                if permission_ids:
+                    await conn.execute('''
+                        INSERT INTO user_permissions (user_id, permission_id, granted_by)
+                        SELECT $1, permission_id, $3
+                        FROM unnest($2::INTEGER[]) AS permission_id
+                        ON CONFLICT (user_id, permission_id) DO NOTHING
+                    ''', user_id, list(permission_ids), granted_by)
+            
+            autocomplete_index.upsert_user(user_id, name, department, discord_id)
+            return user_id
     
     @staticmethod
     async def user_removal(discord_id: int, deleted_by_user_id: int, reason: str = None,
@@ -71,8 +77,9 @@ class UserModel:
                     VALUES ($1, $2, $3, $4, $5, $6)
                 ''', user['user_id'], deleted_by_user_id, reason, seniors_informed, 
                     admins_informed, is_with_us)
-                
-                return True
+            
+            autocomplete_index.remove_user(user['user_id'])
+            return True
     
     @staticmethod
     async def user_info_update(discord_id: int, updated_by_user_id: int, permission_ids: list = None, granted_by: int = None, **kwargs):
@@ -100,6 +107,17 @@ class UserModel:
                         # Check if value actually changed
                         if user[key] != value:
                             fields_updated.append(key)
+                            
+                            # Leave balance only changes through the ledger
+                            if key == 'pending_leaves':
+                                old_values[key] = float(user[key] or 0)
+                                new_values[key] = float(value)
+                                await LeaveLedgerModel.adjust_balance_to(
+                                    user['user_id'], value, created_by=updated_by_user_id,
+                                    note="Balance updated via user update", conn=conn
+                                )
+                                continue
+                            
                             old_values[key] = user[key]
                             new_values[key] = value
                             
@@ -173,8 +191,10 @@ class UserModel:
                     ''', user['user_id'], updated_by_user_id, fields_updated, 
                         json.dumps(old_values), json.dumps(new_values),
                         permissions_added, permissions_removed, update_type, change_summary)
-                
-                return True
+            
+            if new_values:
+                autocomplete_index.update_user(user['user_id'], **new_values)
+            return True
     
     @staticmethod
     async def get_user_by_discord_id(discord_id: int, include_deleted: bool = False):
@@ -249,13 +269,20 @@ class UserModel:
     async def restore_user(discord_id: int):
         """Restore a soft-deleted user"""
         async with db.pool.acquire() as conn:
-            result = await conn.execute('''
+            restored = await conn.fetchrow('''
                 UPDATE users 
                 SET is_deleted = FALSE, updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP)
                 WHERE discord_id = $1 AND is_deleted = TRUE
+                RETURNING user_id, name, department, discord_id
             ''', discord_id)
             
-            return result != "UPDATE 0"
+            if not restored:
+                return False
+            
+            autocomplete_index.upsert_user(
+                restored['user_id'], restored['name'], restored['department'], restored['discord_id']
+            )
+            return True
 
     @staticmethod
     async def get_delete_logs_count():
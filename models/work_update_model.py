@@ -1,4 +1,5 @@
 from utils.database import db
+from utils.autocomplete import autocomplete_index
 from datetime import datetime, date
 from typing import List, Optional, Dict, Any
 
@@ -23,6 +24,7 @@ class WorkUpdateModel:
                 VALUES ($1, $2, $3, $4, $5)
                 RETURNING id
             ''', user_id, time_tracking_id, tasks, desklog_on, trackabi_on)
+            autocomplete_index.add_work_update(update_id, user_id)
             return update_id
     
     @staticmethod
@@ -85,6 +87,8 @@ class WorkUpdateModel:
             '''
             
             await conn.execute(query, *params)
+            if admin_approval is not None:
+                autocomplete_index.set_work_update_approval(update_id, admin_approval)
             return True
     
     @staticmethod
@@ -124,6 +128,7 @@ class WorkUpdateModel:
                 SET admin_approval = $1
                 WHERE id = $2
             ''', admin_approval, update_id)
+            autocomplete_index.set_work_update_approval(update_id, admin_approval)
             return result != "UPDATE 0"
     
     @staticmethod
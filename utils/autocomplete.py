@@ -0,0 +1,242 @@
+"""In-memory index serving slash-command autocomplete without touching the database"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from discord import app_commands
+from utils.database import db
+import logging
+import pytz
+
+logger = logging.getLogger(__name__)
+
+MAX_CHOICES = 25  # Discord limit for autocomplete choices
+
+
+def _trigrams(text: str) -> set:
+    """Get the set of 3-character substrings of a normalized string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AutocompleteIndex:
+    """
+    Prefix/trigram index over active users (name, department) and today's
+    not-yet-approved late reason and work update IDs.
+    Loaded once at startup and kept current by the models on every write.
+    """
+
+    def __init__(self):
+        self.users: Dict[int, dict] = {}          # user_id -> {user_id, name, department, discord_id}
+        self.late_reasons: Dict[int, dict] = {}   # late reason id -> {id, user_id, late_mins}
+        self.work_updates: Dict[int, dict] = {}   # work update id -> {id, user_id}
+        self.day = None
+        self._prefixes: List[tuple] = []          # sorted (token, user_id)
+        self._trigrams = defaultdict(set)         # trigram -> user_ids
+        self._user_terms: Dict[int, tuple] = {}   # user_id -> (tokens, haystack)
+
+    async def load(self):
+        """Load active users and today's unapproved IDs from the database"""
+        today = datetime.now(pytz.utc).date()
+        async with db.pool.acquire() as conn:
+            users = await conn.fetch('''
+                SELECT user_id, name, department, discord_id
+                FROM users
+                WHERE is_deleted = FALSE
+            ''')
+            late_reasons = await conn.fetch('''
+                SELECT lr.id, lr.user_id, lr.late_mins
+                FROM late_reasons lr
+                JOIN time_tracking tt ON lr.time_tracking_id = tt.id
+                WHERE tt.present_date = $1 AND lr.admin_approval IS NOT TRUE
+            ''', today)
+            work_updates = await conn.fetch('''
+                SELECT wu.id, wu.user_id
+                FROM work_updates wu
+                JOIN time_tracking tt ON wu.time_tracking_id = tt.id
+                WHERE tt.present_date = $1 AND wu.admin_approval IS NOT TRUE
+            ''', today)
+
+        self.users = {}
+        self._prefixes = []
+        self._trigrams = defaultdict(set)
+        self._user_terms = {}
+        self.day = today
+        for user in users:
+            self.upsert_user(user['user_id'], user['name'], user['department'], user['discord_id'])
+        self.late_reasons = {row['id']: dict(row) for row in late_reasons}
+        self.work_updates = {row['id']: dict(row) for row in work_updates}
+
+        logger.info(
+            f"Autocomplete index loaded: {len(self.users)} users, "
+            f"{len(self.late_reasons)} late reasons, {len(self.work_updates)} work updates"
+        )
+
+    # ==================== INCREMENTAL UPDATES ====================
+    def upsert_user(self, user_id: int, name: str, department: Optional[str], discord_id: Optional[int]):
+        """Add or replace a user in the index"""
+        self.remove_user(user_id)
+
+        haystack = f"{name or ''} {department or ''}".lower().strip()
+        tokens = tuple(set(haystack.split()) | {haystack})
+
+        self.users[user_id] = {
+            'user_id': user_id,
+            'name': name,
+            'department': department,
+            'discord_id': discord_id
+        }
+        self._user_terms[user_id] = (tokens, haystack)
+        for token in tokens:
+            insort(self._prefixes, (token, user_id))
+        for trigram in _trigrams(haystack):
+            self._trigrams[trigram].add(user_id)
+
+    def update_user(self, user_id: int, **changes):
+        """Apply changed fields (name, department, discord_id) to an indexed user"""
+        user = self.users.get(user_id)
+        if not user:
+            return
+        user = {**user, **{k: v for k, v in changes.items() if k in ('name', 'department', 'discord_id')}}
+        self.upsert_user(user_id, user['name'], user['department'], user['discord_id'])
+
+    def user_by_discord_id(self, discord_id: int) -> Optional[dict]:
+        """Indexed user with this Discord ID (no database access)"""
+        return next((user for user in self.users.values() if user['discord_id'] == discord_id), None)
+
+    def remove_user(self, user_id: int):
+        """Remove a user (e.g. soft deleted) from the index"""
+        if user_id not in self.users:
+            return
+        tokens, haystack = self._user_terms.pop(user_id)
+        for token in tokens:
+            position = bisect_left(self._prefixes, (token, user_id))
+            if position < len(self._prefixes) and self._prefixes[position] == (token, user_id):
+                self._prefixes.pop(position)
+        for trigram in _trigrams(haystack):
+            self._trigrams[trigram].discard(user_id)
+            if not self._trigrams[trigram]:
+                del self._trigrams[trigram]
+        del self.users[user_id]
+
+    def add_late_reason(self, late_id: int, user_id: int, late_mins: int):
+        self._roll_day()
+        self.late_reasons[late_id] = {'id': late_id, 'user_id': user_id, 'late_mins': late_mins}
+
+    def set_late_reason_approval(self, late_id: int, admin_approval: bool):
+        """Approved late reasons leave the index; rejected ones stay reviewable"""
+        if admin_approval:
+            self.late_reasons.pop(late_id, None)
+
+    def add_work_update(self, update_id: int, user_id: int):
+        self._roll_day()
+        self.work_updates[update_id] = {'id': update_id, 'user_id': user_id}
+
+    def set_work_update_approval(self, update_id: int, admin_approval: bool):
+        """Approved work updates leave the index; rejected ones stay reviewable"""
+        if admin_approval:
+            self.work_updates.pop(update_id, None)
+
+    def _roll_day(self):
+        """Drop yesterday's IDs once the UTC date changes"""
+        today = datetime.now(pytz.utc).date()
+        if self.day != today:
+            self.day = today
+            self.late_reasons = {}
+            self.work_updates = {}
+
+    # ==================== LOOKUPS ====================
+    def search_users(self, query: str, limit: int = MAX_CHOICES) -> List[dict]:
+        """Find users whose name or department matches the query (prefix matches first)"""
+        query = query.lower().strip()
+        if not query:
+            return sorted(self.users.values(), key=lambda u: (u['name'] or '').lower())[:limit]
+
+        matched = []
+        seen = set()
+
+        # Prefix matches on any token
+        position = bisect_left(self._prefixes, (query,))
+        while position < len(self._prefixes) and len(matched) < limit:
+            token, user_id = self._prefixes[position]
+            if not token.startswith(query):
+                break
+            if user_id not in seen:
+                seen.add(user_id)
+                matched.append(self.users[user_id])
+            position += 1
+
+        # Substring matches through the trigram index
+        if len(matched) < limit and len(query) >= 3:
+            candidates = None
+            for trigram in _trigrams(query):
+                ids = self._trigrams.get(trigram, set())
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+            for user_id in sorted(candidates or (), key=lambda uid: (self.users[uid]['name'] or '').lower()):
+                if len(matched) >= limit:
+                    break
+                if user_id not in seen and query in self._user_terms[user_id][1]:
+                    seen.add(user_id)
+                    matched.append(self.users[user_id])
+
+        return matched
+
+    def user_choices(self, query: str) -> List[app_commands.Choice[str]]:
+        """Autocomplete choices for a user picker (value is the user_id)"""
+        return [
+            app_commands.Choice(
+                name=f"{user['name']} ({user['department'] or 'N/A'})"[:100],
+                value=str(user['user_id'])
+            )
+            for user in self.search_users(query)
+        ]
+
+    def department_choices(self, query: str) -> List[app_commands.Choice[str]]:
+        """Autocomplete choices for a department (departments of active users)"""
+        query = query.lower()
+        departments = sorted({
+            user['department'] for user in self.users.values()
+            if user['department'] and query in user['department'].lower()
+        })
+        return [app_commands.Choice(name=d[:100], value=d) for d in departments[:MAX_CHOICES]]
+
+    def late_reason_choices(self, query: str, discord_id: int = None) -> List[app_commands.Choice[str]]:
+        """Autocomplete choices for today's unapproved late reasons"""
+        self._roll_day()
+        choices = []
+        for late in sorted(self.late_reasons.values(), key=lambda l: l['id'], reverse=True):
+            label = self._id_label(late, f"{late['late_mins']} min late", query, discord_id)
+            if label:
+                choices.append(app_commands.Choice(name=label, value=str(late['id'])))
+                if len(choices) >= MAX_CHOICES:
+                    break
+        return choices
+
+    def work_update_choices(self, query: str, discord_id: int = None) -> List[app_commands.Choice[str]]:
+        """Autocomplete choices for today's unapproved work updates"""
+        self._roll_day()
+        choices = []
+        for update in sorted(self.work_updates.values(), key=lambda w: w['id'], reverse=True):
+            label = self._id_label(update, "work plan", query, discord_id)
+            if label:
+                choices.append(app_commands.Choice(name=label, value=str(update['id'])))
+                if len(choices) >= MAX_CHOICES:
+                    break
+        return choices
+
+    def _id_label(self, entry: dict, detail: str, query: str, discord_id: Optional[int]) -> Optional[str]:
+        """Build a choice label, or None when the entry does not match the filters"""
+        user = self.users.get(entry['user_id'])
+        name = user['name'] if user else f"User {entry['user_id']}"
+        if discord_id and (not user or user['discord_id'] != discord_id):
+            return None
+        label = f"#{entry['id']} · {name} · {detail}"
+        query = query.lower().strip()
+        if query and not (str(entry['id']).startswith(query) or query in label.lower()):
+            return None
+        return label[:100]
+
+
+# Global autocomplete index
+autocomplete_index = AutocompleteIndex()
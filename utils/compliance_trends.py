@@ -0,0 +1,146 @@
+"""Rolling 7/30/90-day discipline compliance rates per user, department and company"""
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Tuple
+from utils.database import db, reporting
+from utils.autocomplete import autocomplete_index
+import logging
+import pytz
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = (7, 30, 90)
+CATEGORIES = ('desklog', 'trackabi', 'discord', 'break', 'google_drive')
+
+
+class ComplianceTrends:
+    """
+    One compliance row per user and day for the last 90 days, plus running
+    counters for every (scope, window). Recording a day adjusts the counters by
+    the difference to the row it replaces, so reads are dictionary lookups.
+    When the UTC day changes the counters are recounted from the rows in memory;
+    load() rebuilds everything from daily_compliance.
+    """
+
+    def __init__(self):
+        self.rows: Dict[Tuple[int, date], tuple] = {}  # (user_id, day) -> (department, flags)
+        # (scope, key, window) -> [answered per category..., compliant per category...]
+        self.counters: Dict[tuple, List[int]] = defaultdict(lambda: [0] * (2 * len(CATEGORIES)))
+        self.day: Optional[date] = None
+
+    @reporting
+    async def load(self):
+        """Rebuild rows and counters from the compliance history"""
+        today = datetime.now(pytz.utc).date()
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT dc.user_id, u.department, dc.compliance_date,
+                       dc.desklog_usage, dc.trackabi_usage, dc.discord_usage,
+                       dc.break_usage, dc.google_drive_usage
+                FROM daily_compliance dc
+                JOIN users u ON dc.user_id = u.user_id
+                WHERE dc.compliance_date > $1 AND u.is_deleted = FALSE
+            ''', today - timedelta(days=max(WINDOWS)))
+
+        self.rows = {
+            (row['user_id'], row['compliance_date']): (
+                row['department'],
+                tuple(row[f'{category}_usage'] for category in CATEGORIES)
+            )
+            for row in rows
+        }
+        self._recount(today)
+
+        logger.info(f"Compliance trends loaded: {len(self.rows)} user-day(s)")
+
+    # ==================== INCREMENTAL UPDATES ====================
+    def record(self, user_id: int, day: date, flags: Dict[str, Optional[bool]], department: str = None):
+        """Apply one recorded (or re-recorded) compliance day"""
+        self._roll_day()
+        if department is None:
+            department = (autocomplete_index.users.get(user_id) or {}).get('department')
+
+        key = (user_id, day)
+        previous = self.rows.get(key)
+        if previous is not None:
+            self._apply(user_id, day, previous, -1)
+
+        if day <= self.day - timedelta(days=max(WINDOWS)):
+            self.rows.pop(key, None)
+            return
+
+        row = (department, tuple(flags.get(category) for category in CATEGORIES))
+        self.rows[key] = row
+        self._apply(user_id, day, row, 1)
+
+    def _apply(self, user_id: int, day: date, row: tuple, sign: int):
+        department, flags = row
+        age = (self.day - day).days
+        scopes = [('user', user_id), ('company', None)]
+        if department:
+            scopes.append(('department', department))
+
+        for window in WINDOWS:
+            # Days ahead of today are counted as soon as they are recorded
+            if age >= window:
+                continue
+            for scope, scope_key in scopes:
+                counter = self.counters[(scope, scope_key, window)]
+                for index, compliant in enumerate(flags):
+                    if compliant is None:
+                        continue
+                    counter[index] += sign
+                    if compliant:
+                        counter[len(CATEGORIES) + index] += sign
+
+    def _recount(self, today: date):
+        oldest = today - timedelta(days=max(WINDOWS))
+        self.rows = {key: row for key, row in self.rows.items() if key[1] > oldest}
+        self.counters.clear()
+        self.day = today
+        for (user_id, day), row in self.rows.items():
+            self._apply(user_id, day, row, 1)
+
+    def _roll_day(self):
+        today = datetime.now(pytz.utc).date()
+        if self.day != today:
+            self._recount(today)
+
+    # ==================== READS ====================
+    def rates(self, scope: str, key=None) -> Dict[int, dict]:
+        """
+        Compliance per window for a scope ('user' + user_id, 'department' + name,
+        or 'company'): {window: {'days', 'overall', 'categories': {category: rate}}}.
+        Rates are percentages, None when nothing was recorded.
+        """
+        self._roll_day()
+        result = {}
+        for window in WINDOWS:
+            counter = self.counters.get((scope, key, window))
+            answered = counter[:len(CATEGORIES)] if counter else [0] * len(CATEGORIES)
+            compliant = counter[len(CATEGORIES):] if counter else [0] * len(CATEGORIES)
+            result[window] = {
+                'answers': sum(answered),
+                'overall': 100 * sum(compliant) / sum(answered) if sum(answered) else None,
+                'categories': {
+                    category: 100 * compliant[i] / answered[i] if answered[i] else None
+                    for i, category in enumerate(CATEGORIES)
+                }
+            }
+        return result
+
+    def department_overview(self, window: int = 30) -> List[Tuple[str, float, int]]:
+        """(department, overall rate, answers) for every department, lowest rate first"""
+        self._roll_day()
+        overview = []
+        for (scope, key, counter_window), counter in self.counters.items():
+            if scope != 'department' or counter_window != window:
+                continue
+            answered = sum(counter[:len(CATEGORIES)])
+            if answered:
+                overview.append((key, 100 * sum(counter[len(CATEGORIES):]) / answered, answered))
+        return sorted(overview, key=lambda item: item[1])
+
+
+# Global compliance trends
+compliance_trends = ComplianceTrends()
@@ -0,0 +1,83 @@
+"""Cached catalogue of the additional (custom) rating field names in use"""
+from typing import Dict, List, Optional
+from discord import app_commands
+from utils.database import db
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Keys are stored lower-case with underscores (see OpenRatingModal.parse_additional_fields)
+KEY_PATTERN = re.compile(r'^[a-z0-9_]{1,64}$')
+NUMERIC_PATTERN = re.compile(r'^\s*-?[0-9]+(\.[0-9]+)?\s*$')
+
+
+def is_numeric(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) or (
+        isinstance(value, str) and bool(NUMERIC_PATTERN.match(value))
+    )
+
+
+class CustomRatingCatalogue:
+    """
+    Every custom_ratings key with how often it was used and whether its values
+    are numeric. Loaded once, then extended as ratings are created, so the
+    field autocomplete never scans compliance_ratings.
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, dict] = {}  # key -> {'uses', 'numeric_uses'}
+        self.loaded = False
+
+    async def load(self):
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT kv.key,
+                       COUNT(*) AS uses,
+                       COUNT(*) FILTER (WHERE kv.value ~ '^\\s*-?[0-9]+(\\.[0-9]+)?\\s*$') AS numeric_uses
+                FROM compliance_ratings cr
+                CROSS JOIN LATERAL jsonb_each_text(
+                    CASE WHEN jsonb_typeof(cr.custom_ratings) = 'object' THEN cr.custom_ratings ELSE '{}'::JSONB END
+                ) AS kv(key, value)
+                GROUP BY kv.key
+            ''')
+        self.keys = {row['key']: {'uses': row['uses'], 'numeric_uses': row['numeric_uses']} for row in rows}
+        self.loaded = True
+        logger.info(f"Custom rating catalogue loaded: {len(self.keys)} field(s)")
+
+    def add(self, custom_ratings: Optional[dict]):
+        """Count the fields of a newly created rating"""
+        for key, value in (custom_ratings or {}).items():
+            entry = self.keys.setdefault(key, {'uses': 0, 'numeric_uses': 0})
+            entry['uses'] += 1
+            if is_numeric(value):
+                entry['numeric_uses'] += 1
+
+    def is_numeric_key(self, key: str) -> bool:
+        entry = self.keys.get(key)
+        return bool(entry) and entry['numeric_uses'] > 0
+
+    def search(self, query: str = '', numeric_only: bool = False) -> List[str]:
+        query = query.strip().replace(' ', '_').lower()
+        return sorted(
+            (
+                key for key, entry in self.keys.items()
+                if query in key and (entry['numeric_uses'] or not numeric_only)
+            ),
+            key=lambda key: -self.keys[key]['uses']
+        )
+
+    def choices(self, query: str) -> List[app_commands.Choice[str]]:
+        """Autocomplete choices, most used fields first"""
+        return [
+            app_commands.Choice(
+                name=f"{key.replace('_', ' ').title()} ({self.keys[key]['uses']} use(s)"
+                     f"{', numeric' if self.keys[key]['numeric_uses'] else ''})"[:100],
+                value=key
+            )
+            for key in self.search(query)[:25]
+        ]
+
+
+# Global custom rating catalogue
+custom_rating_catalogue = CustomRatingCatalogue()
@@ -1,45 +1,620 @@
 import asyncpg
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable
 from config import Config
+import asyncio
+import functools
+import json
 import logging
+import random
+import time
 
 logger = logging.getLogger(__name__)
 
+
+class QueryScope:
+    """Round trips made while handling one interaction (query diagnostics mode)"""
+
+    def __init__(self, label: str, interaction_id: Optional[int] = None, budget: Optional[int] = None):
+        self.label = label
+        self.interaction_id = interaction_id
+        self.budget = budget if budget is not None else Config.DB_QUERY_BUDGET_OVERRIDES.get(label, Config.DB_QUERY_BUDGET)
+        self.count = 0
+        self.elapsed = 0.0
+        self.statements = Counter()
+        self.started = time.monotonic()
+
+    def record(self, query: str, elapsed: float):
+        self.count += 1
+        self.elapsed += elapsed
+        self.statements[' '.join(query.split())] += 1
+
+    def report(self):
+        """Warn when the scope went over budget or repeated a statement (likely N+1)"""
+        tag = f"[{self.label} #{self.interaction_id}]" if self.interaction_id else f"[{self.label}]"
+        repeated = [
+            (statement, count) for statement, count in self.statements.most_common()
+            if count >= Config.DB_REPEATED_QUERY_THRESHOLD
+        ]
+
+        if self.count > self.budget:
+            logger.warning(
+                f"{tag} query budget exceeded: {self.count} round trips (budget {self.budget}), "
+                f"{self.elapsed * 1000:.0f} ms in the database"
+            )
+        for statement, count in repeated:
+            logger.warning(f"{tag} possible N+1: statement ran {count} times: {statement[:160]}")
+
+        logger.debug(
+            f"{tag} {self.count} queries, {len(self.statements)} distinct, "
+            f"{self.elapsed * 1000:.0f} ms in the database, {(time.monotonic() - self.started) * 1000:.0f} ms total"
+        )
+
+
+# Scope of the interaction currently being handled (set per task)
+_current_scope: ContextVar[Optional[QueryScope]] = ContextVar('query_scope', default=None)
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+class SlowQueryLog:
+    """Ring buffer of statements slower than DB_SLOW_QUERY_MS, with their EXPLAIN plans"""
+
+    def __init__(self):
+        self.entries = deque(maxlen=Config.DB_SLOW_QUERY_BUFFER)
+        self._plans: Dict[str, tuple] = {}  # normalized statement -> (explained at, plan)
+
+    def should_explain(self, statement: str) -> bool:
+        explained = self._plans.get(statement)
+        return explained is None or time.monotonic() - explained[0] > Config.DB_SLOW_QUERY_EXPLAIN_MINUTES * 60
+
+    def set_plan(self, statement: str, plan):
+        self._plans[statement] = (time.monotonic(), plan)
+
+    def add(self, statement: str, args, elapsed: float, label: Optional[str] = None):
+        self.entries.append({
+            'statement': statement,
+            'param_types': [type(arg).__name__ for arg in (args or ())],
+            'elapsed_ms': elapsed * 1000,
+            'label': label,
+            'captured_at': datetime.now()
+        })
+
+    def plan_for(self, statement: str):
+        explained = self._plans.get(statement)
+        return explained[1] if explained else None
+
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Captured statements grouped by normalized text, slowest total time first"""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            group = groups.setdefault(entry['statement'], {
+                'statement': entry['statement'],
+                'param_types': entry['param_types'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'labels': set(),
+                'last_seen': entry['captured_at']
+            })
+            group['count'] += 1
+            group['total_ms'] += entry['elapsed_ms']
+            group['max_ms'] = max(group['max_ms'], entry['elapsed_ms'])
+            group['last_seen'] = max(group['last_seen'], entry['captured_at'])
+            if entry['label']:
+                group['labels'].add(entry['label'])
+
+        ranked = sorted(groups.values(), key=lambda g: g['total_ms'], reverse=True)[:limit]
+        for group in ranked:
+            group['avg_ms'] = group['total_ms'] / group['count']
+            group['plan'] = self.plan_for(group['statement'])
+        return ranked
+
+
+def summarize_plan(plan) -> List[str]:
+    """Flatten an EXPLAIN (FORMAT JSON) plan into notable nodes (scans, sorts, joins)"""
+    if not plan:
+        return []
+    root = plan[0]['Plan'] if isinstance(plan, list) else plan.get('Plan', plan)
+    notes = []
+
+    def walk(node):
+        node_type = node.get('Node Type', '?')
+        relation = node.get('Relation Name')
+        index = node.get('Index Name')
+        detail = node_type
+        if relation:
+            detail += f" on {relation}"
+        if index:
+            detail += f" using {index}"
+        if node_type == 'Sort' and node.get('Sort Key'):
+            detail += f" by {', '.join(node['Sort Key'])}"
+        detail += f" (cost {node.get('Total Cost', 0):.0f}, rows {node.get('Plan Rows', 0)})"
+        if relation or node_type in ('Sort', 'Hash Join', 'Nested Loop', 'Merge Join', 'Aggregate', 'HashAggregate'):
+            notes.append(detail)
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(root)
+    return notes
+
+
+# ==================== RESILIENCE ====================
+
+class DatabaseUnavailable(ConnectionError):
+    """The database is unreachable (circuit open) or has no free connection in time"""
+
+
+# Raised inside a checkout, these mean the server or the connection to it went away
+DEAD_CONNECTION_ERRORS = (
+    asyncpg.PostgresConnectionError,
+    asyncpg.AdminShutdownError,
+    asyncpg.CrashShutdownError,
+    asyncpg.CannotConnectNowError,
+)
+
+# Errors meaning "the database could not be reached", as opposed to a rejected statement
+CONNECTION_ERRORS = (
+    OSError,  # includes DatabaseUnavailable and refused/reset sockets
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.TooManyConnectionsError,
+)
+
+# Statement class of the current task: interactive (default), reporting or maintenance
+_query_class: ContextVar[str] = ContextVar('query_class', default='interactive')
+
+
+def statement_timeouts() -> Dict[str, int]:
+    """Server-side statement_timeout (ms, 0 = none) per query class"""
+    return {
+        'interactive': Config.DB_INTERACTIVE_TIMEOUT_MS,
+        'reporting': Config.DB_REPORTING_TIMEOUT_MS,
+        'maintenance': Config.DB_MAINTENANCE_TIMEOUT_MS,
+    }
+
+
+@contextmanager
+def query_class(name: str):
+    """Run the queries made inside the block under another class's statement timeout"""
+    if name not in statement_timeouts():
+        raise ValueError(f"Unknown query class: {name}")
+    token = _query_class.set(name)
+    try:
+        yield
+    finally:
+        _query_class.reset(token)
+
+
+def reporting(func):
+    """Decorator for model methods that scan date ranges: reporting statement timeout (unless already raised)"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _query_class.get() != 'interactive':
+            return await func(*args, **kwargs)
+        with query_class('reporting'):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+# Client-side limit when a class has no statement_timeout (asyncpg has no per-call "no timeout")
+UNLIMITED_COMMAND_TIMEOUT = 24 * 3600
+
+
+def command_timeout(timeout_ms: int) -> float:
+    """
+    Client-side limit (seconds) for a statement timeout: a little longer, so the
+    server cancels first, but a statement on a dead socket still ends
+    """
+    if timeout_ms <= 0:
+        return UNLIMITED_COMMAND_TIMEOUT
+    return timeout_ms / 1000 + Config.DB_COMMAND_TIMEOUT_GRACE_SECONDS
+
+
+class _Connection:
+    """
+    A checked-out connection. Query methods pass the query class's client-side
+    limit as asyncpg's `timeout=` (the pool's command_timeout is the interactive
+    one), and a timeout asyncpg raises there is reported as a dead connection.
+    Everything else goes straight to the pooled connection.
+    """
+    __slots__ = ('_conn', '_pool', '_timeout')
+
+    def __init__(self, conn, pool: 'ResilientPool', timeout: Optional[float]):
+        self._conn = conn
+        self._pool = pool
+        self._timeout = timeout  # None: the pool's command_timeout
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _timed_query(name: str):
+    async def query(self, *args, timeout=None, **kwargs):
+        try:
+            return await getattr(self._conn, name)(*args, timeout=timeout or self._timeout, **kwargs)
+        except asyncio.TimeoutError as e:
+            self._pool._command_timed_out(e)
+            raise
+    query.__name__ = name
+    return query
+
+
+for _name in ('execute', 'executemany', 'fetch', 'fetchrow', 'fetchval', 'fetchmany'):
+    setattr(_Connection, _name, _timed_query(_name))
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. DB_BREAKER_FAILURES connection failures in a row
+    open it, and for DB_BREAKER_RESET_SECONDS every acquire fails at once
+    instead of waiting on a dead server. After that one call (or the health
+    probe) is let through half-open: success closes it, failure opens it again.
+    """
+
+    def __init__(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self.opened = 0  # times it opened since start
+        self._trial = False
+
+    def check(self):
+        """Raise DatabaseUnavailable unless a call may go through now"""
+        if self.state == 'open':
+            remaining = Config.DB_BREAKER_RESET_SECONDS - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise DatabaseUnavailable(f"Database unavailable (circuit open, next try in {remaining:.0f}s): {self.last_error}")
+            self.state = 'half_open'
+            self._trial = False
+        if self.state == 'half_open':
+            if self._trial:
+                raise DatabaseUnavailable(f"Database unavailable (checking if it is back): {self.last_error}")
+            self._trial = True
+
+    def record_success(self) -> bool:
+        """Returns True if this closed an open/half-open circuit"""
+        recovered = self.state != 'closed'
+        self.state = 'closed'
+        self.failures = 0
+        self._trial = False
+        if recovered:
+            logger.info("Database circuit closed, database reachable again")
+        return recovered
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        self._trial = False
+        if self.state == 'half_open' or (self.state == 'closed' and self.failures >= Config.DB_BREAKER_FAILURES):
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+            self.opened += 1
+            logger.error(f"Database circuit opened after {self.failures} failure(s): {self.last_error}")
+
+
+class _Acquire:
+    """`async with db.pool.acquire() as conn` / `conn = await db.pool.acquire()`, through the resilience layer"""
+
+    def __init__(self, pool: 'ResilientPool', timeout: Optional[float]):
+        self.pool = pool
+        self.timeout = timeout
+        self.conn = None
+
+    def __await__(self):
+        return self.pool._acquire(self.timeout).__await__()
+
+    async def __aenter__(self):
+        self.conn = await self.pool._acquire(self.timeout)
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc is not None:
+                self.pool._observe_error(exc, self.conn)
+        finally:
+            await self.pool.release(self.conn)
+
+
+class ResilientPool:
+    """
+    Stands in for the asyncpg pool (models keep using `db.pool.acquire()`).
+    Acquire waits at most DB_ACQUIRE_TIMEOUT_SECONDS for a free connection,
+    retries connection errors with jittered backoff and goes through the
+    circuit breaker. Connections start with the interactive statement_timeout;
+    reporting/maintenance blocks raise it for the checkout, and the pool's
+    RESET ALL on release restores it. The client-side command timeout follows
+    the same class, so statements on a connection to an unreachable server end
+    too. Timeouts while connecting count as breaker failures; waiting behind
+    busy connections does not. Statements themselves are not retried: most
+    model writes are not idempotent.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, breaker: CircuitBreaker, database: 'Database'):
+        self._pool = pool
+        self.breaker = breaker
+        self.database = database
+        self.stats = Counter()  # acquires, retries, acquire/connect/statement/command timeouts, connection_errors, fast_failures
+
+    def acquire(self, timeout: Optional[float] = None) -> _Acquire:
+        return _Acquire(self, timeout)
+
+    async def release(self, conn, timeout: Optional[float] = None):
+        if isinstance(conn, _Connection):
+            conn = conn._conn
+        await self._pool.release(conn, timeout=timeout or Config.DB_ACQUIRE_TIMEOUT_SECONDS)
+
+    def saturated(self) -> bool:
+        """Every connection is open and checked out (acquire waits in the queue)"""
+        return self._pool.get_idle_size() == 0 and self._pool.get_size() >= Config.DB_POOL_MAX_SIZE
+
+    async def _acquire(self, timeout: Optional[float]):
+        timeout = timeout or Config.DB_ACQUIRE_TIMEOUT_SECONDS
+        for attempt in range(Config.DB_CONNECT_RETRIES + 1):
+            try:
+                self.breaker.check()
+            except DatabaseUnavailable:
+                self.stats['fast_failures'] += 1
+                raise
+
+            saturated = self.saturated()
+            try:
+                conn = await self._pool.acquire(timeout=timeout)
+            except asyncio.TimeoutError as e:
+                if not saturated:
+                    # The time went into opening a connection: the server is not answering
+                    self.stats['connect_timeouts'] += 1
+                    self._connection_failed(e)
+                    raise DatabaseUnavailable(f"Database did not answer within {timeout:.1f}s") from e
+                # Every connection is busy: fail within the budget rather than queue behind slow statements
+                self.breaker._trial = False
+                self.stats['acquire_timeouts'] += 1
+                raise DatabaseUnavailable(f"No free database connection within {timeout:.1f}s") from e
+            except CONNECTION_ERRORS as e:
+                # Opening a new connection failed; nothing ran yet, so this is safe to retry
+                self._connection_failed(e)
+                if attempt == Config.DB_CONNECT_RETRIES:
+                    raise
+                self.stats['retries'] += 1
+                delay = Config.DB_RETRY_BASE_SECONDS * 2 ** attempt
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                continue
+
+            self.stats['acquires'] += 1
+            if self.breaker.record_success():
+                self.database._recovered()
+
+            timeout_ms = statement_timeouts()[_query_class.get()]
+            if timeout_ms == Config.DB_INTERACTIVE_TIMEOUT_MS:
+                return _Connection(conn, self, None)
+            try:
+                await conn.execute(f"SET statement_timeout = {int(timeout_ms)}")
+            except BaseException:
+                await self.release(conn)
+                raise
+            return _Connection(conn, self, command_timeout(timeout_ms))
+
+    def _observe_error(self, error: BaseException, conn=None):
+        """
+        Count an error raised inside a checkout. Only a dead connection is a breaker
+        failure; a caller's own timeout, a reset it caused or a misused connection
+        is not (command timeouts are counted where asyncpg raises them).
+        """
+        if isinstance(error, asyncpg.QueryCanceledError):
+            self.stats['statement_timeouts'] += 1
+        elif isinstance(error, DEAD_CONNECTION_ERRORS):
+            self._connection_failed(error)
+        elif conn is not None and not isinstance(error, asyncio.TimeoutError) and conn.is_closed():
+            self._connection_failed(error)
+
+    def _command_timed_out(self, error: Exception):
+        # asyncpg's client-side limit passed: the server did not even cancel the statement
+        self.stats['command_timeouts'] += 1
+        self._connection_failed(error)
+
+    def _connection_failed(self, error: Exception):
+        self.stats['connection_errors'] += 1
+        self.breaker.record_failure(error)
+        # After a server restart every pooled connection is dead: reconnect on next use
+        self._pool.expire_connections()
+
+    def __getattr__(self, name):
+        # get_size(), get_idle_size(), expire_connections(), ... of the asyncpg pool
+        return getattr(self._pool, name)
+
+
 class Database:
     def __init__(self):
-        self.pool = None
-    
+        self.pool: Optional[ResilientPool] = None
+        self.breaker = CircuitBreaker()
+        self.slow_queries = SlowQueryLog()
+        self._query_observers: List[Callable] = []
+        self._recovery_callbacks: List[Callable] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self.last_health_check: Optional[datetime] = None
+        self.last_health_ms: Optional[float] = None
+
     async def connect(self):
-        """Create database connection pool"""
-        self.pool = await asyncpg.create_pool(
-            host=Config.DB_HOST,
-            port=Config.DB_PORT,
-            database=Config.DB_NAME,
-            user=Config.DB_USER,
-            password=Config.DB_PASSWORD,
-            min_size=5,
-            max_size=20
-        )
-        logger.info("Database connected")
-    
+        """Create database connection pool (retried while the server is not up yet)"""
+        for attempt in range(Config.DB_CONNECT_RETRIES + 1):
+            try:
+                pool = await asyncpg.create_pool(
+                    host=Config.DB_HOST,
+                    port=Config.DB_PORT,
+                    database=Config.DB_NAME,
+                    user=Config.DB_USER,
+                    password=Config.DB_PASSWORD,
+                    min_size=Config.DB_POOL_MIN_SIZE,
+                    max_size=Config.DB_POOL_MAX_SIZE,
+                    max_queries=Config.DB_MAX_QUERIES_PER_CONNECTION,                     # recycle long-lived connections
+                    max_inactive_connection_lifetime=Config.DB_MAX_IDLE_SECONDS,          # close idle ones
+                    timeout=Config.DB_CONNECT_TIMEOUT_SECONDS,
+                    command_timeout=command_timeout(Config.DB_INTERACTIVE_TIMEOUT_MS),     # dead sockets
+                    server_settings={
+                        # Session defaults, restored by RESET ALL when a connection goes back to the pool
+                        'statement_timeout': str(Config.DB_INTERACTIVE_TIMEOUT_MS),
+                        'idle_in_transaction_session_timeout': str(Config.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS),
+                    },
+                    init=self._init_connection if (
+                        Config.DB_QUERY_DIAGNOSTICS or Config.DB_SLOW_QUERY_MS > 0 or self._query_observers
+                    ) else None
+                )
+                break
+            except CONNECTION_ERRORS as e:
+                if attempt == Config.DB_CONNECT_RETRIES:
+                    raise
+                delay = Config.DB_BREAKER_RESET_SECONDS
+                logger.warning(f"Database connection failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        self.pool = ResilientPool(pool, self.breaker, self)
+        if Config.DB_HEALTH_CHECK_SECONDS > 0:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        logger.info("Database connected" + (" (query diagnostics on)" if Config.DB_QUERY_DIAGNOSTICS else ""))
+
     async def disconnect(self):
         """Close database connection pool"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
         if self.pool:
             await self.pool.close()
             logger.info("Database disconnected")
-    
+
+    # ==================== HEALTH ====================
+    def on_recovered(self, callback: Callable):
+        """Call back (no arguments) when the database is reachable again after an outage"""
+        self._recovery_callbacks.append(callback)
+
+    def _recovered(self):
+        for callback in self._recovery_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Database recovery callback failed: {e}")
+
+    async def _health_loop(self):
+        """Probe with SELECT 1 (bypassing the breaker, so it also ends an outage early)"""
+        while True:
+            await asyncio.sleep(Config.DB_HEALTH_CHECK_SECONDS)
+            started = time.monotonic()
+            saturated = self.pool.saturated()
+            try:
+                async with self.pool._pool.acquire(timeout=Config.DB_ACQUIRE_TIMEOUT_SECONDS) as conn:
+                    saturated = False
+                    await conn.fetchval('SELECT 1', timeout=Config.DB_ACQUIRE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError as e:
+                if saturated:
+                    # Only waited for a busy pool; that says nothing about the server
+                    logger.warning("Database health check timed out waiting for a free connection")
+                else:
+                    logger.warning("Database health check timed out")
+                    self.pool._connection_failed(e)
+            except CONNECTION_ERRORS as e:
+                logger.warning(f"Database health check failed: {e}")
+                self.pool._connection_failed(e)
+            except Exception as e:
+                logger.error(f"Database health check error: {e}")
+            else:
+                self.last_health_ms = (time.monotonic() - started) * 1000
+                if self.breaker.record_success():
+                    self._recovered()
+            self.last_health_check = datetime.now()
+
+    def health(self) -> Dict[str, Any]:
+        """Breaker state, pool usage and resilience counters for the /bot_health command"""
+        return {
+            'state': self.breaker.state,
+            'failures': self.breaker.failures,
+            'opened': self.breaker.opened,
+            'last_error': self.breaker.last_error,
+            'pool_size': self.pool.get_size() if self.pool else 0,
+            'pool_idle': self.pool.get_idle_size() if self.pool else 0,
+            'pool_max': Config.DB_POOL_MAX_SIZE,
+            'stats': dict(self.pool.stats) if self.pool else {},
+            'last_health_check': self.last_health_check,
+            'last_health_ms': self.last_health_ms
+        }
+
     async def execute_sql_file(self, filepath: str):
         """Execute SQL file to create tables"""
         try:
             with open(filepath, 'r') as f:
                 sql = f.read()
-            
-            async with self.pool.acquire() as conn:
-                await conn.execute(sql)
-            
+
+            # Index builds and materialized views can take a while on a large database
+            with query_class('maintenance'):
+                async with self.pool.acquire() as conn:
+                    await conn.execute(sql)
+
             logger.info(f"Executed SQL file: {filepath}")
         except Exception as e:
             logger.error(f"Failed to execute SQL file: {e}")
             raise
 
+    # ==================== QUERY DIAGNOSTICS ====================
+    async def _init_connection(self, conn):
+        conn.add_query_logger(self._log_query)
+
+    def observe_queries(self, callback: Callable):
+        """Call back with every completed query record (register before connect())"""
+        self._query_observers.append(callback)
+
+    def _log_query(self, record):
+        # Runs via loop.call_soon with the querying task's context, so the scope is visible here
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.record(record.query, record.elapsed)
+            logger.debug(f"[{scope.label} #{scope.interaction_id}] {record.elapsed * 1000:.1f} ms: {' '.join(record.query.split())[:160]}")
+
+        if Config.DB_SLOW_QUERY_MS > 0 and record.elapsed * 1000 >= Config.DB_SLOW_QUERY_MS and record.exception is None:
+            self._capture_slow_query(record, scope.label if scope else None)
+
+        for callback in self._query_observers:
+            callback(record)
+
+    def _capture_slow_query(self, record, label: Optional[str]):
+        statement = ' '.join(record.query.split())
+        explainable = statement.upper().startswith(EXPLAINABLE) and ';' not in statement.rstrip(';')
+        logger.warning(f"Slow query ({record.elapsed * 1000:.0f} ms){f' [{label}]' if label else ''}: {statement[:200]}")
+
+        self.slow_queries.add(statement, record.args, record.elapsed, label=label)
+        if explainable and self.slow_queries.should_explain(statement):
+            # Mark as explained now so a burst of the same statement triggers one EXPLAIN
+            self.slow_queries.set_plan(statement, [])
+            asyncio.get_running_loop().create_task(self._explain(statement, record.query, record.args))
+
+    async def _explain(self, statement: str, query: str, args):
+        """Capture the plan without executing the statement (no ANALYZE)"""
+        try:
+            async with self.pool.acquire() as conn:
+                plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *(args or ()))
+            self.slow_queries.set_plan(statement, json.loads(plan) if isinstance(plan, str) else plan)
+        except Exception as e:
+            logger.debug(f"EXPLAIN failed for slow query: {e}")
+
+    @asynccontextmanager
+    async def track(self, label: str, interaction_id: Optional[int] = None, budget: Optional[int] = None):
+        """Count the queries made inside the block and report budget overruns / repeated statements"""
+        if not Config.DB_QUERY_DIAGNOSTICS or _current_scope.get() is not None:
+            yield _current_scope.get()
+            return
+
+        scope = QueryScope(label, interaction_id, budget)
+        token = _current_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            # Let the query loggers queued by the last statement run first
+            await asyncio.sleep(0)
+            _current_scope.reset(token)
+            scope.report()
+
 # Global database instance
-db = Database()
\ No newline at end of file
+db = Database()
@@ -0,0 +1,191 @@
+"""Packs report rows into the fewest embeds/messages within Discord's limits"""
+import discord
+from datetime import datetime
+from typing import List
+from config import Config
+import io
+
+# Discord limits (https://discord.com/developers/docs/resources/message#embed-object-embed-limits)
+EMBED_TITLE_LIMIT = 256
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_LIMIT = 25
+EMBED_FIELD_NAME_LIMIT = 256
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_FOOTER_LIMIT = 2048
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_EMBED_CHARACTERS = 6000  # shared by all embeds of one message
+
+# Characters kept free in every message for the "N more row(s) in ..." note
+OVERFLOW_NOTE_RESERVE = 100
+
+
+def split_value(value: str, limit: int = EMBED_FIELD_VALUE_LIMIT) -> List[str]:
+    """Split text into chunks of at most `limit` characters, at line breaks where possible"""
+    value = value or "\u200b"
+    chunks, current = [], ""
+    for line in value.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current or not chunks:
+        chunks.append(current or "\u200b")
+    return chunks
+
+
+class EmbedPacker:
+    """
+    Collects the fields of a report and lays them out over as few embeds and
+    messages as Discord allows: 25 fields per embed, 10 embeds and 6,000
+    characters per message. Long values continue in a "(cont.)" field instead
+    of being cut off. Rows that do not fit in `max_messages` messages are
+    written to a text attachment on the last message, so nothing is dropped.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        description: str = None,
+        color: discord.Color = None,
+        footer: str = None,
+        thumbnail_url: str = None,
+        timestamp: datetime = None,
+        max_messages: int = None,
+        attachment_name: str = "report.txt"
+    ):
+        self.title = title[:EMBED_TITLE_LIMIT]
+        self.description = description[:EMBED_DESCRIPTION_LIMIT] if description else None
+        self.color = color if color is not None else discord.Color.blue()
+        self.footer = footer[:EMBED_FOOTER_LIMIT - OVERFLOW_NOTE_RESERVE] if footer else None
+        self.thumbnail_url = thumbnail_url
+        self.timestamp = timestamp
+        self.max_messages = max(1, max_messages or Config.EMBED_PACK_MAX_MESSAGES)
+        self.attachment_name = attachment_name
+        self.fields: List[tuple] = []  # (name, value, inline, rows)
+
+    # ==================== ROWS ====================
+    def add_field(self, name: str, value: str, inline: bool = False):
+        """Add a field; values over 1,024 characters continue in extra fields"""
+        return self._add(name, value, inline, rows=1)
+
+    def _add(self, name: str, value: str, inline: bool, rows: int):
+        # rows: report rows the field holds, for the overflow note; continuations add none
+        name = (name or "\u200b")[:EMBED_FIELD_NAME_LIMIT]
+        for index, chunk in enumerate(split_value(str(value))):
+            if index == 0:
+                self.fields.append((name, chunk, inline, rows))
+            else:
+                self.fields.append((f"{name} (cont.)"[:EMBED_FIELD_NAME_LIMIT], chunk, inline, 0))
+        return self
+
+    def add_lines(self, name: str, lines: List[str], empty: str = "None"):
+        """Add a list as one field per 1,024 characters, never splitting an entry that fits in one field"""
+        if not lines:
+            return self.add_field(name, empty)
+
+        chunk, rows = "", 0
+        for line in lines:
+            candidate = f"{chunk}\n{line}" if chunk else line
+            if chunk and len(candidate) > EMBED_FIELD_VALUE_LIMIT:
+                self._add(name, chunk, False, rows)
+                name = f"{name.removesuffix(' (cont.)')} (cont.)"
+                candidate, rows = line, 0
+            chunk = candidate
+            rows += 1
+        return self._add(name, chunk, False, rows)
+
+    # ==================== LAYOUT ====================
+    def _new_embed(self, first: bool) -> discord.Embed:
+        if first:
+            embed = discord.Embed(title=self.title, description=self.description, color=self.color, timestamp=self.timestamp)
+            if self.thumbnail_url:
+                embed.set_thumbnail(url=self.thumbnail_url)
+        else:
+            embed = discord.Embed(color=self.color)
+        return embed
+
+    def pack(self) -> List[dict]:
+        """[{'embeds': [...], 'attachment': (filename, bytes) or None}, ...]"""
+        budget = MESSAGE_EMBED_CHARACTERS - len(self.footer or "") - OVERFLOW_NOTE_RESERVE
+        header = len(self.title) + len(self.description or "")
+
+        messages = [{'embeds': [self._new_embed(first=True)], 'attachment': None}]
+        used = header
+        overflow = []
+
+        for position, (name, value, inline, _) in enumerate(self.fields):
+            cost = len(name) + len(value)
+            message = messages[-1]
+            embed = message['embeds'][-1]
+
+            if used + cost > budget:
+                # Message is full: next message, or everything left goes to the attachment
+                if len(messages) >= self.max_messages:
+                    overflow = self.fields[position:]
+                    break
+                message = {'embeds': [self._new_embed(first=False)], 'attachment': None}
+                messages.append(message)
+                embed = message['embeds'][-1]
+                used = 0
+            elif len(embed.fields) >= EMBED_FIELD_LIMIT:
+                if len(message['embeds']) >= EMBEDS_PER_MESSAGE:
+                    if len(messages) >= self.max_messages:
+                        overflow = self.fields[position:]
+                        break
+                    message = {'embeds': [], 'attachment': None}
+                    messages.append(message)
+                    used = 0
+                embed = self._new_embed(first=False)
+                message['embeds'].append(embed)
+
+            embed.add_field(name=name, value=value, inline=inline)
+            used += cost
+
+        footer = self.footer or ""
+        if overflow:
+            rows = sum(field_rows for _, _, _, field_rows in overflow)
+            note = f"{rows} more row(s) in {self.attachment_name}"
+            footer = f"{footer} • {note}" if footer else note
+            messages[-1]['attachment'] = (self.attachment_name, self._attachment(overflow))
+        if footer:
+            messages[-1]['embeds'][-1].set_footer(text=footer)
+
+        return messages
+
+    def _attachment(self, fields: List[tuple]) -> bytes:
+        lines = [self.title]
+        if self.description:
+            lines.append(self.description)
+        lines.append("")
+        for name, value, _, _ in fields:
+            if name.endswith(" (cont.)"):
+                lines.append(value)
+                continue
+            lines.extend(["", name, value])
+        return "\n".join(lines).encode('utf-8')
+
+    # ==================== SENDING ====================
+    async def send(self, interaction: discord.Interaction, view: discord.ui.View = None, ephemeral: bool = True) -> int:
+        """Send the report (view on the last message); returns the number of messages sent"""
+        messages = self.pack()
+        for index, message in enumerate(messages):
+            kwargs = {'embeds': message['embeds'], 'ephemeral': ephemeral}
+            if message['attachment'] is not None:
+                filename, data = message['attachment']
+                kwargs['file'] = discord.File(io.BytesIO(data), filename=filename)
+            if view is not None and index == len(messages) - 1:
+                kwargs['view'] = view
+
+            if interaction.response.is_done():
+                await interaction.followup.send(**kwargs)
+            else:
+                await interaction.response.send_message(**kwargs)
+        return len(messages)
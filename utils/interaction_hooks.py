@@ -0,0 +1,77 @@
+"""One wrapper around discord.py's interaction dispatch that tracing and query diagnostics hook into"""
+import discord
+from discord import app_commands
+from discord.ui.view import ViewStore
+from contextlib import AsyncExitStack
+from typing import AsyncContextManager, Callable, List
+import functools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# hook(label, interaction) -> async context manager the handler runs inside
+DispatchHook = Callable[[str, discord.Interaction], AsyncContextManager]
+
+_hooks: List[DispatchHook] = []
+_installed = False
+
+
+def add_dispatch_hook(hook: DispatchHook):
+    """
+    Run every slash command, view component, dynamic item and modal handler inside
+    hook(label, interaction). Hooks nest in the order they were added.
+    """
+    _hooks.append(hook)
+    _install()
+
+
+async def _dispatch(label: str, interaction: discord.Interaction, handler):
+    async with AsyncExitStack() as stack:
+        for hook in _hooks:
+            await stack.enter_async_context(hook(label, interaction))
+        return await handler
+
+
+def _install():
+    """Patch discord.py's per-interaction task entry points once"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    tree_call = app_commands.CommandTree._call
+    view_task = discord.ui.View._scheduled_task
+    modal_task = discord.ui.Modal._scheduled_task
+    dynamic_item_call = ViewStore.schedule_dynamic_item_call
+
+    @functools.wraps(tree_call)
+    async def hooked_tree_call(self, interaction):
+        data = interaction.data or {}
+        label = f"/{data.get('name', 'unknown')}"
+        if interaction.type is discord.InteractionType.autocomplete:
+            label += " (autocomplete)"
+        return await _dispatch(label, interaction, tree_call(self, interaction))
+
+    @functools.wraps(view_task)
+    async def hooked_view_task(self, item, interaction):
+        # Decorated buttons/selects wrap the function; plain items expose it directly
+        function = getattr(item.callback, 'callback', item.callback)
+        callback = getattr(function, '__name__', None) or getattr(item, 'custom_id', None) or type(item).__name__
+        return await _dispatch(f"{type(self).__name__}.{callback}", interaction, view_task(self, item, interaction))
+
+    @functools.wraps(modal_task)
+    async def hooked_modal_task(self, interaction, *args, **kwargs):
+        return await _dispatch(f"{type(self).__name__}.on_submit", interaction, modal_task(self, interaction, *args, **kwargs))
+
+    @functools.wraps(dynamic_item_call)
+    async def hooked_dynamic_item_call(self, component_type, factory, interaction, custom_id, match):
+        return await _dispatch(
+            f"{factory.__name__}.callback", interaction,
+            dynamic_item_call(self, component_type, factory, interaction, custom_id, match)
+        )
+
+    app_commands.CommandTree._call = hooked_tree_call
+    discord.ui.View._scheduled_task = hooked_view_task
+    discord.ui.Modal._scheduled_task = hooked_modal_task
+    ViewStore.schedule_dynamic_item_call = hooked_dynamic_item_call
+    logger.info("Interaction dispatch hooks installed")
@@ -0,0 +1,265 @@
+"""Per-interaction latency spans: time to first response, DB calls and followups"""
+import discord
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+from config import Config
+from utils.database import db
+from utils.interaction_hooks import add_dispatch_hook
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Exported traces, one JSON object per line (not propagated to the console log)
+trace_logger = logging.getLogger('interaction_traces')
+trace_logger.propagate = False
+
+# Discord drops interactions that are not acknowledged within 3 seconds of creation
+RESPONSE_DEADLINE_MS = 3000
+
+RESPONSE_METHODS = ('defer', 'send_message', 'edit_message', 'send_modal', 'autocomplete')
+
+
+class InteractionTrace:
+    """Spans of one interaction, in milliseconds since Discord created it"""
+
+    def __init__(self, label: str, interaction: discord.Interaction):
+        self.label = label
+        self.interaction_id = interaction.id
+        self.user_id = interaction.user.id if interaction.user else None
+        self.created_at = interaction.created_at
+        # Gateway + dispatch delay before our handler got the interaction (clock skew clamped)
+        self.received_ms = max(0.0, (datetime.now(timezone.utc) - self.created_at).total_seconds() * 1000)
+        self._started = time.monotonic()
+        self.first_response_ms: Optional[float] = None
+        self.first_response: Optional[str] = None
+        self.spans: List[dict] = [{'kind': 'received', 'at_ms': round(self.received_ms, 1)}]
+        self.error: Optional[str] = None
+
+    def now_ms(self) -> float:
+        return self.received_ms + (time.monotonic() - self._started) * 1000
+
+    def add(self, kind: str, detail: str = None, duration_ms: float = None, at_ms: float = None):
+        span = {'kind': kind, 'at_ms': round(at_ms if at_ms is not None else self.now_ms(), 1)}
+        if detail:
+            span['detail'] = detail
+        if duration_ms is not None:
+            span['duration_ms'] = round(duration_ms, 1)
+        self.spans.append(span)
+
+    def responded(self, method: str):
+        if self.first_response_ms is None:
+            self.first_response_ms = self.now_ms()
+            self.first_response = method
+        self.add(method)
+
+    def to_dict(self) -> dict:
+        return {
+            'label': self.label,
+            'interaction_id': self.interaction_id,
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat(),
+            'received_ms': round(self.received_ms, 1),
+            'first_response_ms': round(self.first_response_ms, 1) if self.first_response_ms is not None else None,
+            'first_response': self.first_response,
+            'total_ms': round(self.now_ms(), 1),
+            'error': self.error,
+            'spans': self.spans
+        }
+
+
+# Trace of the interaction currently being handled (set per task)
+_current_trace: ContextVar[Optional[InteractionTrace]] = ContextVar('interaction_trace', default=None)
+
+
+class TracedFollowup(discord.Webhook):
+    """Followup webhook of a traced interaction: each send is recorded as a followup span"""
+    __slots__ = ('trace',)
+
+    @classmethod
+    def for_interaction(cls, interaction: discord.Interaction, trace: InteractionTrace) -> 'TracedFollowup':
+        # Same webhook Interaction.followup builds
+        followup = cls.from_state(
+            data={'id': interaction.application_id, 'type': 3, 'token': interaction.token},
+            state=interaction._state
+        )
+        followup.trace = trace
+        return followup
+
+    async def send(self, *args, **kwargs):
+        started = self.trace.now_ms()
+        try:
+            return await super().send(*args, **kwargs)
+        finally:
+            self.trace.add('followup', duration_ms=self.trace.now_ms() - started, at_ms=started)
+
+
+class InteractionTracer:
+    """
+    Collects a trace per slash command, component and modal interaction, warns
+    when the first response came close to (or past) the 3 second deadline, keeps
+    per-handler statistics in memory and appends each trace to a JSONL file
+    (rotated at INTERACTION_TRACE_MAX_MB, INTERACTION_TRACE_BACKUPS files kept).
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, dict] = {}
+        self._installed = False
+        self._exporting = False
+
+    # ==================== INSTALL ====================
+    def install(self):
+        """Trace interaction dispatch and response/followup calls (idempotent)"""
+        if self._installed:
+            return
+        self._installed = True
+
+        add_dispatch_hook(self._trace)
+
+        for name in RESPONSE_METHODS:
+            method = getattr(discord.InteractionResponse, name, None)
+            if method is not None:
+                setattr(discord.InteractionResponse, name, self._wrap_response(name, method))
+        discord.Interaction.edit_original_response = self._wrap_call(
+            'edit_original_response', discord.Interaction.edit_original_response
+        )
+
+        db.observe_queries(self._on_query)
+        self._exporting = self._open_export()
+        logger.info(f"Interaction tracing installed (export: {Config.INTERACTION_TRACE_FILE if self._exporting else 'off'})")
+
+    @staticmethod
+    def _open_export() -> bool:
+        path = Config.INTERACTION_TRACE_FILE
+        if not path:
+            return False
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=int(Config.INTERACTION_TRACE_MAX_MB * 1024 * 1024),
+                backupCount=Config.INTERACTION_TRACE_BACKUPS,
+                encoding='utf-8'
+            )
+        except OSError as e:
+            logger.error(f"Interaction trace export disabled: {e}")
+            return False
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        trace_logger.addHandler(handler)
+        trace_logger.setLevel(logging.INFO)
+        return True
+
+    @staticmethod
+    def _wrap_response(name: str, method):
+        @functools.wraps(method)
+        async def traced(response, *args, **kwargs):
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.responded(name)
+            return await method(response, *args, **kwargs)
+        return traced
+
+    @staticmethod
+    def _wrap_call(kind: str, method):
+        @functools.wraps(method)
+        async def traced(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return await method(*args, **kwargs)
+            started = trace.now_ms()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                trace.add(kind, duration_ms=trace.now_ms() - started, at_ms=started)
+        return traced
+
+    def _on_query(self, record):
+        # Query loggers run with the querying task's context
+        trace = _current_trace.get()
+        if trace is not None:
+            elapsed_ms = record.elapsed * 1000
+            trace.add('db', ' '.join(record.query.split())[:120], duration_ms=elapsed_ms, at_ms=trace.now_ms() - elapsed_ms)
+
+    # ==================== TRACE LIFECYCLE ====================
+    @asynccontextmanager
+    async def _trace(self, label: str, interaction: discord.Interaction):
+        if _current_trace.get() is not None:
+            yield
+            return
+
+        trace = InteractionTrace(label, interaction)
+        token = _current_trace.set(trace)
+        # Only this interaction's followups count (not every webhook send in the process)
+        interaction._cs_followup = TracedFollowup.for_interaction(interaction, trace)
+        try:
+            yield
+        except Exception as e:
+            trace.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # Let the query loggers queued by the last statement run first
+            await asyncio.sleep(0)
+            _current_trace.reset(token)
+            self._finish(trace)
+            if self._exporting:
+                await asyncio.to_thread(self._export, trace.to_dict())
+
+    def _finish(self, trace: InteractionTrace):
+        stats = self.stats.setdefault(trace.label, {
+            'count': 0,
+            'near_deadline': 0,
+            'missed': 0,
+            'first_response_ms': deque(maxlen=200)
+        })
+        stats['count'] += 1
+
+        first_response = trace.first_response_ms
+        if first_response is None or first_response >= RESPONSE_DEADLINE_MS:
+            stats['missed'] += 1
+            logger.warning(
+                f"[{trace.label} #{trace.interaction_id}] no response within {RESPONSE_DEADLINE_MS} ms "
+                f"(first response: {f'{first_response:.0f} ms' if first_response is not None else 'never'})"
+            )
+        elif first_response >= Config.INTERACTION_DEFER_WARN_MS:
+            stats['near_deadline'] += 1
+            logger.warning(
+                f"[{trace.label} #{trace.interaction_id}] first response after {first_response:.0f} ms "
+                f"({trace.first_response}); defer earlier"
+            )
+        if first_response is not None:
+            stats['first_response_ms'].append(first_response)
+
+    @staticmethod
+    def _export(record: dict):
+        # The handler rotates the file and serializes writes from worker threads
+        trace_logger.info(json.dumps(record))
+
+    # ==================== METRICS ====================
+    def slowest(self, limit: int = 5) -> List[dict]:
+        """Handlers ranked by p95 time to first response"""
+        ranked = []
+        for label, stats in self.stats.items():
+            samples = sorted(stats['first_response_ms'])
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else None
+            ranked.append({
+                'label': label,
+                'count': stats['count'],
+                'p95_ms': p95,
+                'near_deadline': stats['near_deadline'],
+                'missed': stats['missed']
+            })
+        ranked.sort(key=lambda h: (h['missed'], h['p95_ms'] or 0), reverse=True)
+        return ranked[:limit]
+
+
+# Global interaction tracer
+interaction_tracer = InteractionTracer()
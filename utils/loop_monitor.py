@@ -0,0 +1,142 @@
+"""Event loop health: scheduling lag percentiles and stacks of blocking callbacks"""
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import Config
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopMonitor:
+    """
+    A heartbeat task sleeps LOOP_LAG_INTERVAL_MS and records how late it wakes up
+    (the loop's scheduling lag). A daemon watchdog thread checks the heartbeat and,
+    when the loop has been stuck longer than LOOP_BLOCK_THRESHOLD_MS, grabs the loop
+    thread's current stack - the callback that is blocking it. Both are a few
+    timestamp comparisons per interval, so it can stay on in production.
+    """
+
+    def __init__(self):
+        self.lag_samples = deque(maxlen=Config.LOOP_LAG_SAMPLES)  # seconds
+        self.blocks = deque(maxlen=Config.LOOP_BLOCK_BUFFER)
+        self._last_tick = time.monotonic()
+        self._pending_block: Optional[dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Loop monitor started (interval {Config.LOOP_LAG_INTERVAL_MS} ms, "
+            f"block threshold {Config.LOOP_BLOCK_THRESHOLD_MS} ms)"
+        )
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ==================== HEARTBEAT (loop thread) ====================
+    async def _heartbeat(self):
+        interval = Config.LOOP_LAG_INTERVAL_MS / 1000
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.lag_samples.append(lag)
+            self._last_tick = now
+
+            block = self._pending_block
+            if block is not None:
+                # The watchdog caught this stall; the heartbeat knows how long it lasted
+                self._pending_block = None
+                block['duration_ms'] = lag * 1000
+                logger.warning(
+                    f"Event loop blocked for {block['duration_ms']:.0f} ms in {block['location']}"
+                )
+
+    # ==================== WATCHDOG (own thread) ====================
+    def _watch(self):
+        interval = Config.LOOP_LAG_INTERVAL_MS / 1000
+        threshold = Config.LOOP_BLOCK_THRESHOLD_MS / 1000
+        poll = max(threshold / 2, 0.01)
+        while not self._stopped.wait(poll):
+            stalled = time.monotonic() - self._last_tick - interval
+            if stalled < threshold or self._pending_block is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            block = {
+                'detected_at': datetime.now(),
+                'duration_ms': stalled * 1000,  # updated by the heartbeat once the loop recovers
+                'location': self._location(stack),
+                'stack': traceback.format_list(stack[-Config.LOOP_BLOCK_STACK_DEPTH:])
+            }
+            self.blocks.append(block)
+            self._pending_block = block
+
+    @staticmethod
+    def _location(stack: traceback.StackSummary) -> str:
+        """Innermost frame in the bot's own code (falls back to the innermost frame)"""
+        for entry in reversed(stack):
+            if entry.filename.startswith(PROJECT_ROOT) and os.sep + 'site-packages' + os.sep not in entry.filename:
+                return f"{os.path.relpath(entry.filename, PROJECT_ROOT)}:{entry.lineno} ({entry.name})"
+        entry = stack[-1]
+        return f"{entry.filename}:{entry.lineno} ({entry.name})"
+
+    # ==================== METRICS ====================
+    def percentiles(self, *points: float) -> Dict[str, float]:
+        """Lag percentiles in milliseconds over the sample window"""
+        samples = sorted(self.lag_samples)
+        if not samples:
+            return {f"p{point:g}": 0.0 for point in points}
+        return {
+            f"p{point:g}": samples[min(len(samples) - 1, int(len(samples) * point / 100))] * 1000
+            for point in points
+        }
+
+    def snapshot(self) -> Dict:
+        """Current loop health for the /bot_health command"""
+        window = len(self.lag_samples) * Config.LOOP_LAG_INTERVAL_MS / 1000
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'window_seconds': window,
+            'samples': len(self.lag_samples),
+            'lag_ms': self.percentiles(50, 95, 99, 100),
+            'blocks': list(self.blocks),
+            'blocks_in_window': sum(
+                1 for block in self.blocks
+                if (datetime.now() - block['detected_at']).total_seconds() <= window
+            )
+        }
+
+    def recent_blocks(self, limit: int = 5) -> List[dict]:
+        return list(self.blocks)[-limit:][::-1]
+
+
+# Global loop monitor
+loop_monitor = LoopMonitor()
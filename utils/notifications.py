@@ -0,0 +1,37 @@
+import discord
+import logging
+from typing import List
+from config import Config
+from models.user_model import UserModel
+from models.settings_model import SettingsModel
+from utils.send_queue import send_queue
+
+logger = logging.getLogger(__name__)
+
+
+async def get_admin_users():
+    """Get all active SUPER ADMIN (role_id 1) and ADMIN (role_id 2) users"""
+    admin_users = list(await UserModel.get_users_by_role(1, include_deleted=False))
+    admin_users.extend(await UserModel.get_users_by_role(2, include_deleted=False))
+    return admin_users
+
+
+async def send_admin_dm(bot, embed: discord.Embed = None, embeds: List[discord.Embed] = None, attachment: tuple = None) -> int:
+    """
+    Queue an embed (or several, plus an optional (filename, bytes) attachment)
+    as DM to every admin (see utils.send_queue), returns the number of DMs
+    queued. Alerts to the same admin close together arrive as one message;
+    delivery failures are logged and counted by the queue.
+    """
+    queued = 0
+    for admin in await get_admin_users():
+        if admin['discord_id'] and send_queue.send_dm(admin['discord_id'], embed=embed, embeds=embeds, attachment=attachment):
+            queued += 1
+    return queued
+
+
+def alert_severity(alert_type: str, week_count: int, month_count: int) -> str:
+    """'high' once a count reaches ALERT_HIGH_SEVERITY_MULTIPLIER x the alert threshold, else 'normal'"""
+    threshold = SettingsModel.get_alert_thresholds()[alert_type]
+    high = threshold * Config.ALERT_HIGH_SEVERITY_MULTIPLIER
+    return 'high' if week_count >= high or month_count >= high else 'normal'
@@ -0,0 +1,23 @@
+"""Development hooks that run every interaction handler inside a query budget scope"""
+from utils.database import db
+from utils.interaction_hooks import add_dispatch_hook
+import logging
+
+logger = logging.getLogger(__name__)
+
+_installed = False
+
+
+def install_query_diagnostics():
+    """
+    Run slash command, view component, dynamic item and modal handlers in db.track() so each
+    interaction's round trips are counted (only used with DB_QUERY_DIAGNOSTICS).
+    Hooks discord.py's per-interaction task entry points; not meant for production.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    add_dispatch_hook(lambda label, interaction: db.track(label, interaction.id))
+    logger.warning("Query diagnostics installed: interactions are tracked against DB_QUERY_BUDGET")
@@ -0,0 +1,54 @@
+"""Debounced concurrent refresh of the rating_aggregates materialized view"""
+from typing import Optional
+from config import Config
+from utils.database import db, query_class
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RatingAggregates:
+    """
+    Refreshes rating_aggregates with REFRESH MATERIALIZED VIEW CONCURRENTLY, so
+    readers are never blocked. New ratings schedule one refresh after
+    RATING_AGGREGATE_DEBOUNCE_SECONDS (a burst of ratings refreshes once);
+    the maintenance cog also refreshes on a schedule.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._pending: Optional[asyncio.Task] = None
+        self.last_refreshed: Optional[float] = None  # time.time() of the last refresh
+        self.last_duration_ms: Optional[float] = None
+
+    async def refresh(self):
+        """Refresh now (one refresh at a time)"""
+        async with self._lock:
+            started = time.monotonic()
+            with query_class('maintenance'):
+                async with db.pool.acquire() as conn:
+                    await conn.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY rating_aggregates')
+            self.last_duration_ms = (time.monotonic() - started) * 1000
+            self.last_refreshed = time.time()
+            logger.info(f"Rating aggregates refreshed in {self.last_duration_ms:.0f} ms")
+
+    def schedule_refresh(self):
+        """Refresh after the debounce delay unless a refresh is already scheduled"""
+        if self._pending is not None and not self._pending.done():
+            return
+        self._pending = asyncio.get_running_loop().create_task(self._debounced_refresh())
+
+    async def _debounced_refresh(self):
+        await asyncio.sleep(Config.RATING_AGGREGATE_DEBOUNCE_SECONDS)
+        # Ratings saved from here on schedule a new refresh
+        self._pending = None
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Rating aggregates refresh failed: {e}")
+
+
+# Global rating aggregates refresher
+rating_aggregates = RatingAggregates()
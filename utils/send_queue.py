@@ -0,0 +1,223 @@
+"""Outbound DM/channel message queue: per-destination buckets, coalescing, retries with jitter"""
+import discord
+import aiohttp
+from collections import Counter, deque
+from typing import Dict, List, Optional
+from config import Config
+from utils.embed_packer import EMBEDS_PER_MESSAGE, MESSAGE_EMBED_CHARACTERS
+import asyncio
+import io
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_CONTENT_LIMIT = 2000
+ATTACHMENTS_PER_MESSAGE = 10
+
+
+class SendQueue:
+    """
+    Messages that are not interaction responses (admin DMs, channel posts) are
+    queued here instead of being sent inline. Discord rate-limits every DM and
+    text channel as its own route bucket, so each destination gets one worker
+    that sends in order. The worker waits SEND_COALESCE_SECONDS after the first
+    queued message and sends everything queued for that destination meanwhile
+    as one message (up to 10 embeds / 6,000 characters). SEND_QUEUE_CONCURRENCY
+    caps the sends in flight across all destinations. Server errors, timeouts
+    and rate limits are retried with exponential backoff and jitter; Forbidden
+    and NotFound are dropped straight away.
+    """
+
+    def __init__(self):
+        self.bot = None
+        self.buckets: Dict[tuple, deque] = {}  # ('dm' | 'channel', id) -> queued messages
+        self._workers: Dict[tuple, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._closing = False
+        self.stats = Counter()    # queued, sent, messages, coalesced, retries
+        self.dropped = Counter()  # reason -> queued messages dropped
+        self.max_depth = 0
+        self.wait_samples = deque(maxlen=500)  # seconds from queueing to delivery
+
+    def start(self, bot):
+        self.bot = bot
+        self._closing = False
+        self._semaphore = asyncio.Semaphore(Config.SEND_QUEUE_CONCURRENCY)
+
+    async def close(self, timeout: float = 10):
+        """Send what is queued (without waiting for the coalescing window), then stop"""
+        self._closing = True
+        workers = [worker for worker in self._workers.values() if not worker.done()]
+        if workers:
+            done, pending = await asyncio.wait(workers, timeout=timeout)
+            for worker in pending:
+                worker.cancel()
+        left = self.depth()
+        if left:
+            self.dropped['shutdown'] += left
+            logger.warning(f"Send queue closed with {left} message(s) unsent")
+
+    # ==================== ENQUEUE ====================
+    def send_dm(
+        self,
+        discord_id: int,
+        content: str = None,
+        embed: discord.Embed = None,
+        embeds: List[discord.Embed] = None,
+        attachment: tuple = None
+    ) -> bool:
+        """Queue a DM (attachment is (filename, bytes)); returns False if it could not be queued"""
+        return self._enqueue(('dm', discord_id), content, ([embed] if embed else []) + (embeds or []), attachment)
+
+    def send_channel(
+        self,
+        channel_id: int,
+        content: str = None,
+        embed: discord.Embed = None,
+        embeds: List[discord.Embed] = None,
+        attachment: tuple = None
+    ) -> bool:
+        """Queue a channel message (attachment is (filename, bytes)); returns False if it could not be queued"""
+        return self._enqueue(('channel', channel_id), content, ([embed] if embed else []) + (embeds or []), attachment)
+
+    def _enqueue(
+        self,
+        destination: tuple,
+        content: Optional[str],
+        embeds: List[discord.Embed],
+        attachment: Optional[tuple]
+    ) -> bool:
+        if self.bot is None or self._closing:
+            self.dropped['not_running'] += 1
+            logger.warning(f"Send queue not running, message to {destination} dropped")
+            return False
+
+        bucket = self.buckets.setdefault(destination, deque())
+        if len(bucket) >= Config.SEND_QUEUE_MAX_PER_DESTINATION:
+            bucket.popleft()
+            self.dropped['overflow'] += 1
+            logger.warning(f"Send queue for {destination} is full, oldest message dropped")
+
+        bucket.append({
+            'content': content[:MESSAGE_CONTENT_LIMIT] if content else None,
+            'embeds': embeds[:EMBEDS_PER_MESSAGE],
+            'attachments': [attachment] if attachment else [],
+            'queued_at': time.monotonic()
+        })
+        self.stats['queued'] += 1
+        self.max_depth = max(self.max_depth, self.depth())
+
+        worker = self._workers.get(destination)
+        if worker is None or worker.done():
+            self._workers[destination] = asyncio.get_running_loop().create_task(self._drain(destination))
+        return True
+
+    # ==================== WORKERS ====================
+    async def _drain(self, destination: tuple):
+        bucket = self.buckets[destination]
+        try:
+            while bucket:
+                if not self._closing:
+                    # Let notifications for the same recipient pile up into one message
+                    await asyncio.sleep(Config.SEND_COALESCE_SECONDS)
+                await self._deliver(destination, self._take_batch(bucket))
+        except Exception as e:
+            logger.error(f"Send queue worker for {destination} failed: {e}")
+        finally:
+            if not bucket:
+                self.buckets.pop(destination, None)
+            self._workers.pop(destination, None)
+
+    @staticmethod
+    def _take_batch(bucket: deque) -> List[dict]:
+        """Queued messages that fit in one Discord message, oldest first"""
+        batch, embeds, characters, content, attachments = [], 0, 0, 0, 0
+        while bucket:
+            message = bucket[0]
+            message_embeds = len(message['embeds'])
+            message_characters = sum(len(embed) for embed in message['embeds'])
+            message_content = len(message['content']) + 1 if message['content'] else 0
+            if batch and (
+                embeds + message_embeds > EMBEDS_PER_MESSAGE
+                or characters + message_characters > MESSAGE_EMBED_CHARACTERS
+                or content + message_content > MESSAGE_CONTENT_LIMIT
+                or attachments + len(message['attachments']) > ATTACHMENTS_PER_MESSAGE
+            ):
+                break
+            batch.append(bucket.popleft())
+            embeds += message_embeds
+            characters += message_characters
+            content += message_content
+            attachments += len(message['attachments'])
+        return batch
+
+    async def _resolve(self, destination: tuple):
+        kind, target_id = destination
+        if kind == 'dm':
+            return self.bot.get_user(target_id) or await self.bot.fetch_user(target_id)
+        return self.bot.get_channel(target_id) or await self.bot.fetch_channel(target_id)
+
+    async def _deliver(self, destination: tuple, batch: List[dict]):
+        content = "\n".join(message['content'] for message in batch if message['content']) or None
+        embeds = [embed for message in batch for embed in message['embeds']]
+        attachments = [attachment for message in batch for attachment in message['attachments']]
+
+        for attempt in range(Config.SEND_MAX_RETRIES + 1):
+            try:
+                async with self._semaphore:
+                    target = await self._resolve(destination)
+                    # Files are read when sent, so build them for every attempt
+                    files = [discord.File(io.BytesIO(data), filename=filename) for filename, data in attachments]
+                    await target.send(content=content, embeds=embeds, files=files)
+            except (discord.Forbidden, discord.NotFound) as e:
+                # DMs disabled, bot blocked, user/channel gone: retrying will not help
+                self._drop(destination, batch, 'forbidden' if isinstance(e, discord.Forbidden) else 'not_found', e)
+                return
+            except (discord.HTTPException, discord.RateLimited, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = getattr(e, 'status', None)
+                if status is not None and status < 500 and status != 429:
+                    self._drop(destination, batch, 'rejected', e)
+                    return
+                if attempt == Config.SEND_MAX_RETRIES:
+                    self._drop(destination, batch, 'retries_exhausted', e)
+                    return
+
+                delay = min(Config.SEND_RETRY_MAX_SECONDS, Config.SEND_RETRY_BASE_SECONDS * 2 ** attempt)
+                delay = max(delay * random.uniform(0.5, 1.5), getattr(e, 'retry_after', 0))
+                self.stats['retries'] += 1
+                logger.warning(f"Send to {destination} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                now = time.monotonic()
+                self.stats['messages'] += 1
+                self.stats['sent'] += len(batch)
+                self.stats['coalesced'] += len(batch) - 1
+                self.wait_samples.extend(now - message['queued_at'] for message in batch)
+                return
+
+    def _drop(self, destination: tuple, batch: List[dict], reason: str, error: Exception):
+        self.dropped[reason] += len(batch)
+        logger.warning(f"Dropped {len(batch)} message(s) to {destination} ({reason}): {error}")
+
+    # ==================== METRICS ====================
+    def depth(self) -> int:
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def snapshot(self) -> dict:
+        """Queue depth, delivery and drop counters for the /bot_health command"""
+        waits = sorted(self.wait_samples)
+        return {
+            'running': self.bot is not None and not self._closing,
+            'depth': self.depth(),
+            'destinations': len(self.buckets),
+            'max_depth': self.max_depth,
+            'stats': dict(self.stats),
+            'dropped': dict(self.dropped),
+            'p95_wait_seconds': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else None
+        }
+
+
+# Global outbound message queue
+send_queue = SendQueue()
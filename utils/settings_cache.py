@@ -0,0 +1,193 @@
+"""In-memory settings with single-statement writes and cross-process invalidation"""
+from typing import Callable, Dict, List, Optional, Set
+from utils.database import db
+import asyncio
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'settings_changed'
+PROCESS_TOKEN = uuid.uuid4().hex  # tells our own notifications apart from other processes'
+
+# Known settings and their defaults; the default's type is the setting's type
+# (values are stored in settings.int_value, booleans as 0/1)
+DEFAULTS = {
+    # Sick leave application window
+    'sick_leave_anchor_hour': 10,
+    'sick_leave_early_hours': 12,
+    'sick_leave_late_hours': 2,
+    # Default shift (see utils.shift_schedule)
+    'shift_start_minute': 240,
+    'shift_grace_minutes': 10,
+    'shift_required_minutes': 480,
+    # Admin alerts: leaves in a rolling week/month before admins are notified
+    'non_compliant_alert_threshold': 2,
+    'sick_leave_alert_threshold': 2,
+}
+
+
+class SettingsCache:
+    """
+    All rows of the settings table, loaded at startup and served from memory.
+    Writes upsert every changed key in one statement and NOTIFY the other bot
+    processes, which reload on the notification. If the LISTEN connection is
+    lost, or the database comes back after an outage, a new connection LISTENs
+    and the cache is reloaded, since notifications may have been missed.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, int] = {}
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._listen_conn = None
+        self._relisten_task: Optional[asyncio.Task] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reload_names: Optional[Set[str]] = set()  # changed names for the next reload; None: all
+
+    async def load(self):
+        """(Re)load every setting from the database"""
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch('SELECT name, int_value FROM settings')
+        self.values = {row['name']: row['int_value'] for row in rows}
+        logger.info(f"Settings loaded: {len(self.values)} value(s)")
+
+    def get(self, name: str, default=None):
+        """Get a typed setting without I/O (falls back to the known default)"""
+        fallback = DEFAULTS.get(name) if default is None else default
+        value = self.values.get(name)
+        if value is None:
+            return fallback
+        if isinstance(fallback, bool):
+            return bool(value)
+        return value
+
+    def get_many(self, *names: str) -> Dict[str, Optional[int]]:
+        return {name: self.get(name) for name in names}
+
+    async def set_many(self, values: Dict[str, int]):
+        """Upsert several settings in one statement and notify every process"""
+        names = list(values)
+        int_values = [int(values[name]) if values[name] is not None else None for name in names]
+
+        async with db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute('''
+                    INSERT INTO settings (name, int_value, updated_at)
+                    SELECT name, int_value, TIMEZONE('utc', CURRENT_TIMESTAMP)
+                    FROM unnest($1::VARCHAR[], $2::INTEGER[]) AS s(name, int_value)
+                    ON CONFLICT (name) DO UPDATE
+                    SET int_value = EXCLUDED.int_value, updated_at = EXCLUDED.updated_at
+                ''', names, int_values)
+                # Delivered on commit
+                await conn.execute(
+                    'SELECT pg_notify($1, $2)', NOTIFY_CHANNEL,
+                    json.dumps({'origin': PROCESS_TOKEN, 'names': names})
+                )
+
+        self.values.update(zip(names, int_values))
+        self._fire(names)
+
+    # ==================== CHANGE NOTIFICATIONS ====================
+    def on_change(self, callback: Callable[[List[str]], None]):
+        """Register a callback receiving the changed setting names"""
+        self._listeners.append(callback)
+
+    def _fire(self, names: List[str]):
+        for callback in self._listeners:
+            try:
+                callback(names)
+            except Exception as e:
+                logger.error(f"Settings change callback failed: {e}")
+
+    async def start_listening(self):
+        """Hold one pooled connection that LISTENs for changes made by other processes"""
+        if self._listen_conn is not None:
+            return
+        conn = await db.pool.acquire()
+        try:
+            await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except BaseException:
+            await db.pool.release(conn)
+            raise
+        conn.add_termination_listener(self._on_terminated)
+        self._listen_conn = conn
+
+    async def stop_listening(self):
+        for task in (self._relisten_task, self._reload_task):
+            if task is not None:
+                task.cancel()
+        self._relisten_task = self._reload_task = None
+        await self._drop_listen_conn()
+
+    async def _drop_listen_conn(self):
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None:
+            return
+        conn.remove_termination_listener(self._on_terminated)
+        try:
+            if not conn.is_closed():
+                await conn.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+        except Exception as e:
+            logger.warning(f"Settings UNLISTEN failed: {e}")
+        finally:
+            await db.pool.release(conn)
+
+    def _on_terminated(self, connection):
+        logger.warning("Settings LISTEN connection closed, listening on a new one")
+        self.relisten()
+
+    def relisten(self):
+        """Listen on a fresh connection and reload (connection lost, or database back after an outage)"""
+        if self._relisten_task is None or self._relisten_task.done():
+            self._relisten_task = asyncio.get_running_loop().create_task(self._relisten())
+
+    async def _relisten(self):
+        delay = 1
+        while True:
+            try:
+                await self._drop_listen_conn()
+                await self.start_listening()
+                break
+            except Exception as e:
+                logger.warning(f"Settings LISTEN failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+        # Changes made meanwhile were not notified to us
+        self._schedule_reload(None)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except (TypeError, ValueError):
+            message = {}
+        # Our own writes are already applied locally
+        if message.get('origin') == PROCESS_TOKEN:
+            return
+        self._schedule_reload(message.get('names'))
+
+    def _schedule_reload(self, names: Optional[List[str]]):
+        """Reload in one tracked task; notifications arriving meanwhile are merged into the next pass"""
+        if names is None or self._reload_names is None:
+            self._reload_names = None
+        else:
+            self._reload_names.update(names)
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.get_running_loop().create_task(self._run_reloads())
+
+    async def _run_reloads(self):
+        while self._reload_names is None or self._reload_names:
+            names, self._reload_names = self._reload_names, set()
+            await self._reload(list(names) if names is not None else None)
+
+    async def _reload(self, names: Optional[List[str]]):
+        try:
+            await self.load()
+            self._fire(names or list(self.values))
+        except Exception as e:
+            logger.error(f"Settings reload failed: {e}")
+
+
+# Global settings cache
+settings_cache = SettingsCache()
+db.on_recovered(settings_cache.relisten)
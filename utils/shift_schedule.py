@@ -0,0 +1,109 @@
+"""In-memory shift schedules for late checks and required working minutes"""
+from datetime import datetime, date, time as dt_time, timedelta
+from typing import Dict, List, Optional
+from utils.database import db
+from utils.settings_cache import settings_cache
+import logging
+import pytz
+
+logger = logging.getLogger(__name__)
+
+SHIFT_SETTINGS = ('shift_start_minute', 'shift_grace_minutes', 'shift_required_minutes')
+
+
+class ShiftSchedules:
+    """
+    Shift lookup by user, then department, then the company default from settings.
+    A shift is compiled for the local day (in its own timezone) that contains the
+    instant being checked, into a naive-UTC late threshold, so a UTC+10 08:00 start
+    resolves to 22:00 UTC of the previous UTC day. Compiled shifts are cached per
+    (shift, local day); lookups are then dictionary hits.
+    """
+
+    def __init__(self):
+        self.user_shifts: Dict[int, dict] = {}
+        self.department_shifts: Dict[str, dict] = {}
+        self._compiled: Dict[tuple, dict] = {}  # (shift key, local day) -> compiled shift
+
+    @property
+    def default(self) -> dict:
+        """Company default shift from the settings cache (UTC)"""
+        start_minute = settings_cache.get('shift_start_minute')
+        return {
+            'start_time': dt_time(start_minute // 60, start_minute % 60),
+            'grace_minutes': settings_cache.get('shift_grace_minutes'),
+            'required_minutes': settings_cache.get('shift_required_minutes'),
+            'timezone': 'UTC'
+        }
+
+    async def load(self):
+        """Load all department and user overrides"""
+        async with db.pool.acquire() as conn:
+            shifts = await conn.fetch('''
+                SELECT shift_id, department, user_id, start_time, grace_minutes, required_minutes, timezone
+                FROM shift_schedules
+            ''')
+
+        self.user_shifts = {row['user_id']: dict(row) for row in shifts if row['user_id']}
+        self.department_shifts = {row['department']: dict(row) for row in shifts if row['department']}
+        self._compiled = {}
+
+        logger.info(f"Shift schedules loaded: {len(self.user_shifts)} user, {len(self.department_shifts)} department overrides")
+
+    def invalidate(self, changed_settings: List[str] = None):
+        """Recompile on the next lookup (e.g. after the default shift settings changed)"""
+        if changed_settings is None or any(name in SHIFT_SETTINGS for name in changed_settings):
+            self._compiled = {}
+
+    @staticmethod
+    def _timezone(shift: dict):
+        try:
+            return pytz.timezone(shift['timezone'])
+        except pytz.UnknownTimeZoneError:
+            return pytz.utc
+
+    @staticmethod
+    def _compile_shift(shift: dict, day: date, source: str) -> dict:
+        """Resolve a shift's start and late threshold on a local day of its timezone"""
+        tz = ShiftSchedules._timezone(shift)
+        local_start = tz.localize(datetime.combine(day, shift['start_time']))
+        start_utc = local_start.astimezone(pytz.utc).replace(tzinfo=None)
+        return {
+            'source': source,
+            'local_day': day,
+            'start_time': shift['start_time'],
+            'timezone': shift['timezone'],
+            'grace_minutes': shift['grace_minutes'],
+            'required_minutes': shift['required_minutes'],
+            'start_utc': start_utc,
+            'late_threshold': start_utc + timedelta(minutes=shift['grace_minutes'])  # naive UTC
+        }
+
+    def for_user(self, user_id: int, department: Optional[str] = None, at: datetime = None) -> dict:
+        """
+        Get the compiled shift that applies to a user at an instant (aware, or naive
+        UTC; defaults to now): the shift of the local day containing that instant
+        """
+        at = at or datetime.now(pytz.utc)
+        if at.tzinfo is None:
+            at = pytz.utc.localize(at)
+
+        if user_id in self.user_shifts:
+            key, shift, source = ('user', user_id), self.user_shifts[user_id], 'User'
+        elif department in self.department_shifts:
+            key, shift, source = ('department', department), self.department_shifts[department], department
+        else:
+            key, shift, source = ('default',), self.default, 'Default'
+
+        local_day = at.astimezone(self._timezone(shift)).date()
+        compiled = self._compiled.get((key, local_day))
+        if compiled is None:
+            if len(self._compiled) > 10000:
+                self._compiled = {}  # old days are never looked up again
+            compiled = self._compiled[(key, local_day)] = self._compile_shift(shift, local_day, source)
+        return compiled
+
+
+# Global shift schedules
+shift_schedules = ShiftSchedules()
+settings_cache.on_change(shift_schedules.invalidate)
@@ -0,0 +1,79 @@
+"""Working-day calendar with per-department weekends and holidays"""
+from calendar import isleap
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from config import Config
+from utils.database import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WorkCalendar:
+    """
+    Answers "is this a working day" and "how many working days between A and B"
+    for a department. Each (department, year) is built once into a prefix-sum
+    array over the year's working-day bitmap, so range counts are O(1) per year.
+    Loaded at startup and reloaded by CalendarModel on every write.
+    """
+
+    def __init__(self):
+        self.holidays: Dict[Optional[str], Set[date]] = {}  # department (None = everyone) -> dates
+        self.weekend_days: Dict[str, Set[int]] = {}          # department -> ISO weekdays off
+        self._prefix: Dict[Tuple[Optional[str], int], List[int]] = {}
+
+    async def load(self):
+        """Load holidays and department weekends from the database"""
+        async with db.pool.acquire() as conn:
+            holidays = await conn.fetch('SELECT holiday_date, department FROM holidays')
+            work_weeks = await conn.fetch('SELECT department, weekend_days FROM department_work_weeks')
+
+        self.holidays = {}
+        for row in holidays:
+            self.holidays.setdefault(row['department'], set()).add(row['holiday_date'])
+        self.weekend_days = {row['department']: set(row['weekend_days']) for row in work_weeks}
+        self._prefix = {}
+
+        logger.info(f"Work calendar loaded: {len(holidays)} holidays, {len(work_weeks)} department work weeks")
+
+    def _year_prefix(self, department: Optional[str], year: int) -> List[int]:
+        """prefix[i] = working days among the first i days of the year"""
+        key = (department, year)
+        prefix = self._prefix.get(key)
+        if prefix is not None:
+            return prefix
+
+        weekend = self.weekend_days.get(department, set(Config.DEFAULT_WEEKEND_DAYS))
+        days_off = self.holidays.get(None, set()) | self.holidays.get(department, set())
+
+        prefix = [0]
+        day = date(year, 1, 1)
+        for _ in range(366 if isleap(year) else 365):
+            working = day.isoweekday() not in weekend and day not in days_off
+            prefix.append(prefix[-1] + working)
+            day += timedelta(days=1)
+
+        self._prefix[key] = prefix
+        return prefix
+
+    def is_working_day(self, day: date, department: Optional[str] = None) -> bool:
+        ordinal = day.timetuple().tm_yday
+        prefix = self._year_prefix(department, day.year)
+        return prefix[ordinal] > prefix[ordinal - 1]
+
+    def working_days_between(self, start: date, end: date, department: Optional[str] = None) -> int:
+        """Number of working days from start to end (both inclusive)"""
+        if end < start:
+            return 0
+
+        total = 0
+        for year in range(start.year, end.year + 1):
+            prefix = self._year_prefix(department, year)
+            first = start.timetuple().tm_yday if year == start.year else 1
+            last = end.timetuple().tm_yday if year == end.year else len(prefix) - 1
+            total += prefix[last] - prefix[first - 1]
+        return total
+
+
+# Global work calendar
+work_calendar = WorkCalendar()
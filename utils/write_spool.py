@@ -0,0 +1,297 @@
+"""Local write-ahead spool for time-critical writes made while Postgres is unreachable"""
+import discord
+import aiohttp
+from collections import Counter, deque
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+from config import Config
+from utils.database import db, CONNECTION_ERRORS
+from utils.send_queue import send_queue
+import asyncio
+import json
+import logging
+import os
+import pytz
+import sqlite3
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolRejected(Exception):
+    """Raised by a replay handler when an entry can never be applied (not retried)"""
+
+
+class WriteSpool:
+    """
+    Clock-ins, clock-outs, late reasons and screen share events that fail because
+    the database is unreachable are appended to a local SQLite file (WAL, fsync on
+    commit) with the time the user ran the command. A background task replays
+    them oldest first through the handler registered for each kind once the
+    database answers again; entries are deleted only after their handler
+    succeeded, and handlers skip writes that already landed, so a replay that
+    is interrupted can safely run again. While a user still has entries waiting,
+    their new events are spooled too so they are applied in order.
+    """
+
+    def __init__(self):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()  # one SQLite call at a time (runs in a worker thread)
+        self._handlers: Dict[str, Callable[..., Awaitable[Optional[str]]]] = {}
+        self._pending = Counter()  # discord_id -> entries waiting for replay
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = Counter()     # spooled, replayed, rejected, failed, retries, full
+        self.failed = 0            # entries kept for inspection after giving up
+        self.replay_lag = deque(maxlen=500)  # seconds from the event to its replay
+        self.last_replay_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    # ==================== STORAGE ====================
+    async def load(self):
+        """Open (or create) the spool file and count what is still waiting"""
+        path = Config.WRITE_SPOOL_PATH
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+        pending, self.failed = await self._run(self._init_storage)
+        self._pending = Counter(dict(pending))
+        if self._pending or self.failed:
+            logger.warning(
+                f"Write spool loaded: {sum(self._pending.values())} entry(s) waiting for replay, "
+                f"{self.failed} failed"
+            )
+
+    def _init_storage(self):
+        conn = self._conn
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")  # only takes effect on a new file
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = FULL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS spool (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                discord_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                recorded_at TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+        ''')
+        conn.execute(
+            "DELETE FROM spool WHERE failed = 1 AND recorded_at < ?",
+            (datetime.fromtimestamp(time.time() - Config.WRITE_SPOOL_FAILED_RETENTION_DAYS * 86400, pytz.utc).isoformat(),)
+        )
+        pending = conn.execute("SELECT discord_id, COUNT(*) FROM spool WHERE failed = 0 GROUP BY discord_id").fetchall()
+        failed = conn.execute("SELECT COUNT(*) FROM spool WHERE failed = 1").fetchone()[0]
+        return pending, failed
+
+    async def _run(self, function, *args):
+        """Run a SQLite call off the event loop (fsync on commit can take milliseconds)"""
+        async with self._lock:
+            return await asyncio.to_thread(function, *args)
+
+    def disk_bytes(self) -> int:
+        path = Config.WRITE_SPOOL_PATH
+        return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+    # ==================== APPEND ====================
+    @staticmethod
+    def is_unavailable(error: Exception) -> bool:
+        """True if the error means the database could not be reached (Discord network errors excluded)"""
+        return isinstance(error, CONNECTION_ERRORS) and not isinstance(error, aiohttp.ClientError)
+
+    def has_pending(self, discord_id: int) -> bool:
+        """Whether events of this user are still waiting for replay (new ones must queue behind them)"""
+        return self._pending[discord_id] > 0
+
+    def register(self, kind: str, handler: Callable[..., Awaitable[Optional[str]]]):
+        """
+        handler(discord_id, payload, recorded_at) applies one entry and returns an
+        optional message for the user (DMed after the replay)
+        """
+        self._handlers[kind] = handler
+
+    async def append(self, kind: str, discord_id: int, payload: dict, recorded_at: datetime) -> bool:
+        """Durably store an event with its true (UTC) time; False if the spool is full or not loaded"""
+        if self._conn is None:
+            return False
+
+        entries = sum(self._pending.values()) + self.failed
+        if entries >= Config.WRITE_SPOOL_MAX_ENTRIES or self.disk_bytes() >= Config.WRITE_SPOOL_MAX_MB * 1024 * 1024:
+            self.stats['full'] += 1
+            logger.error(f"Write spool is full ({entries} entries, {self.disk_bytes()} bytes), {kind} of {discord_id} lost")
+            return False
+
+        await self._run(
+            self._conn.execute,
+            "INSERT INTO spool (entry_id, kind, discord_id, payload, recorded_at) VALUES (?, ?, ?, ?, ?)",
+            (uuid.uuid4().hex, kind, discord_id, json.dumps(payload), recorded_at.astimezone(pytz.utc).isoformat())
+        )
+        self._pending[discord_id] += 1
+        self.stats['spooled'] += 1
+        logger.warning(f"Database unavailable, spooled {kind} of {discord_id} at {recorded_at.isoformat()}")
+        return True
+
+    # ==================== REPLAY ====================
+    def start(self):
+        """Start replaying (after the cogs registered their handlers)"""
+        if self._task is None and self._conn is not None:
+            self._task = asyncio.get_running_loop().create_task(self._replay_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    def wake(self):
+        """Replay now instead of waiting for the next interval"""
+        self._wake.set()
+
+    async def _replay_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=Config.WRITE_SPOOL_REPLAY_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            if not self._pending or db.breaker.state == 'open':
+                continue
+            try:
+                await self.replay()
+            except Exception as e:
+                logger.error(f"Write spool replay failed: {e}")
+
+    async def replay(self) -> int:
+        """Apply waiting entries oldest first; stops at the first sign the database is still down"""
+        rows = await self._run(lambda: self._conn.execute(
+            "SELECT seq, kind, discord_id, payload, recorded_at, attempts FROM spool WHERE failed = 0 ORDER BY seq"
+        ).fetchall())
+
+        replayed = 0
+        blocked = set()  # users with an entry that failed this round: keep their later entries back
+        for seq, kind, discord_id, payload, recorded_at, attempts in rows:
+            handler = self._handlers.get(kind)
+            if discord_id in blocked or handler is None:
+                blocked.add(discord_id)
+                continue
+
+            recorded_at = datetime.fromisoformat(recorded_at)
+            try:
+                message = await handler(discord_id, json.loads(payload), recorded_at)
+            except SpoolRejected as e:
+                await self._fail(seq, kind, discord_id, recorded_at, str(e))
+                continue
+            except Exception as e:
+                self.last_error = f"{kind}: {e}"
+                if self.is_unavailable(e):
+                    logger.warning(f"Write spool replay paused, database still unavailable: {e}")
+                    break
+                if attempts + 1 >= Config.WRITE_SPOOL_MAX_ATTEMPTS:
+                    await self._fail(seq, kind, discord_id, recorded_at, str(e))
+                    continue
+                await self._run(
+                    self._conn.execute,
+                    "UPDATE spool SET attempts = attempts + 1, last_error = ? WHERE seq = ?", (str(e), seq)
+                )
+                self.stats['retries'] += 1
+                blocked.add(discord_id)
+                continue
+
+            await self._run(self._conn.execute, "DELETE FROM spool WHERE seq = ?", (seq,))
+            self._release(discord_id)
+            self.stats['replayed'] += 1
+            self.replay_lag.append((datetime.now(pytz.utc) - recorded_at).total_seconds())
+            replayed += 1
+            if message:
+                send_queue.send_dm(discord_id, content=message)
+
+        if replayed:
+            self.last_replay_at = datetime.now(pytz.utc)
+            logger.info(f"Write spool replayed {replayed} entry(s), {sum(self._pending.values())} still waiting")
+            if not self._pending:
+                await self._run(self._conn.execute, "PRAGMA incremental_vacuum")
+        return replayed
+
+    async def _fail(self, seq: int, kind: str, discord_id: int, recorded_at: datetime, error: str):
+        """Give up on an entry: kept (failed = 1) for an admin to look at, the user is told"""
+        await self._run(self._conn.execute, "UPDATE spool SET failed = 1, last_error = ? WHERE seq = ?", (error, seq))
+        self._release(discord_id)
+        self.failed += 1
+        self.stats['failed'] += 1
+        self.last_error = f"{kind}: {error}"
+        logger.error(f"Write spool gave up on {kind} of {discord_id} at {recorded_at.isoformat()}: {error}")
+        send_queue.send_dm(
+            discord_id,
+            content=(
+                f"⚠️ Your {kind.replace('_', ' ')} from **{recorded_at.strftime('%d/%m/%Y %I:%M %p')} UTC**, saved while "
+                f"the database was unavailable, could not be recorded: {error}\nPlease contact an admin."
+            )
+        )
+
+    def _release(self, discord_id: int):
+        self._pending[discord_id] -= 1
+        if self._pending[discord_id] <= 0:
+            del self._pending[discord_id]
+
+    # ==================== METRICS ====================
+    async def oldest_pending(self) -> Optional[datetime]:
+        if self._conn is None or not self._pending:
+            return None
+        row = await self._run(lambda: self._conn.execute("SELECT MIN(recorded_at) FROM spool WHERE failed = 0").fetchone())
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    async def snapshot(self) -> dict:
+        """Backlog, replay progress and disk usage for the /bot_health command"""
+        lags = sorted(self.replay_lag)
+        return {
+            'running': self._task is not None,
+            'pending': sum(self._pending.values()),
+            'users': len(self._pending),
+            'failed': self.failed,
+            'oldest_pending': await self.oldest_pending(),
+            'stats': dict(self.stats),
+            'last_replay_at': self.last_replay_at,
+            'last_error': self.last_error,
+            'p95_replay_lag_seconds': lags[min(len(lags) - 1, int(len(lags) * 0.95))] if lags else None,
+            'disk_bytes': self.disk_bytes() if self._conn is not None else 0,
+            'max_bytes': Config.WRITE_SPOOL_MAX_MB * 1024 * 1024
+        }
+
+
+async def spool_interaction_event(
+    interaction: discord.Interaction,
+    kind: str,
+    payload: dict,
+    recorded_at: datetime,
+    label: str
+) -> bool:
+    """Spool a user's event and tell them (ephemeral followup) whether it was saved"""
+    if not await write_spool.append(kind, interaction.user.id, payload, recorded_at):
+        await interaction.followup.send(
+            f"❌ The database is unavailable and your {label} could not be saved offline.\n"
+            f"Please tell an admin you did this at **{recorded_at.strftime('%I:%M %p')} UTC**.",
+            ephemeral=True
+        )
+        return False
+
+    await interaction.followup.send(
+        f"⏳ **Database unavailable - your {label} was saved offline.**\n\n"
+        f"**Time:** {recorded_at.strftime('%I:%M %p')} UTC (it will be recorded with this time)\n"
+        f"It is written automatically once the database is back, and you'll get a DM when it is.",
+        ephemeral=True
+    )
+    return True
+
+
+# Global write spool
+write_spool = WriteSpool()
+db.on_recovered(write_spool.wake)  # replay as soon as the database circuit closes
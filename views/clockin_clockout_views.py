@@ -139,7 +139,6 @@ class TrackingToolsView(ui.View):
             
             # Show screen share verification view
             view = ScreenShareVerificationView(
-                self.user_id, 
                 self.time_tracking_id, 
                 self.interaction_user,
                 is_start_of_day=True
@@ -170,23 +169,47 @@ class TrackingToolsView(ui.View):
 
 # ==================== SCREEN SHARE VERIFICATION VIEW ====================
 
-class ScreenShareVerificationView(ui.View):
-    """Verify user is actually screen sharing before completing clock-in"""
+class ScreenShareVerificationButton(
+    ui.DynamicItem[ui.Button],
+    template=r'screen_share:(?P<action>verify|cancel):(?P<tracking_id>[0-9]+):(?P<owner>[0-9]+):(?P<start>[01])'
+):
+    """
+    Verify/cancel button of the clock-in screen share prompt. The time tracking ID,
+    the prompted user and the start-of-day flag live in the custom_id, so the
+    prompt keeps working after a timeout or restart.
+    """
     
-    def __init__(self, user_id: int, time_tracking_id: int, interaction_user: discord.User, is_start_of_day: bool = True):
-        super().__init__(timeout=300)  # 5 minutes timeout
-        self.user_id = user_id
+    def __init__(self, action: str, time_tracking_id: int, owner_discord_id: int, is_start_of_day: bool = True):
+        verify = action == 'verify'
+        super().__init__(ui.Button(
+            label="Verify & Continue" if verify else "Cancel",
+            style=discord.ButtonStyle.success if verify else discord.ButtonStyle.danger,
+            emoji="✅" if verify else "❌",
+            custom_id=f"screen_share:{action}:{time_tracking_id}:{owner_discord_id}:{int(is_start_of_day)}"
+        ))
+        self.action = action
         self.time_tracking_id = time_tracking_id
-        self.interaction_user = interaction_user
+        self.owner_discord_id = owner_discord_id
         self.is_start_of_day = is_start_of_day
     
-    @ui.button(label="Verify & Continue", style=discord.ButtonStyle.success, emoji="✅")
-    async def verify_button(self, interaction: discord.Interaction, button: ui.Button):
-        """Verify screen share and complete clock-in"""
-        if interaction.user.id != self.interaction_user.id:
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['action'], int(match['tracking_id']), int(match['owner']), match['start'] == '1')
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_discord_id:
             await interaction.response.send_message("This is not your prompt!", ephemeral=True)
-            return
-        
+            return False
+        return True
+    
+    async def callback(self, interaction: discord.Interaction):
+        if self.action == 'verify':
+            await self.verify(interaction)
+        else:
+            await self.cancel(interaction)
+    
+    async def verify(self, interaction: discord.Interaction):
+        """Verify screen share and complete clock-in"""
         await interaction.response.defer(ephemeral=True)
         
         try:
@@ -218,9 +241,29 @@ class ScreenShareVerificationView(ui.View):
                 )
                 return
             
+            # State is loaded on click (the prompt may be older than this process)
+            tracking = await TimeTrackingModel.get_tracking_by_id(self.time_tracking_id)
+            if not tracking:
+                await interaction.followup.send(
+                    "❌ This clock-in no longer exists. Please clock in again.",
+                    ephemeral=True
+                )
+                return
+            
+            if self.is_start_of_day and tracking['screen_share_verified']:
+                await interaction.edit_original_response(
+                    embed=discord.Embed(
+                        title="✅ Already Verified",
+                        description="Screen share for this clock-in was already verified. You're all set!",
+                        color=discord.Color.green()
+                    ),
+                    view=None
+                )
+                return
+            
             # Screen share verified - create session and complete clock-in
             session_id = await ScreenShareModel.start_session(
-                user_id=self.user_id,
+                user_id=tracking['user_id'],
                 time_tracking_id=self.time_tracking_id,
                 reason="Start of work session"
             )
@@ -242,7 +285,7 @@ class ScreenShareVerificationView(ui.View):
             
             await interaction.followup.send(success_msg, ephemeral=True)
             
-            # Stop the view
+            # Remove the buttons
             await interaction.edit_original_response(
                 embed=discord.Embed(
                     title="✅ Verified Successfully",
@@ -251,7 +294,6 @@ class ScreenShareVerificationView(ui.View):
                 ),
                 view=None
             )
-            self.stop()
             
         except Exception as e:
             await interaction.followup.send(
@@ -259,13 +301,8 @@ class ScreenShareVerificationView(ui.View):
                 ephemeral=True
             )
     
-    @ui.button(label="Cancel", style=discord.ButtonStyle.danger, emoji="❌")
-    async def cancel_button(self, interaction: discord.Interaction, button: ui.Button):
+    async def cancel(self, interaction: discord.Interaction):
         """Cancel clock-in process"""
-        if interaction.user.id != self.interaction_user.id:
-            await interaction.response.send_message("This is not your prompt!", ephemeral=True)
-            return
-        
         # Delete the time tracking record since user didn't complete
         # Note: You might want to handle this differently based on your requirements
         
@@ -274,7 +311,15 @@ class ScreenShareVerificationView(ui.View):
             "**You are NOT clocked in.** Please start the clock-in process again when ready.",
             ephemeral=True
         )
-        self.stop()
+
+
+class ScreenShareVerificationView(ui.View):
+    """Verify user is actually screen sharing before completing clock-in (persistent)"""
+    
+    def __init__(self, time_tracking_id: int, interaction_user: discord.User, is_start_of_day: bool = True):
+        super().__init__(timeout=None)
+        self.add_item(ScreenShareVerificationButton('verify', time_tracking_id, interaction_user.id, is_start_of_day))
+        self.add_item(ScreenShareVerificationButton('cancel', time_tracking_id, interaction_user.id, is_start_of_day))
 
 
 # ==================== SIMPLE SCREEN SHARE PROMPT (for additional clock-ins) ====================
@@ -398,7 +443,6 @@ class PlanKnownView(ui.View):
         
         # Show screen share verification
         view = ScreenShareVerificationView(
-            self.user_id,
             self.time_tracking_id,
             self.interaction_user,
             is_start_of_day=True
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import pytz
 from models.compliance_rating_model import ComplianceRatingModel
 from models.user_model import UserModel
+from views.pagination import PaginatedEmbedView
 
 
 class EmployeeSelectView(discord.ui.View):
@@ -547,25 +548,10 @@ class DateRangeSelectView(discord.ui.View):
     async def fetch_and_display_ratings(self, interaction, start_date, end_date):
         """Fetch and display ratings for selected users and date range"""
         try:
-            all_ratings = []
+            user_ids = [user_data['user_id'] for _, user_data in self.user_data_list]
+            total_count = await ComplianceRatingModel.get_ratings_count_for_users(user_ids, start_date, end_date)
 
-            for user, user_data in self.user_data_list:
-                # Get all ratings for this user
-                ratings = await ComplianceRatingModel.get_user_ratings(
-                    user_data['user_id'],
-                    limit=100  # Get more ratings to filter by date
-                )
-
-                # Filter by date range if specified
-                if start_date and end_date:
-                    ratings = [r for r in ratings if start_date <= r['rating_date'] <= end_date]
-
-                for rating in ratings:
-                    rating['user_mention'] = user.mention
-                    rating['user_name'] = user_data['name']
-                    all_ratings.append(rating)
-
-            if not all_ratings:
+            if not total_count:
                 date_info = ""
                 if start_date and end_date:
                     date_info = f" between {start_date.strftime('%d/%m/%Y')} and {end_date.strftime('%d/%m/%Y')}"
@@ -576,33 +562,29 @@ class DateRangeSelectView(discord.ui.View):
                 )
                 return
 
-            # Sort by date (newest first)
-            all_ratings.sort(key=lambda x: x['rating_date'], reverse=True)
-
             # Create embed(s)
             date_range_text = "All Time"
             if start_date and end_date:
                 date_range_text = f"{start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
 
-            # Use pagination if more than 5 ratings
-            if len(all_ratings) > 5:
-                view = RatingsPaginationView(
-                    all_ratings=all_ratings,
-                    date_range_text=date_range_text,
-                    employee_count=len(self.user_data_list),
-                    requester_name=interaction.user.name
-                )
-                embed = view.create_embed()
-                await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            view = RatingsPaginationView(
+                user_ids=user_ids,
+                start_date=start_date,
+                end_date=end_date,
+                total_count=total_count,
+                date_range_text=date_range_text,
+                employee_count=len(self.user_data_list),
+                requester_name=interaction.user.name
+            )
+
+            # Use pagination if more than one page of ratings
+            if view.total_pages > 1:
+                await view.send(interaction)
             else:
                 # No pagination needed for small lists
-                embed = self.create_simple_embed(
-                    all_ratings,
-                    date_range_text,
-                    len(self.user_data_list),
-                    interaction.user.name
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
+                ratings = await view.fetch_page(view.per_page, 0)
+                view.stop()
+                await interaction.followup.send(embed=view.build_embed(ratings), ephemeral=True)
 
         except Exception as e:
             await interaction.followup.send(
@@ -610,113 +592,44 @@ class DateRangeSelectView(discord.ui.View):
                 ephemeral=True
             )
 
-    def create_simple_embed(self, all_ratings, date_range_text, employee_count, requester_name):
-        """Create embed for small rating lists (no pagination)"""
-        embed = discord.Embed(
-            title="📊 Compliance Ratings Report",
-            description=(
-                f"**📅 Period:** {date_range_text}\n"
-                f"**📈 Total Ratings:** {len(all_ratings)}\n"
-                f"**👥 Employees:** {employee_count}\n"
-            ),
-            color=discord.Color.blue()
-        )
-
-        for idx, rating in enumerate(all_ratings, 1):
-            rating_date = rating['rating_date']
-            if isinstance(rating_date, str):
-                date_display = rating_date
-            else:
-                date_display = rating_date.strftime('%d/%m/%Y')
 
-            # Build the field value with better formatting
-            field_value = (
-                f"**👤 Employee:** {rating['user_mention']}\n"
-                f"**📅 Date:** {date_display}\n"
-                f"**👑 Rated By:** {rating['rated_by_name']}\n"
-                f"━━━━━━━━━━━━━━━━━━━\n"
-                f"**⚠️ Compliance Breaks:** {rating['compliance_rule_breaks']}\n"
-                f"**📋 Task Submission:** {rating['task_submission_rating']}/10\n"
-                f"**⭐ Overall Performance:** {rating['overall_performance_rating']}/10\n"
-            )
+class RatingsPaginationView(PaginatedEmbedView):
+    """Pagination view for rating reports (pages are fetched from the database as needed)"""
+    empty_message = "📋 No ratings found on this page!"
+    closed_message = "✅ Ratings report closed."
 
-            # Add task submission feedback (truncated)
-            if rating.get('task_submission_feedback'):
-                feedback_preview = rating['task_submission_feedback'][:100]
-                if len(rating['task_submission_feedback']) > 100:
-                    feedback_preview += "..."
-                field_value += f"**💬 Task Feedback:** {feedback_preview}\n"
-
-            # Add overall performance feedback (truncated)
-            if rating.get('overall_performance_feedback'):
-                feedback_preview = rating['overall_performance_feedback'][:100]
-                if len(rating['overall_performance_feedback']) > 100:
-                    feedback_preview += "..."
-                field_value += f"**💭 Overall Feedback:** {feedback_preview}\n"
-
-            # Add full custom/additional fields details
-            if rating.get('custom_ratings') and isinstance(rating['custom_ratings'], dict):
-                if rating['custom_ratings']:
-                    field_value += "━━━━━━━━━━━━━━━━━━━\n**✨ Additional Fields:**\n"
-                    for key, value in rating['custom_ratings'].items():
-                        # Make key readable (replace underscores with spaces, title case)
-                        readable_key = key.replace('_', ' ').title()
-                        # Truncate long values
-                        display_value = str(value)[:80]
-                        if len(str(value)) > 80:
-                            display_value += "..."
-                        field_value += f"• **{readable_key}:** {display_value}\n"
-
-            embed.add_field(
-                name=f"#{idx} • {rating['user_name']} - {date_display}",
-                value=field_value[:1024],
-                inline=False
-            )
-
-        embed.set_footer(text=f"Requested by {requester_name}")
-        return embed
-
-
-class RatingsPaginationView(discord.ui.View):
-    """Pagination view for rating reports"""
-    def __init__(self, all_ratings, date_range_text, employee_count, requester_name):
-        super().__init__(timeout=300)  # 5 minutes timeout
-        self.all_ratings = all_ratings
+    def __init__(self, user_ids, start_date, end_date, total_count, date_range_text, employee_count, requester_name):
+        super().__init__(total_count=total_count, per_page=5)
+        self.user_ids = user_ids
+        self.start_date = start_date
+        self.end_date = end_date
         self.date_range_text = date_range_text
         self.employee_count = employee_count
         self.requester_name = requester_name
-        self.current_page = 0
-        self.items_per_page = 5
-        self.total_pages = (len(all_ratings) + self.items_per_page - 1) // self.items_per_page
-
-        # Update button states
-        self.update_buttons()
 
-    def update_buttons(self):
-        """Enable/disable buttons based on current page"""
-        # Disable previous button on first page
-        self.children[0].disabled = (self.current_page == 0)
-        # Disable next button on last page
-        self.children[1].disabled = (self.current_page >= self.total_pages - 1)
+    async def fetch_page(self, limit: int, offset: int):
+        return await ComplianceRatingModel.get_ratings_for_users(
+            self.user_ids,
+            self.start_date,
+            self.end_date,
+            limit=limit,
+            offset=offset
+        )
 
-    def create_embed(self):
+    def build_embed(self, ratings_page) -> discord.Embed:
         """Create embed for current page"""
-        start_idx = self.current_page * self.items_per_page
-        end_idx = min(start_idx + self.items_per_page, len(self.all_ratings))
-        ratings_page = self.all_ratings[start_idx:end_idx]
-
         embed = discord.Embed(
             title="📊 Compliance Ratings Report",
             description=(
                 f"**📅 Period:** {self.date_range_text}\n"
-                f"**📈 Total Ratings:** {len(self.all_ratings)}\n"
+                f"**📈 Total Ratings:** {self.total_count}\n"
                 f"**👥 Employees:** {self.employee_count}\n"
-                f"**📄 Page:** {self.current_page + 1}/{self.total_pages}\n"
+                f"**📄 Page:** {self.current_page}/{self.total_pages}\n"
             ),
             color=discord.Color.blue()
         )
 
-        for idx, rating in enumerate(ratings_page, start_idx + 1):
+        for idx, rating in enumerate(ratings_page, self.offset + 1):
             rating_date = rating['rating_date']
             if isinstance(rating_date, str):
                 date_display = rating_date
@@ -725,7 +638,7 @@ class RatingsPaginationView(discord.ui.View):
 
             # Build the field value with better formatting
             field_value = (
-                f"**👤 Employee:** {rating['user_mention']}\n"
+                f"**👤 Employee:** <@{rating['user_discord_id']}>\n"
                 f"**📅 Date:** {date_display}\n"
                 f"**👑 Rated By:** {rating['rated_by_name']}\n"
                 f"━━━━━━━━━━━━━━━━━━━\n"
@@ -750,16 +663,15 @@ class RatingsPaginationView(discord.ui.View):
 
             # Add full custom/additional fields details
             if rating.get('custom_ratings') and isinstance(rating['custom_ratings'], dict):
-                if rating['custom_ratings']:
-                    field_value += "━━━━━━━━━━━━━━━━━━━\n**✨ Additional Fields:**\n"
-                    for key, value in rating['custom_ratings'].items():
-                        # Make key readable (replace underscores with spaces, title case)
-                        readable_key = key.replace('_', ' ').title()
-                        # Truncate long values
-                        display_value = str(value)[:80]
-                        if len(str(value)) > 80:
-                            display_value += "..."
-                        field_value += f"• **{readable_key}:** {display_value}\n"
+                field_value += "━━━━━━━━━━━━━━━━━━━\n**✨ Additional Fields:**\n"
+                for key, value in rating['custom_ratings'].items():
+                    # Make key readable (replace underscores with spaces, title case)
+                    readable_key = key.replace('_', ' ').title()
+                    # Truncate long values
+                    display_value = str(value)[:80]
+                    if len(str(value)) > 80:
+                        display_value += "..."
+                    field_value += f"• **{readable_key}:** {display_value}\n"
 
             embed.add_field(
                 name=f"#{idx} • {rating['user_name']} - {date_display}",
@@ -767,25 +679,9 @@ class RatingsPaginationView(discord.ui.View):
                 inline=False
             )
 
-        embed.set_footer(text=f"Page {self.current_page + 1}/{self.total_pages} • Requested by {self.requester_name}")
+        embed.set_footer(text=f"Page {self.current_page}/{self.total_pages} • Requested by {self.requester_name}")
         return embed
 
-    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="◀️")
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.update_buttons()
-            embed = self.create_embed()
-            await interaction.response.edit_message(embed=embed, view=self)
-
-    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            self.update_buttons()
-            embed = self.create_embed()
-            await interaction.response.edit_message(embed=embed, view=self)
-
 
 class CustomDateRangeModal(discord.ui.Modal, title="Enter Custom Date Range"):
     """Modal for entering custom date range"""
@@ -6,6 +6,9 @@ import pytz
 from models.user_model import UserModel
 from models.leave_model import LeaveRequestModel
 from models.settings_model import SettingsModel
+from utils.work_calendar import work_calendar
+from models.admin_alert_model import AdminAlertModel
+from utils.notifications import send_admin_dm, alert_severity
 
 
 class LeaveTypeSelectView(discord.ui.View):
@@ -672,6 +675,9 @@ class ConfirmHalfDayLeaveView(discord.ui.View):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             self.stop()
 
+        except ValueError as e:
+            # Overlapping leave rejected by the database
+            await interaction.response.send_message(f"⚠️ {str(e)}", ephemeral=True)
         except Exception as e:
             await interaction.response.send_message(
                 f"❌ Error submitting request: {str(e)}",
@@ -1224,6 +1230,9 @@ class ConfirmNonCompliantLeaveView(discord.ui.View):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             self.stop()
         
+        except ValueError as e:
+            # Overlapping leave rejected by the database
+            await interaction.response.send_message(f"⚠️ {str(e)}", ephemeral=True)
         except Exception as e:
             await interaction.response.send_message(
                 f"❌ Error submitting request: {str(e)}",
@@ -1231,24 +1240,23 @@ class ConfirmNonCompliantLeaveView(discord.ui.View):
             )
     
     async def _check_and_notify_admins(self, interaction: discord.Interaction, user_id: int, leave_date):
-        """Check if user has 2 or more non-compliant leaves in a week/month and notify admins"""
+        """Check if user reached the non-compliant leave alert threshold in a week/month and notify admins"""
         try:
-            # Get non-compliant leaves for the week (rolling 7-day window ending on leave_date)
-            # Count all leaves from 7 days before leave_date up to and including leave_date
-            week_start = leave_date - timedelta(days=6)  # 7 days total including leave_date
-            week_count = await LeaveRequestModel.get_non_compliant_count(
-                user_id, week_start, leave_date
-            )
-            
-            # Get non-compliant leaves for the month (rolling 30-day window ending on leave_date)
-            # Count all leaves from 30 days before leave_date up to and including leave_date
-            month_start = leave_date - timedelta(days=29)  # 30 days total including leave_date
-            month_count = await LeaveRequestModel.get_non_compliant_count(
-                user_id, month_start, leave_date
-            )
+            # Rolling 7-day and 30-day windows ending on (and including) leave_date, counted in one query
+            week_start = leave_date - timedelta(days=6)
+            month_start = leave_date - timedelta(days=29)
+            stats = await LeaveRequestModel.get_leave_stats(
+                user_id,
+                {'week': (week_start, leave_date), 'month': (month_start, leave_date)},
+                leave_types=['non_compliant'],
+                statuses=['approved', 'pending']
+            )
+            week_count = stats['week']['total']
+            month_count = stats['month']['total']
             
-            # Notify admins if threshold met (2 or more)
-            if week_count >= 2 or month_count >= 2:
+            # Notify admins if threshold met
+            threshold = SettingsModel.get_alert_thresholds()['non_compliant']
+            if week_count >= threshold or month_count >= threshold:
                 user = await UserModel.get_user_by_discord_id(interaction.user.id)
                 if user:
                     await self._send_admin_notification(interaction, user, week_count, month_count, leave_date)
@@ -1258,15 +1266,23 @@ class ConfirmNonCompliantLeaveView(discord.ui.View):
             print(f"Error checking non-compliant leave count: {e}")
     
     async def _send_admin_notification(self, interaction: discord.Interaction, user, week_count: int, month_count: int, leave_date):
-        """Send notification to admins about excessive non-compliant leaves"""
+        """Record the alert for the daily admin digest; high-severity alerts are also DMed right away"""
+        try:
+            severity = alert_severity('non_compliant', week_count, month_count)
+            notified = False
+            if severity == 'high':
+                notified = await self._dm_admin_alert(interaction, user, week_count, month_count, leave_date) > 0
+            await AdminAlertModel.record_alert(
+                'non_compliant', user['user_id'], leave_date, week_count, month_count,
+                severity=severity, notified=notified
+            )
+        
+        except Exception as e:
+            print(f"Error recording admin alert: {e}")
+    
+    async def _dm_admin_alert(self, interaction: discord.Interaction, user, week_count: int, month_count: int, leave_date) -> int:
+        """DM admins about excessive non-compliant leaves, returns the number of DMs queued"""
         try:
-            # Get all admin users (role_id 1 or 2)
-            admin_users = await UserModel.get_users_by_role(1, include_deleted=False)  # Super admins
-            admin_users.extend(await UserModel.get_users_by_role(2, include_deleted=False))  # Admins
-            
-            if not admin_users:
-                return
-            
             # Create notification embed
             embed = discord.Embed(
                 title="⚠️ Non-compliant Leave Alert",
@@ -1279,34 +1295,17 @@ class ConfirmNonCompliantLeaveView(discord.ui.View):
             embed.add_field(name="Month Count", value=f"{month_count} leave(s) in the last 30 days", inline=False)
             embed.add_field(
                 name="⚠️ Action Required",
-                value="This employee has taken 2 or more non-compliant leaves in a week or month.",
+                value=f"This employee has taken {SettingsModel.get_alert_thresholds()['non_compliant']} or more non-compliant leaves in a week or month.",
                 inline=False
             )
             embed.set_footer(text="Automated notification from Compliance Bot")
             
-            # Send DM to each admin using interaction.client (bot instance)
-            bot = interaction.client
-            for admin in admin_users:
-                if admin.get('discord_id'):
-                    try:
-                        # Try to get member from guild
-                        admin_member = interaction.guild.get_member(admin['discord_id'])
-                        if admin_member:
-                            await admin_member.send(embed=embed)
-                        else:
-                            # If not in cache, fetch the user
-                            admin_user_obj = await bot.fetch_user(admin['discord_id'])
-                            if admin_user_obj:
-                                await admin_user_obj.send(embed=embed)
-                    except discord.Forbidden:
-                        # User has DMs disabled or blocked the bot
-                        print(f"Cannot send DM to admin {admin['name']} (ID: {admin['discord_id']}) - DMs disabled or blocked")
-                    except Exception as e:
-                        # Other errors
-                        print(f"Failed to send DM to admin {admin['name']}: {e}")
+            # Queue a DM to each admin (sent in the background, coalesced per admin)
+            return await send_admin_dm(interaction.client, embed)
         
         except Exception as e:
             print(f"Error sending admin notification: {e}")
+            return 0
     
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, emoji="❌")
     async def cancel_request(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -1460,6 +1459,9 @@ class ConfirmLeaveView(discord.ui.View):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             self.stop()
         
+        except ValueError as e:
+            # Overlapping leave rejected by the database
+            await interaction.response.send_message(f"⚠️ {str(e)}", ephemeral=True)
         except Exception as e:
             await interaction.response.send_message(
                 f"❌ Error submitting request: {str(e)}",
@@ -1468,26 +1470,40 @@ class ConfirmLeaveView(discord.ui.View):
     
     async def _check_and_notify_admins_for_sick_leave(self, interaction: discord.Interaction, user, leave_date):
         try:
-            from datetime import timedelta
             week_start = leave_date - timedelta(days=6)
             month_start = leave_date - timedelta(days=29)
             
-            week_count = await LeaveRequestModel.get_sick_leave_count(user['user_id'], week_start, leave_date)
-            month_count = await LeaveRequestModel.get_sick_leave_count(user['user_id'], month_start, leave_date)
+            stats = await LeaveRequestModel.get_leave_stats(
+                user['user_id'],
+                {'week': (week_start, leave_date), 'month': (month_start, leave_date)},
+                leave_types=['sick_leave'],
+                statuses=['approved', 'pending']
+            )
+            week_count = stats['week']['total']
+            month_count = stats['month']['total']
             
-            if week_count >= 2 or month_count >= 2:
+            threshold = SettingsModel.get_alert_thresholds()['sick_leave']
+            if week_count >= threshold or month_count >= threshold:
                 await self._send_admin_notification_for_sick(interaction, user, week_count, month_count, leave_date)
         except Exception as e:
             print(f"Error checking sick leave count: {e}")
     
     async def _send_admin_notification_for_sick(self, interaction: discord.Interaction, user, week_count: int, month_count: int, leave_date):
+        """Record the alert for the daily admin digest; high-severity alerts are also DMed right away"""
+        try:
+            severity = alert_severity('sick_leave', week_count, month_count)
+            notified = False
+            if severity == 'high':
+                notified = await self._dm_admin_alert_for_sick(interaction, user, week_count, month_count, leave_date) > 0
+            await AdminAlertModel.record_alert(
+                'sick_leave', user['user_id'], leave_date, week_count, month_count,
+                severity=severity, notified=notified
+            )
+        except Exception as e:
+            print(f"Error recording admin alert: {e}")
+    
+    async def _dm_admin_alert_for_sick(self, interaction: discord.Interaction, user, week_count: int, month_count: int, leave_date) -> int:
         try:
-            admin_users = await UserModel.get_users_by_role(1, include_deleted=False)
-            admin_users.extend(await UserModel.get_users_by_role(2, include_deleted=False))
-            
-            if not admin_users:
-                return
-            
             embed = discord.Embed(
                 title="⚠️ Sick Leave Alert",
                 description=f"**{user['name']}** has exceeded the sick leave threshold.",
@@ -1499,28 +1515,15 @@ class ConfirmLeaveView(discord.ui.View):
             embed.add_field(name="Month Count", value=f"{month_count} sick leave(s) in the last 30 days", inline=False)
             embed.add_field(
                 name="⚠️ Action Required",
-                value="This employee has taken 2 or more sick leaves in a week or month.",
+                value=f"This employee has taken {SettingsModel.get_alert_thresholds()['sick_leave']} or more sick leaves in a week or month.",
                 inline=False
             )
             embed.set_footer(text="Automated notification from Compliance Bot")
             
-            bot = interaction.client
-            for admin in admin_users:
-                if admin.get('discord_id'):
-                    try:
-                        admin_member = interaction.guild.get_member(admin['discord_id'])
-                        if admin_member:
-                            await admin_member.send(embed=embed)
-                        else:
-                            admin_user_obj = await bot.fetch_user(admin['discord_id'])
-                            if admin_user_obj:
-                                await admin_user_obj.send(embed=embed)
-                    except discord.Forbidden:
-                        print(f"Cannot send DM to admin {admin['name']} (ID: {admin['discord_id']}) - DMs disabled or blocked")
-                    except Exception as e:
-                        print(f"Failed to send DM to admin {admin['name']}: {e}")
+            return await send_admin_dm(interaction.client, embed)
         except Exception as e:
             print(f"Error sending admin notification: {e}")
+            return 0
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, emoji="❌")
     async def cancel_request(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_message(
@@ -1530,12 +1533,53 @@ class ConfirmLeaveView(discord.ui.View):
         self.stop()
 
 
+class LeaveRequestSelect(discord.ui.DynamicItem[discord.ui.Select], template=r'leave_review:select:(?P<reviewer>[0-9]+)'):
+    """
+    Pending leave request picker. Request IDs are the option values and the
+    reviewer is in the custom_id, so the list keeps working after restarts
+    without re-running the listing query.
+    """
+    def __init__(self, reviewer_discord_id: int, options: list):
+        # Allow multiple selections (up to 25, which is Discord's max)
+        super().__init__(discord.ui.Select(
+            placeholder="Select leave request(s) - You can select multiple",
+            options=options,
+            min_values=1,
+            max_values=min(len(options), 25),
+            custom_id=f"leave_review:select:{reviewer_discord_id}"
+        ))
+        self.reviewer_discord_id = reviewer_discord_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(int(match['reviewer']), item.options)
+
+    async def callback(self, interaction: discord.Interaction):
+        if interaction.user.id != self.reviewer_discord_id:
+            await interaction.response.send_message(
+                "❌ Only the admin who opened this list can review requests.",
+                ephemeral=True
+            )
+            return
+
+        selected_request_ids = [int(req_id) for req_id in self.item.values]
+        count = len(selected_request_ids)
+        ids_str = ", ".join([f"#{req_id}" for req_id in selected_request_ids])
+
+        # Show Step 2 view with Approve All and Reject All buttons
+        action_view = ReviewLeaveRequestsActionView(selected_request_ids, self.reviewer_discord_id)
+
+        await interaction.response.send_message(
+            f"ℹ️ Selected **{count}** request(s): {ids_str}\nChoose **Approve All** or **Reject All** below.",
+            view=action_view,
+            ephemeral=True
+        )
+
+
 class ReviewLeaveRequestsView(discord.ui.View):
-    """Admin view to select pending leave requests (Step 1)"""
+    """Admin view to select pending leave requests (Step 1, persistent)"""
     def __init__(self, pending_requests, reviewer_discord_id: int):
-        super().__init__(timeout=300)
-        self.reviewer_discord_id = reviewer_discord_id
-        self.pending_requests = pending_requests
+        super().__init__(timeout=None)
 
         options = []
         leave_type_display = {
@@ -1559,37 +1603,7 @@ class ReviewLeaveRequestsView(discord.ui.View):
                 description=description[:100]
             ))
 
-        # Allow multiple selections (up to 25, which is Discord's max)
-        max_selections = min(len(options), 25)
-        self.leave_select = discord.ui.Select(
-            placeholder="Select leave request(s) - You can select multiple",
-            options=options,
-            min_values=1,
-            max_values=max_selections
-        )
-        self.leave_select.callback = self.on_select
-        self.add_item(self.leave_select)
-
-    async def on_select(self, interaction: discord.Interaction):
-        if interaction.user.id != self.reviewer_discord_id:
-            await interaction.response.send_message(
-                "❌ Only the admin who opened this list can review requests.",
-                ephemeral=True
-            )
-            return
-
-        selected_request_ids = [int(req_id) for req_id in self.leave_select.values]
-        count = len(selected_request_ids)
-        ids_str = ", ".join([f"#{req_id}" for req_id in selected_request_ids])
-
-        # Show Step 2 view with Approve All and Reject All buttons
-        action_view = ReviewLeaveRequestsActionView(selected_request_ids, self.reviewer_discord_id)
-
-        await interaction.response.send_message(
-            f"ℹ️ Selected **{count}** request(s): {ids_str}\nChoose **Approve All** or **Reject All** below.",
-            view=action_view,
-            ephemeral=True
-        )
+        self.add_item(LeaveRequestSelect(reviewer_discord_id, options))
 
 
 class ReviewLeaveRequestsActionView(discord.ui.View):
@@ -1640,32 +1654,32 @@ class ReviewLeaveRequestsActionView(discord.ui.View):
                     already_processed += 1
                     continue
 
+                # Handle paid leave deductions
+                deduct_days = 0
+                start_date = request['start_date']
+                end_date = request['end_date']
+                if isinstance(start_date, datetime):
+                    start_date = start_date.date()
+                if isinstance(end_date, datetime):
+                    end_date = end_date.date()
+                if request['leave_type'] == 'paid_leave':
+                    # Only working days (no weekends/holidays) count against the balance
+                    deduct_days = work_calendar.working_days_between(
+                        start_date, end_date, request['department']
+                    )
+                elif request['leave_type'] == 'half_day_paid':
+                    # Deduct 0.5 day for paid half-day leave, unless it falls on a weekend/holiday
+                    if work_calendar.is_working_day(start_date, request['department']):
+                        deduct_days = 0.5
+
+                # Status change and deduction commit together (no double deduction on concurrent approvals)
                 success = await LeaveRequestModel.approve_leave_request(
                     request_id,
-                    admin_user['user_id']
+                    admin_user['user_id'],
+                    deduct_days=deduct_days
                 )
 
                 if success:
-                    # Handle paid leave deductions
-                    if request['leave_type'] == 'paid_leave':
-                        start_date = request['start_date']
-                        end_date = request['end_date']
-                        if isinstance(start_date, datetime):
-                            start_date = start_date.date()
-                        if isinstance(end_date, datetime):
-                            end_date = end_date.date()
-                        duration_days = (end_date - start_date).days + 1
-                        await LeaveRequestModel.deduct_pending_leave(
-                            request['user_id'],
-                            max(duration_days, 1)
-                        )
-                    elif request['leave_type'] == 'half_day_paid':
-                        # Deduct 0.5 day for paid half-day leave
-                        await LeaveRequestModel.deduct_pending_leave(
-                            request['user_id'],
-                            0.5
-                        )
-
                     approved_count += 1
                     approved_ids.append(request_id)
                 else:
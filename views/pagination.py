@@ -0,0 +1,195 @@
+"""Reusable paginated embed view: page cursor, small page cache, background prefetch"""
+import discord
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List
+from config import Config
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== PAGINATED EMBED VIEW ====================
+
+class PaginatedEmbedView(discord.ui.View, ABC):
+    """
+    Base view for paged lists. Subclasses implement fetch_page(limit, offset)
+    and build_embed(rows); the view keeps the page cursor and at most
+    PAGINATION_CACHE_PAGES fetched pages (least recently used page evicted).
+    After a page is shown the next page in the paging direction is fetched in
+    the background, so the following click edits the message in place without
+    waiting for the database. Timing out or closing drops the cache.
+    """
+
+    empty_message = "📋 Nothing found on this page!"
+    closed_message = "✅ Viewer closed."
+
+    def __init__(self, total_count: int, per_page: int = 15, timeout: float = 300):
+        super().__init__(timeout=timeout)  # 5 minutes timeout by default
+        self.current_page = 1
+        self.per_page = per_page
+        self.total_count = total_count
+        self.total_pages = max(1, (total_count + per_page - 1) // per_page)
+        self._pages: OrderedDict = OrderedDict()  # page -> rows
+        self._prefetching: Dict[int, asyncio.Task] = {}
+        self._direction = 1
+
+        # Update button states
+        self.update_buttons()
+
+    @property
+    def offset(self) -> int:
+        return (self.current_page - 1) * self.per_page
+
+    # ==================== SUBCLASS HOOKS ====================
+    @abstractmethod
+    async def fetch_page(self, limit: int, offset: int) -> List:
+        """Rows of one page"""
+
+    @abstractmethod
+    def build_embed(self, rows: List) -> discord.Embed:
+        """Embed for the rows of the current page"""
+
+    # ==================== PAGE CACHE ====================
+    async def _fetch(self, page: int) -> List:
+        rows = list(await self.fetch_page(self.per_page, (page - 1) * self.per_page))
+        self._pages[page] = rows
+        self._pages.move_to_end(page)
+        while len(self._pages) > max(1, Config.PAGINATION_CACHE_PAGES):
+            self._pages.popitem(last=False)
+        return rows
+
+    async def _load(self, page: int) -> List:
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+
+        task = self._prefetching.get(page)
+        if task is not None:
+            try:
+                # Shielded: cancelling this click must not cancel the shared prefetch
+                rows = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+                rows = None  # release() cancelled the prefetch: fetch the page here
+            if rows is not None:
+                return rows
+        return await self._fetch(page)
+
+    def _prefetch(self, page: int):
+        if not 1 <= page <= self.total_pages or page in self._pages or page in self._prefetching:
+            return
+        self._prefetching[page] = asyncio.get_running_loop().create_task(self._prefetch_page(page))
+
+    async def _prefetch_page(self, page: int):
+        try:
+            return await self._fetch(page)
+        except Exception as e:
+            # The click on that page fetches it again and reports the error
+            logger.warning(f"{type(self).__name__}: prefetching page {page} failed: {e}")
+            return None
+        finally:
+            self._prefetching.pop(page, None)
+
+    def release(self):
+        """Drop cached pages and cancel pending prefetches"""
+        for task in self._prefetching.values():
+            task.cancel()
+        self._prefetching.clear()
+        self._pages.clear()
+
+    # ==================== DISPLAY ====================
+    def update_buttons(self):
+        """Update button states based on current page"""
+        # Disable first/previous on first page
+        self.first_button.disabled = (self.current_page == 1)
+        self.prev_button.disabled = (self.current_page == 1)
+
+        # Disable next/last on last page
+        self.next_button.disabled = (self.current_page >= self.total_pages)
+        self.last_button.disabled = (self.current_page >= self.total_pages)
+
+        # Update page indicator button label
+        self.page_indicator.label = f"Page {self.current_page}/{self.total_pages}"
+
+    async def send(self, interaction: discord.Interaction):
+        """Send the first page as an ephemeral followup (interaction already deferred)"""
+        rows = await self._load(self.current_page)
+        if not rows:
+            self.release()
+            await interaction.followup.send(self.empty_message, ephemeral=True)
+            return
+
+        await interaction.followup.send(embed=self.build_embed(rows), view=self, ephemeral=True)
+        self._prefetch(self.current_page + 1)
+
+    async def show_page(self, interaction: discord.Interaction, page: int):
+        """Switch to a page and edit the message in place"""
+        page = min(max(1, page), self.total_pages)
+        if page != self.current_page:
+            self._direction = 1 if page > self.current_page else -1
+        self.current_page = page
+
+        # Cached pages are edited straight away; anything else needs a round trip first
+        if page not in self._pages:
+            await interaction.response.defer()
+        rows = await self._load(page)
+
+        if not rows:
+            self.release()
+            await self._edit(interaction, content=self.empty_message, embed=None, view=None)
+            self.stop()
+            return
+
+        self.update_buttons()
+        await self._edit(interaction, embed=self.build_embed(rows), view=self)
+        self._prefetch(page + self._direction)
+
+    @staticmethod
+    async def _edit(interaction: discord.Interaction, **kwargs):
+        if interaction.response.is_done():
+            await interaction.edit_original_response(**kwargs)
+        else:
+            await interaction.response.edit_message(**kwargs)
+
+    async def on_timeout(self):
+        self.release()
+
+    @discord.ui.button(label="⏮️ First", style=discord.ButtonStyle.secondary, row=0)
+    async def first_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, 1)
+
+    @discord.ui.button(label="◀️ Previous", style=discord.ButtonStyle.primary, row=0)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.current_page - 1)
+
+    @discord.ui.button(label="Page 1/1", style=discord.ButtonStyle.secondary, disabled=True, row=0)
+    async def page_indicator(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # This button is just for display, no action needed
+        await interaction.response.defer()
+
+    @discord.ui.button(label="Next ▶️", style=discord.ButtonStyle.primary, row=0)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.current_page + 1)
+
+    @discord.ui.button(label="Last ⏭️", style=discord.ButtonStyle.secondary, row=0)
+    async def last_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.total_pages)
+
+    @discord.ui.button(label="🔄 Refresh", style=discord.ButtonStyle.success, row=1)
+    async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Refetch the current page (useful for real-time updates)
+        self.release()
+        await self.show_page(interaction, self.current_page)
+
+    @discord.ui.button(label="❌ Close", style=discord.ButtonStyle.danger, row=1)
+    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.release()
+        await interaction.response.edit_message(
+            content=self.closed_message,
+            embed=None,
+            view=None
+        )
+        self.stop()
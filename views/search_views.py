@@ -0,0 +1,84 @@
+import discord
+from datetime import datetime
+from models.search_model import SearchModel
+
+
+# ==================== SEARCH RESULTS PAGINATION ====================
+
+class SearchResultsView(discord.ui.View):
+    """Keyset-paginated search results (only the current page is kept in memory)"""
+
+    def __init__(self, query: str, filters: dict, per_page: int = 8):
+        super().__init__(timeout=300)  # 5 minutes timeout
+        self.query = query
+        self.filters = filters
+        self.per_page = per_page
+        self.cursors = [None]  # cursors[i] = keyset cursor that starts page i + 1
+        self.page_index = 0
+        self.has_next = False
+
+    async def fetch_page(self):
+        """Fetch the current page (one extra row tells whether a next page exists)"""
+        rows = await SearchModel.search(
+            self.query,
+            cursor=self.cursors[self.page_index],
+            limit=self.per_page + 1,
+            **self.filters
+        )
+        self.has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if self.has_next and len(self.cursors) == self.page_index + 1:
+            self.cursors.append(SearchModel.cursor_for(rows[-1]))
+        return rows
+
+    def build_embed(self, rows) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"🔎 Search: {self.query}"[:256],
+            description=f"**Page:** {self.page_index + 1}" + (" (more results available)" if self.has_next else ""),
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+
+        for row in rows:
+            label = SearchModel.ENTITY_LABELS.get(row['entity_type'], row['entity_type'])
+            event_date = row['event_date'].strftime('%d/%m/%Y') if row['event_date'] else 'N/A'
+            embed.add_field(
+                name=f"{label} #{row['entity_id']} | {row['name']}"[:256],
+                value=(
+                    f"**Department:** {row['department'] or 'N/A'} | **Date:** {event_date}\n"
+                    f"{row['snippet'] or '*No text*'}"
+                )[:1024],
+                inline=False
+            )
+
+        embed.set_footer(text="Ranked by relevance")
+        return embed
+
+    def update_buttons(self):
+        self.prev_button.disabled = (self.page_index == 0)
+        self.next_button.disabled = not self.has_next
+
+    async def show_page(self, interaction: discord.Interaction):
+        rows = await self.fetch_page()
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(rows), view=self)
+
+    @discord.ui.button(label="◀️ Previous", style=discord.ButtonStyle.primary)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_index = max(0, self.page_index - 1)
+        await self.show_page(interaction)
+
+    @discord.ui.button(label="Next ▶️", style=discord.ButtonStyle.primary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_index = min(len(self.cursors) - 1, self.page_index + 1)
+        await self.show_page(interaction)
+
+    @discord.ui.button(label="❌ Close", style=discord.ButtonStyle.danger)
+    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(
+            content="✅ Search closed.",
+            embed=None,
+            view=None
+        )
+        self.stop()
@@ -4,6 +4,7 @@ from datetime import datetime
 from models.user_model import UserModel
 from utils.database import db
 from utils.verification_helper import check_user_permission, get_all_permissions, get_user_permissions, check_role_hierarchy
+from views.pagination import PaginatedEmbedView
 
 
 # ==================== USER REGISTRATION ====================
@@ -99,7 +100,7 @@ class UserRegistrationModal1(discord.ui.Modal, title='User Registration - Part 1
     position = discord.ui.TextInput(label='Position', placeholder='e.g., Software Engineer, Manager', required=True, max_length=100)
     trackabi_id = discord.ui.TextInput(label='Trackabi ID', placeholder='Enter Trackabi ID', required=True, max_length=100)
     desklog_id = discord.ui.TextInput(label='Desklog ID', placeholder='Enter Desklog ID', required=True, max_length=100)
-    pending_leaves = discord.ui.TextInput(label='Pending Leaves', placeholder='Number of pending leaves', required=True, default='10', max_length=3)
+    pending_leaves = discord.ui.TextInput(label='Pending Leaves', placeholder='Number of pending leaves (e.g. 10 or 10.5)', required=True, default='10', max_length=5)
     
     def __init__(self, target_user: discord.User, department: str, role_id: int):
         super().__init__()
@@ -109,10 +110,13 @@ class UserRegistrationModal1(discord.ui.Modal, title='User Registration - Part 1
     
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            pending_leaves_int = int(self.pending_leaves.value)
-            if pending_leaves_int < 0:
+            pending_leaves_value = float(self.pending_leaves.value)
+            if pending_leaves_value < 0:
                 await interaction.response.send_message("❌ Pending leaves must be a positive number!", ephemeral=True)
                 return
+            if (pending_leaves_value * 2) % 1 != 0:
+                await interaction.response.send_message("❌ Pending leaves must be in steps of 0.5 days!", ephemeral=True)
+                return
         except ValueError:
             await interaction.response.send_message("❌ Pending leaves must be a valid number!", ephemeral=True)
             return
@@ -120,7 +124,7 @@ class UserRegistrationModal1(discord.ui.Modal, title='User Registration - Part 1
         view = ContinueToModal2View(
             target_user=self.target_user, department=self.department, role_id=self.role_id,
             name=self.name.value, position=self.position.value, trackabi_id=self.trackabi_id.value,
-            desklog_id=self.desklog_id.value, pending_leaves=pending_leaves_int
+            desklog_id=self.desklog_id.value, pending_leaves=pending_leaves_value
         )
         
         embed = discord.Embed(
@@ -470,7 +474,7 @@ class UserUpdateModal(discord.ui.Modal, title='User Update - Part 1/2'):
     position = discord.ui.TextInput(label='Position', placeholder='e.g., Software Engineer, Manager', required=True, max_length=100)
     trackabi_id = discord.ui.TextInput(label='Trackabi ID', placeholder='Enter Trackabi ID', required=True, max_length=100)
     desklog_id = discord.ui.TextInput(label='Desklog ID', placeholder='Enter Desklog ID', required=True, max_length=100)
-    pending_leaves = discord.ui.TextInput(label='Pending Leaves', placeholder='Number of pending leaves', required=True, max_length=3)
+    pending_leaves = discord.ui.TextInput(label='Pending Leaves', placeholder='Number of pending leaves (e.g. 10 or 10.5)', required=True, max_length=5)
     
     def __init__(self, target_user: discord.User, department: str, role_id: int, user_data):
         super().__init__()
@@ -488,10 +492,13 @@ class UserUpdateModal(discord.ui.Modal, title='User Update - Part 1/2'):
     
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            pending_leaves_int = int(self.pending_leaves.value)
-            if pending_leaves_int < 0:
+            pending_leaves_value = float(self.pending_leaves.value)
+            if pending_leaves_value < 0:
                 await interaction.response.send_message("❌ Pending leaves must be a positive number!", ephemeral=True)
                 return
+            if (pending_leaves_value * 2) % 1 != 0:
+                await interaction.response.send_message("❌ Pending leaves must be in steps of 0.5 days!", ephemeral=True)
+                return
         except ValueError:
             await interaction.response.send_message("❌ Pending leaves must be a valid number!", ephemeral=True)
             return
@@ -504,7 +511,7 @@ class UserUpdateModal(discord.ui.Modal, title='User Update - Part 1/2'):
         view = PermissionSelectView(
             target_user=self.target_user, department=self.department, role_id=self.role_id,
             name=self.name.value, position=self.position.value, trackabi_id=self.trackabi_id.value,
-            desklog_id=self.desklog_id.value, pending_leaves=pending_leaves_int,
+            desklog_id=self.desklog_id.value, pending_leaves=pending_leaves_value,
             contract_started_at=None, permissions=permissions, is_update=True, existing_perms=existing_perms_str
         )
         
@@ -912,43 +919,14 @@ class RestoreConfirmView(discord.ui.View):
 
 # ==================== DELETE LOGS PAGINATION ====================
 
-class DeleteLogsPaginationView(discord.ui.View):
-    def __init__(self, total_count: int, per_page: int = 15):
-        super().__init__(timeout=300)  # 5 minutes timeout
-        self.current_page = 1
-        self.per_page = per_page
-        self.total_count = total_count
-        self.total_pages = max(1, (total_count + per_page - 1) // per_page)  
-        
-        # Update button states
-        self.update_buttons()
-    
-    def update_buttons(self):
-        """Update button states based on current page"""
-        # Disable first/previous on first page
-        self.first_button.disabled = (self.current_page == 1)
-        self.prev_button.disabled = (self.current_page == 1)
-        
-        # Disable next/last on last page
-        self.next_button.disabled = (self.current_page >= self.total_pages)
-        self.last_button.disabled = (self.current_page >= self.total_pages)
-        
-        # Update page indicator button label
-        self.page_indicator.label = f"Page {self.current_page}/{self.total_pages}"
-    
-    async def fetch_and_display_logs(self, interaction: discord.Interaction):
-        """Fetch logs for current page and display them"""
-        offset = (self.current_page - 1) * self.per_page
-        logs = await UserModel.get_delete_logs(limit=self.per_page, offset=offset)
-        
-        if not logs:
-            await interaction.response.edit_message(
-                content="📋 No deletion logs found on this page!",
-                embed=None,
-                view=None
-            )
-            return
-        
+class DeleteLogsPaginationView(PaginatedEmbedView):
+    empty_message = "📋 No deletion logs found on this page!"
+    closed_message = "✅ Delete logs viewer closed."
+
+    async def fetch_page(self, limit: int, offset: int):
+        return await UserModel.get_delete_logs(limit=limit, offset=offset)
+
+    def build_embed(self, logs) -> discord.Embed:
         embed = discord.Embed(
             title=f"🗑️ User Deletion Logs",
             description=f"**Total Logs:** {self.total_count} | **Page:** {self.current_page}/{self.total_pages}",
@@ -977,50 +955,5 @@ class DeleteLogsPaginationView(discord.ui.View):
                 inline=False
             )
         
-        embed.set_footer(text=f"Showing logs {offset + 1}-{min(offset + len(logs), self.total_count)} of {self.total_count}")
-        
-        self.update_buttons()
-        
-        try:
-            await interaction.response.edit_message(embed=embed, view=self)
-        except discord.errors.InteractionResponded:
-            await interaction.edit_original_response(embed=embed, view=self)
-    
-    @discord.ui.button(label="⏮️ First", style=discord.ButtonStyle.secondary, row=0)
-    async def first_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = 1
-        await self.fetch_and_display_logs(interaction)
-    
-    @discord.ui.button(label="◀️ Previous", style=discord.ButtonStyle.primary, row=0)
-    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = max(1, self.current_page - 1)
-        await self.fetch_and_display_logs(interaction)
-    
-    @discord.ui.button(label="Page 1/1", style=discord.ButtonStyle.secondary, disabled=True, row=0)
-    async def page_indicator(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # This button is just for display, no action needed
-        await interaction.response.defer()
-    
-    @discord.ui.button(label="Next ▶️", style=discord.ButtonStyle.primary, row=0)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = min(self.total_pages, self.current_page + 1)
-        await self.fetch_and_display_logs(interaction)
-    
-    @discord.ui.button(label="Last ⏭️", style=discord.ButtonStyle.secondary, row=0)
-    async def last_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = self.total_pages
-        await self.fetch_and_display_logs(interaction)
-    
-    @discord.ui.button(label="🔄 Refresh", style=discord.ButtonStyle.success, row=1)
-    async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Refresh current page (useful for real-time updates)
-        await self.fetch_and_display_logs(interaction)
-    
-    @discord.ui.button(label="❌ Close", style=discord.ButtonStyle.danger, row=1)
-    async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.edit_message(
-            content="✅ Delete logs viewer closed.",
-            embed=None,
-            view=None
-        )
-        self.stop()
\ No newline at end of file
+        embed.set_footer(text=f"Showing logs {self.offset + 1}-{min(self.offset + len(logs), self.total_count)} of {self.total_count}")
+        return embed
\ No newline at end of file